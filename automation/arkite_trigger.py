@@ -1,6 +1,7 @@
 import os
 import time
 import json
+import threading
 from pathlib import Path
 from datetime import datetime, timezone
 
@@ -45,6 +46,8 @@ DB_PASSWORD = get_from_env_or_envfile("AUTOMATION_DB_PASS", get_from_env_or_envf
 MQTT_HOST = get_from_env_or_envfile("AUTOMATION_MQTT_HOST", "localhost")
 MQTT_PORT = int(get_from_env_or_envfile("AUTOMATION_MQTT_PORT", get_from_env_or_envfile("MQTT_PORT", "1883")))
 MQTT_TOPIC = get_from_env_or_envfile("AUTOMATION_MQTT_TOPIC_QR", get_from_env_or_envfile("MQTT_TOPIC_QR", "arkite/trigger/QR"))
+# Retained product index published by mqtt_publish; keeps the local code cache warm
+MQTT_TOPIC_CODES = get_from_env_or_envfile("AUTOMATION_MQTT_TOPIC_CODES", get_from_env_or_envfile("MQTT_TOPIC_CODES", "factory/products/all_product_codes"))
 
 RECONNECT_INTERVAL_SEC = 5
 
@@ -65,46 +68,98 @@ def get_connection():
     )
 
 
+db_conn = None
+
+
+def get_db():
+    """Return the persistent connection, opening it when needed."""
+    global db_conn
+    if db_conn is None or db_conn.closed:
+        db_conn = get_connection()
+        # Lookups only: no transaction left open between scans
+        db_conn.autocommit = True
+    return db_conn
+
+
+def reset_db():
+    global db_conn
+    if db_conn is not None:
+        try:
+            db_conn.close()
+        except Exception:
+            pass
+    db_conn = None
+
+
 def wait_for_db():
     while True:
         print(f"[DB] Testing connection to {DB_HOST}:{DB_PORT} ...")
         try:
-            with get_connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT 1;")
-                    cur.fetchone()
+            with get_db().cursor() as cur:
+                cur.execute("SELECT 1;")
+                cur.fetchone()
             print("[DB] Connection OK.\n")
             return
         except Exception as e:
+            reset_db()
             print("[DB] Connection FAILED:")
             print(e)
             print(f"[DB] Retrying in {RECONNECT_INTERVAL_SEC}s...\n")
             time.sleep(RECONNECT_INTERVAL_SEC)
 
 
-def ensure_db_connected():
-    try:
-        with get_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT 1;")
-                cur.fetchone()
-        return
-    except Exception:
-        wait_for_db()
+# =========================
+# PRODUCT CODE CACHE
+# =========================
+# product_code -> (id, name, product_code), replaced by every retained snapshot
+product_cache = {}
+product_cache_lock = threading.Lock()
+
+
+def load_product_snapshot(payload: dict):
+    """Replace the cache with the products of a ``factory/products/all_product_codes`` payload."""
+    global product_cache
+    products = payload.get("products")
+    if products is not None:
+        snapshot = {
+            p["product_code"]: (p.get("id"), p.get("name"), p["product_code"])
+            for p in products
+            if isinstance(p, dict) and p.get("product_code")
+        }
+    else:
+        # Older publisher: codes only. Keep what we already know for codes that still exist.
+        codes = set(payload.get("product_codes") or [])
+        with product_cache_lock:
+            snapshot = {code: row for code, row in product_cache.items() if code in codes}
+    with product_cache_lock:
+        product_cache = snapshot
+    print(f"[CACHE] Product snapshot loaded: {len(snapshot)} code(s).")
 
 
 def find_product_by_qr(qr_code: str):
+    with product_cache_lock:
+        row = product_cache.get(qr_code)
+    if row is not None:
+        return row
+
+    # Cold path: not in the snapshot yet (e.g. created since the last publish)
     query = """
         SELECT id, name, product_code
         FROM public.product_module_product
         WHERE product_code = %s
         LIMIT 1;
     """
-    ensure_db_connected()
-    with get_connection() as conn:
-        with conn.cursor() as cur:
+    try:
+        with get_db().cursor() as cur:
             cur.execute(query, (qr_code,))
-            return cur.fetchone()
+            row = cur.fetchone()
+    except OperationalError:
+        reset_db()
+        raise
+    if row is not None:
+        with product_cache_lock:
+            product_cache[qr_code] = row
+    return row
 
 
 # =========================
@@ -114,6 +169,8 @@ def find_product_by_qr(qr_code: str):
 def _on_connect(client, userdata, flags, rc):
     if rc == 0:
         print("[MQTT] Connected.")
+        # (Re)subscribing also redelivers the retained snapshot
+        client.subscribe(MQTT_TOPIC_CODES, qos=1)
     else:
         print(f"[MQTT] Connect failed (rc={rc}). Will retry every {RECONNECT_INTERVAL_SEC}s.")
 
@@ -125,6 +182,18 @@ def _on_disconnect(client, userdata, rc):
         print("[MQTT] Disconnected.")
 
 
+def _on_message(client, userdata, msg):
+    if msg.topic != MQTT_TOPIC_CODES:
+        return
+    try:
+        payload = json.loads(msg.payload.decode("utf-8"))
+    except Exception as e:
+        print(f"[CACHE] Ignoring unreadable product snapshot: {e}")
+        return
+    if isinstance(payload, dict):
+        load_product_snapshot(payload)
+
+
 def setup_mqtt() -> bool:
     global mqtt_client
     print(f"[MQTT] Connecting (async) to {MQTT_HOST}:{MQTT_PORT} ...")
@@ -132,6 +201,7 @@ def setup_mqtt() -> bool:
         mqtt_client = mqtt.Client(client_id="qr-db-keyboard-publisher")
         mqtt_client.on_connect = _on_connect
         mqtt_client.on_disconnect = _on_disconnect
+        mqtt_client.on_message = _on_message
 
         mqtt_client.reconnect_delay_set(
             min_delay=RECONNECT_INTERVAL_SEC,
@@ -7,6 +7,8 @@ import psycopg2
 import paho.mqtt.client as mqtt
 import threading
 import re
+import queue
+import requests
 
 # =========================
 # Logging
@@ -62,6 +64,68 @@ MQTT_TOPIC = "factory/all_steps"
 last_payload_hash = None
 client = None
 
+# =========================
+# ODOO LIVE RELAY (bus.bus)
+# =========================
+# Incremental project/step updates are POSTed to Odoo, which fans them out to open
+# browser tabs over the bus so forms patch in place instead of being reloaded.
+ODOO_RELAY_URL = (os.getenv("ODOO_RELAY_URL", "") or "http://odoo:8069").rstrip("/")
+ODOO_LIVE_RELAY_TOKEN = os.getenv("ODOO_LIVE_RELAY_TOKEN", "")
+LIVE_TIMER_PUSH_SEC = int(os.getenv("LIVE_TIMER_PUSH_SEC", "10"))
+
+live_updates = queue.Queue(maxsize=1000)
+
+
+def push_live_update(update):
+    """Queue ``{"id": project_db_id, ...}`` for the relay thread (no-op without a token)."""
+    if not ODOO_LIVE_RELAY_TOKEN:
+        return
+    try:
+        live_updates.put_nowait(update)
+    except queue.Full:
+        log.warning("[LIVE] Relay queue full, dropping update for project %s", update.get("id"))
+
+
+def coalesce_live_updates(updates):
+    """Merge queued updates: latest value per project field, one entry per instruction."""
+    merged = {}
+    for update in updates:
+        current = merged.setdefault(update["id"], {"id": update["id"], "instructions": {}})
+        for key, value in update.items():
+            if key == "instructions":
+                for line in value:
+                    current["instructions"][line["id"]] = line
+            elif key != "id":
+                current[key] = value
+    for current in merged.values():
+        current["instructions"] = list(current["instructions"].values())
+    return list(merged.values())
+
+
+def live_relay_worker():
+    session = requests.Session()
+    url = f"{ODOO_RELAY_URL}/product_module/live/notify"
+    while True:
+        batch = [live_updates.get()]
+        while True:
+            try:
+                batch.append(live_updates.get_nowait())
+            except queue.Empty:
+                break
+        projects = coalesce_live_updates(batch)
+        try:
+            resp = session.post(url, json={
+                "jsonrpc": "2.0",
+                "method": "call",
+                "params": {"token": ODOO_LIVE_RELAY_TOKEN, "projects": projects},
+            }, timeout=5)
+            resp.raise_for_status()
+            if resp.json().get("error"):
+                log.warning("[LIVE] Odoo rejected live update: %s", resp.json()["error"].get("message"))
+        except Exception as e:
+            # Clients catch up on their next reload; don't retry stale state.
+            log.warning("[LIVE] Could not relay %d project update(s): %s", len(projects), e)
+
 def track_project_time(project_db_id):
     log.info("[TIMER] Started timer for project %s", project_db_id)
 
@@ -73,6 +137,8 @@ def track_project_time(project_db_id):
         database=os.getenv("DB_NAME", "odoo"),
     )
     cur = conn.cursor()
+    last_status = None
+    last_push = 0.0
 
     try:
         while True:
@@ -92,25 +158,35 @@ def track_project_time(project_db_id):
             else:
                 status = 'done'
 
+            # Only write on a transition; Odoo's status trigger stamps/materializes
+            # the active time, so there is no per-tick write.
             cur.execute("""
                 UPDATE public.product_module_project
                 SET status = %s
-                WHERE id = %s;
-            """, (status, project_db_id))
+                WHERE id = %s AND status IS DISTINCT FROM %s;
+            """, (status, project_db_id, status))
+            conn.commit()
 
             if status == 'done':
-                conn.commit()
                 log.info("[TIMER] Project %s DONE — stopping timer", project_db_id)
-                break
 
-            if status == 'in_progress':
+            now = time.monotonic()
+            if status != last_status or (status == 'in_progress' and now - last_push >= LIVE_TIMER_PUSH_SEC):
                 cur.execute("""
-                    UPDATE public.product_module_project
-                    SET active_completion_time = active_completion_time + 1
-                    WHERE id = %s;
+                    SELECT COALESCE(active_completion_time, 0)
+                        + COALESCE(floor(extract(epoch FROM (now() AT TIME ZONE 'UTC') - active_started_at)), 0)::integer
+                    FROM public.product_module_project WHERE id = %s;
                 """, (project_db_id,))
+                push_live_update({
+                    "id": project_db_id,
+                    "status": status,
+                    "elapsed_time": cur.fetchone()[0] or 0,
+                })
+                conn.commit()
+                last_status, last_push = status, now
 
-            conn.commit()
+            if status == 'done':
+                break
             time.sleep(1)
 
     finally:
@@ -176,6 +252,7 @@ def on_message(_cli, _userdata, msg):
             continue
 
         # UPSERT steps
+        live_instructions = []
         for step in project_steps:
             clean_title = clean_instruction_title(step["name"])
             log.info("--step id: %s", step["id"])
@@ -229,7 +306,8 @@ def on_message(_cli, _userdata, msg):
                         detection_id = EXCLUDED.detection_id,
                         detection_status = EXCLUDED.detection_status,
                         is_completed = public.product_module_instruction.is_completed
-                            OR EXCLUDED.is_completed;
+                            OR EXCLUDED.is_completed
+                    RETURNING id, is_completed, detection_status;
                 """, (
                     step["id"],
                     clean_title,
@@ -240,11 +318,20 @@ def on_message(_cli, _userdata, msg):
                     step.get("detection_status", False),
                     is_completed_now
                 ))
+                instruction_id, is_completed, detection_status = db_cur.fetchone()
                 db_conn.commit()
+                live_instructions.append({
+                    "id": instruction_id,
+                    "is_completed": bool(is_completed),
+                    "detection_status": bool(detection_status),
+                })
             except Exception as e:
                 db_conn.rollback()
                 log.error("[DB] Error upserting instruction %s: %s", step["name"], e)
 
+        if live_instructions:
+            push_live_update({"id": project_db_id, "instructions": live_instructions})
+
         with active_project_timers_lock:
             if project_db_id not in active_project_timers:
                 active_project_timers.add(project_db_id)
@@ -271,6 +358,9 @@ def setup_mqtt():
 # =========================
 def main():
     log.info("=== MQTT → All Steps Upsert ===")
+    if ODOO_LIVE_RELAY_TOKEN:
+        threading.Thread(target=live_relay_worker, daemon=True).start()
+        log.info("[LIVE] Relaying live updates to %s", ODOO_RELAY_URL)
     setup_mqtt()
     while True:
         time.sleep(3)  # idle loop every 3 seconds
@@ -1,5 +1,6 @@
 # mqtt_publish/publisher.py
 import os
+import sys
 import json
 import time
 import logging
@@ -10,6 +11,15 @@ import paho.mqtt.client as mqtt
 import psycopg2
 import psycopg2.extras
 
+try:
+    # Copied next to this file in the image (see Dockerfile)
+    from catalogue_sql import sql_jobs
+except ImportError:
+    # Running from a checkout: use the addon's copy directly
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                    '..', 'odoo', 'addons', 'product_module', 'services'))
+    from catalogue_sql import sql_jobs
+
 
 # =========================
 # Environment / Config
@@ -78,10 +88,10 @@ def get_conn():
 # SQL (Codes)
 # =========================
 SQL_PRODUCT_CODES = """
-SELECT DISTINCT product_code
+SELECT DISTINCT ON (product_code) id, name, product_code
 FROM public.product_module_product
 WHERE product_code IS NOT NULL AND product_code <> ''
-ORDER BY product_code;
+ORDER BY product_code, id;
 """
 
 
@@ -139,102 +149,20 @@ def detect_m2m_table_and_cols():
             "product_module_type_id", "product_module_product_id")
 
 
-# =========================
-# SQL (Grouped by Job) – built after M2M detection
-# =========================
-def build_sql_by_category(m2m_rel_table: str, left_col: str, right_col: str) -> str:
-    return f"""
-WITH att AS (
-    SELECT DISTINCT ON (res_id)
-        res_id,
-        id AS attachment_id
-    FROM public.ir_attachment
-    WHERE res_model = 'product_module.instruction'
-      AND res_field = 'image'
-    ORDER BY res_id, id DESC
-),
-base AS (
-    SELECT
-        p.id,
-        p.name,
-        p.product_code,
-        i.id            AS instr_id,
-        i.sequence      AS instr_sequence,
-        i.title         AS instr_title,
-        i.arkite_comment  AS instr_description,
-        CASE
-            WHEN %(odoo_base_url)s <> '' AND a.attachment_id IS NOT NULL THEN
-                %(odoo_base_url)s || '/web/image/' || a.attachment_id::text
-            WHEN %(odoo_base_url)s <> '' AND i.id IS NOT NULL THEN
-                %(odoo_base_url)s || '/web/image/product_module.instruction/' || i.id::text || '/image'
-            ELSE NULL
-        END AS instr_image_url
-    FROM public.product_module_product p
-    LEFT JOIN public.product_module_instruction i
-        ON i.product_id = p.id
-    LEFT JOIN att a
-        ON a.res_id = i.id
-    WHERE p.product_code IS NOT NULL AND p.product_code <> ''
-),
-prod_details AS (
-    SELECT
-        b.id,
-        b.name,
-        b.product_code,
-        COALESCE(
-            json_agg(
-                json_build_object(
-                    'sequence', b.instr_sequence,
-                    'title', b.instr_title,
-                    'description', b.instr_description,
-                    'image_url', b.instr_image_url
-                )
-                ORDER BY b.instr_sequence, b.instr_id
-            ) FILTER (WHERE b.instr_id IS NOT NULL),
-            '[]'::json
-        ) AS instructions
-    FROM base b
-    GROUP BY b.id, b.name, b.product_code
-)
-SELECT
-    t.id        AS category_id,
-    t.name      AS category_name,
-    COALESCE(
-        json_agg(
-            json_build_object(
-                'id', pd.id,
-                'name', pd.name,
-                'product_code', pd.product_code,
-                'qr_text', pd.product_code,
-                'instructions', pd.instructions
-            )
-            ORDER BY pd.product_code
-        ) FILTER (WHERE pd.id IS NOT NULL),
-        '[]'::json
-    ) AS products
-FROM public.product_module_type t
-LEFT JOIN {m2m_rel_table} rel
-    ON rel.{left_col} = t.id
-LEFT JOIN prod_details pd
-    ON pd.id = rel.{right_col}
-GROUP BY t.id, t.name
-ORDER BY t.name;
-"""
-
-
 # =========================
 # Fetchers
 # =========================
 def fetch_product_codes():
+    """Return ``[{"id", "name", "product_code"}]`` ordered by product code."""
     with get_conn() as conn, conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cur:
         cur.execute(SQL_PRODUCT_CODES)
         rows = cur.fetchall()
-        return [r["product_code"] for r in rows]
+        return [{"id": r["id"], "name": r["name"], "product_code": r["product_code"]} for r in rows]
 
 
 def fetch_details_grouped_by_category():
     m2m_rel_table, left_col, right_col = detect_m2m_table_and_cols()
-    sql = build_sql_by_category(m2m_rel_table, left_col, right_col)
+    sql = sql_jobs(m2m_rel_table, left_col, right_col)
     with get_conn() as conn, conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cur:
         cur.execute(sql, {"odoo_base_url": ODOO_BASE_URL})
         rows = cur.fetchall()
@@ -253,11 +181,13 @@ def fetch_details_grouped_by_category():
 # =========================
 # Payload Builders
 # =========================
-def payload_for_codes(codes):
+def payload_for_codes(products):
+    # "products" lets scanners resolve a code locally; "product_codes" is kept for older consumers
     return {
         "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
-        "count": len(codes),
-        "product_codes": codes,
+        "count": len(products),
+        "product_codes": [p["product_code"] for p in products],
+        "products": products,
         "source": {"db": DB_NAME, "table": "public.product_module_product"},
     }
 
@@ -324,11 +254,11 @@ def publish_all_product_data():
     while True:
         try:
             # 1) Codes-only topic
-            codes = fetch_product_codes()
-            h_codes = hash_strings(codes)
+            products = fetch_product_codes()
+            h_codes = hash_strings(f'{p["product_code"]}\x1f{p["id"]}\x1f{p["name"]}' for p in products)
             if h_codes != last_hash_codes:
-                mqtt_client.publish(MQTT_TOPIC_CODES, dumps(payload_for_codes(codes)), qos=1, retain=True)
-                log.info("Published %d product codes to '%s'", len(codes), MQTT_TOPIC_CODES)
+                mqtt_client.publish(MQTT_TOPIC_CODES, dumps(payload_for_codes(products)), qos=1, retain=True)
+                log.info("Published %d product codes to '%s'", len(products), MQTT_TOPIC_CODES)
                 last_hash_codes = h_codes
             else:
                 log.debug("No change in product codes; skipping publish.")
@@ -17,16 +17,24 @@
     'author': 'II- F Information Technology (NHL Stenden)',
     'category': 'Productivity',
     'license': 'LGPL-3',
-    'depends': ['base', 'web', 'web_hierarchy'],
+    'depends': ['base', 'web', 'bus', 'web_hierarchy'],
     'data': [
         'security/ir.model.access.csv',
         'data/page_data.xml',
+        'data/arkite_job_queue_data.xml',
+        'data/project_detection_data.xml',
+        'data/arkite_mirror_data.xml',
+        'data/progress_arkite_status_data.xml',
         'views/instruction_import_wizard_view.xml',
         'views/instruction_form_wizard_views.xml',
         'views/product_views.xml',  # Load first to define menu_product_module_root (but menu items referencing actions from other files should be in those files)
         'views/arkite_unit_views.xml',  # Load after product_views.xml (needs menu_product_module_root), defines action_arkite_unit
         'views/project_views.xml',  # Load after arkite_unit_views.xml (needs action_arkite_unit), defines action_project
+        'views/project_detection_templates.xml',
         'views/arkite_step_server_actions.xml',
+        'views/qr_label_export_wizard_view.xml',
+        'views/qr_server_actions.xml',
+        'views/instruction_export_server_actions.xml',
         'views/variant_views.xml',
         'views/material_views.xml',
         'views/material_link_wizard_views.xml',
@@ -42,6 +50,7 @@
     'assets': {
         'web.assets_backend': [
             'product_module/static/src/css/product_module.css',
+            'product_module/static/src/js/live_updates.js',
             # 'product_module/static/src/js/hierarchy_simple.js',  # Disabled: was causing blank page
         ],
         'web.assets_backend_lazy': [
@@ -1,4 +1,31 @@
+import hmac
+import os
+
+from werkzeug.exceptions import Forbidden
+from werkzeug.wsgi import wrap_file
+
 from odoo import http
+from odoo.http import request
+from odoo.modules.registry import Registry
+
+from ..services.catalogue import (
+    DocumentCache,
+    etag_matches,
+    make_etag,
+    sql_watermark,
+)
+from ..services.catalogue_sql import sql_jobs, sql_product
+from ..services.instruction_export import (
+    EXPORT_SOURCES,
+    EXPORT_URL,
+    FORMATS,
+    encode_csv,
+    encode_jsonl,
+    fetch_rows,
+)
+# Encoded catalogue documents by ETag, shared by all requests of this worker
+_CATALOGUE_CACHE = DocumentCache()
+
 
 class ProductModulePage(http.Controller):
 
@@ -13,3 +40,163 @@ class ProductModulePage(http.Controller):
             </body>
         </html>
         """
+
+    @http.route('/product_module/qr_labels/<int:wizard_id>', type='http', auth='user')
+    def qr_labels(self, wizard_id, **kw):
+        """Stream the QR label sheet prepared by the export wizard."""
+        wizard = request.env['product_module.qr.label.export.wizard'].browse(wizard_id).exists()
+        if not wizard:
+            raise request.not_found()
+
+        fileobj, filename, mimetype, count, elapsed = wizard._render_labels()
+        size = os.fstat(fileobj.fileno()).st_size
+        headers = [
+            ('Content-Type', mimetype),
+            ('Content-Length', str(size)),
+            ('Content-Disposition', http.content_disposition(filename)),
+            ('X-QR-Label-Count', str(count)),
+            ('X-QR-Render-Seconds', f'{elapsed:.2f}'),
+        ]
+        # wrap_file reads the temporary file in chunks and closes (deletes) it when done.
+        return request.make_response(
+            wrap_file(request.httprequest.environ, fileobj),
+            headers=headers,
+        )
+
+    @http.route(EXPORT_URL, type='http', auth='user')
+    def export_instructions(self, model=None, ids='', format='csv', **kw):
+        """Stream the processes of the given products or projects as CSV or JSON Lines."""
+        source = EXPORT_SOURCES.get(model)
+        if not source or format not in FORMATS:
+            raise request.not_found()
+        try:
+            record_ids = [int(rid) for rid in ids.split(',') if rid.strip()]
+        except ValueError:
+            raise request.not_found()
+        records = request.env[model].browse(record_ids).exists()
+        if not records:
+            raise request.not_found()
+        # Rows are read with plain SQL below, so check access on the ORM side first
+        records.check_access('read')
+        request.env['product_module.instruction'].check_access('read')
+
+        mimetype, extension = FORMATS[format]
+        stem = records.display_name if len(records) == 1 else request.env[model]._description
+        headers = [
+            ('Content-Type', mimetype),
+            ('Content-Disposition', http.content_disposition(f'{stem}_processes.{extension}')),
+            # Let the chunks through reverse proxies as they are produced
+            ('X-Accel-Buffering', 'no'),
+        ]
+        body = self._stream_instructions(request.db, source, records.ids, format)
+        return request.make_response(body, headers=headers)
+
+    @staticmethod
+    def _stream_instructions(dbname, source, ids, file_format):
+        """Yield the encoded export.
+
+        Runs while the response is sent, after the request cursor is closed, so it opens
+        its own cursor and reads through a server-side cursor in batches.
+        """
+        with Registry(dbname).cursor() as cr:
+            batches = fetch_rows(cr._cnx, source['query'], [ids])
+            if file_format == 'jsonl':
+                yield from encode_jsonl(batches, source['keys'])
+            else:
+                yield from encode_csv(batches, source['header'])
+
+    @http.route('/product_module/live/notify', type='json', auth='public', csrf=False)
+    def live_notify(self, token=None, projects=None, **kw):
+        """Relay endpoint for the MQTT bridge: fan live project updates out over the bus."""
+        expected = os.getenv('ODOO_LIVE_RELAY_TOKEN') or request.env['ir.config_parameter'].sudo().get_param(
+            'product_module.live_relay_token'
+        )
+        if not expected or not token or not hmac.compare_digest(str(token), str(expected)):
+            raise Forbidden()
+        sent = request.env['product_module.project'].sudo()._live_notify(projects)
+        return {'sent': sent}
+
+    # -------------------------------------------------------------------------
+    # Catalogue (read-only JSON for pull-based clients, same data as the MQTT details topic)
+    # -------------------------------------------------------------------------
+
+    @http.route('/product_module/api/catalogue', type='http', auth='public', methods=['GET'], csrf=False)
+    def catalogue(self, **kw):
+        """All jobs with their products and instructions."""
+        def build(cr, rel, base_url):
+            cr.execute(sql_jobs(*rel), {'odoo_base_url': base_url})
+            jobs = [
+                {'job_id': job_id, 'job_name': job_name, 'products': products}
+                for job_id, job_name, products in cr.fetchall()
+            ]
+            return {'count': len(jobs), 'jobs': jobs, 'odoo_base_url': base_url or None}
+        return self._catalogue_response('catalogue', build)
+
+    @http.route('/product_module/api/catalogue/jobs/<int:job_id>', type='http', auth='public', methods=['GET'], csrf=False)
+    def catalogue_job(self, job_id, **kw):
+        """One job (product type) with its products."""
+        def build(cr, rel, base_url):
+            cr.execute(sql_jobs(*rel, category_filter='AND t.id = %(job_id)s'),
+                       {'odoo_base_url': base_url, 'job_id': job_id})
+            row = cr.fetchone()
+            if not row:
+                return None
+            return {'job_id': row[0], 'job_name': row[1], 'products': row[2]}
+        return self._catalogue_response(f'job:{job_id}', build)
+
+    @http.route('/product_module/api/catalogue/products/<string:product_code>', type='http', auth='public', methods=['GET'], csrf=False)
+    def catalogue_product(self, product_code, **kw):
+        """One product (by product code) with its instructions and job ids."""
+        def build(cr, rel, base_url):
+            cr.execute(sql_product(*rel), {'odoo_base_url': base_url, 'product_code': product_code})
+            row = cr.fetchone()
+            if not row:
+                return None
+            return dict(row[0], job_ids=row[1])
+        return self._catalogue_response(f'product:{product_code}', build)
+
+    def _catalogue_response(self, scope, build):
+        """Serve ``build(cr, rel, base_url)`` with ETag revalidation and gzip.
+
+        The ETag comes from a watermark over the source tables, so a conditional request
+        costs one small query and no serialization when nothing changed.
+        """
+        expected = os.getenv('ODOO_CATALOGUE_TOKEN') or request.env['ir.config_parameter'].sudo().get_param(
+            'product_module.catalogue_token'
+        )
+        # Closed unless a token is configured: these routes are public and read as superuser.
+        auth = request.httprequest.headers.get('Authorization', '')
+        token = auth[7:] if auth.startswith('Bearer ') else ''
+        if not expected or not token or not hmac.compare_digest(token, str(expected)):
+            raise Forbidden()
+
+        field = request.env['product_module.product']._fields['product_type_ids']
+        rel = (field.relation, field.column2, field.column1)
+        base_url = request.httprequest.host_url.rstrip('/')
+
+        cr = request.env.cr
+        cr.execute(sql_watermark(field.relation))
+        watermark = cr.fetchone()[0]
+        etag = make_etag(request.db, scope, base_url, watermark)
+        headers = [
+            ('ETag', etag),
+            ('Cache-Control', 'no-cache'),
+            ('Vary', 'Accept-Encoding'),
+        ]
+        if etag_matches(request.httprequest.headers.get('If-None-Match'), etag):
+            return request.make_response(b'', headers=headers, status=304)
+
+        item = _CATALOGUE_CACHE.get(etag)
+        if item is None:
+            payload = build(cr, rel, base_url)
+            if payload is None:
+                raise request.not_found()
+            item = _CATALOGUE_CACHE.put(etag, payload)
+        body, gzipped = item
+
+        headers.append(('Content-Type', 'application/json; charset=utf-8'))
+        if 'gzip' in request.httprequest.accept_encodings:
+            body = gzipped
+            headers.append(('Content-Encoding', 'gzip'))
+        headers.append(('Content-Length', str(len(body))))
+        return request.make_response(body, headers=headers)
@@ -1,3 +1,5 @@
+from . import qr_mixin
+from . import arkite_write_behind
 from . import page
 from . import product_type
 from . import project
@@ -10,6 +12,7 @@ from . import instruction_form_wizard
 from . import material
 from . import material_link_wizard
 from . import progress_tracking
+from . import progress_arkite_status
 from . import arkite_project
 from . import arkite_template
 from . import arkite_project_wizard
@@ -25,7 +28,17 @@ from . import arkite_material_temp
 from . import arkite_project_selection
 from . import arkite_unit
 from . import arkite_image_selector_wizard
+from . import qr_label_export_wizard
 from . import hierarchy_test
 from . import project_hierarchy_save
 from . import project_arkite_step_flags
 from . import project_auto_load_everything
+from . import arkite_job_queue
+from . import arkite_image_cache
+from . import arkite_mirror
+from . import project_arkite_jobs
+from . import project_live_updates
+from . import project_progress_aggregates
+from . import project_active_time
+from . import project_arkite_mirror
+from . import project_arkite_credentials
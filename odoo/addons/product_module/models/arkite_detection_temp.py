@@ -5,14 +5,21 @@ import requests
 import os
 import logging
 
+from ..services.arkite_client import ArkiteClient
+
 _logger = logging.getLogger(__name__)
 
 class ArkiteDetectionTemp(models.TransientModel):
     """Temporary model for displaying detections in list view"""
     _name = 'product_module.arkite.detection.temp'
+    _inherit = ['product_module.arkite.write.behind']
     _description = 'Arkite Detection (Temporary)'
     _rec_name = 'name'
     _order = 'sequence, id'
+    # Edits pushed to Arkite (see arkite.write.behind)
+    _arkite_patch_fields = ('name', 'detection_type')
+    _arkite_object_path = 'detections'
+    _arkite_object_field = 'detection_id'
     
     wizard_id = fields.Many2one('product_module.arkite.job.step.wizard', string='Wizard', ondelete='cascade')
     project_id = fields.Many2one('product_module.project', string='Project', ondelete='cascade')
@@ -32,116 +39,72 @@ class ArkiteDetectionTemp(models.TransientModel):
     is_job_specific = fields.Boolean(string='Job-Specific', readonly=True, help='True if this detection is job-specific (not project-wide)')
     job_id = fields.Char(string='Job ID', readonly=True, help='Job ID if this detection is job-specific')
     
-    @api.model
-    def create(self, vals):
-        """Override create to create detection in Arkite if detection_id is empty (new detection)"""
-        # If detection_id is provided, it's a loaded detection - just create the record
-        if vals.get('detection_id'):
-            return super().create(vals)
-        
-        # Otherwise, create a new detection in Arkite
-        wizard = self.env['product_module.arkite.job.step.wizard'].browse(vals.get('wizard_id'))
-        if not wizard or not wizard.project_id:
-            raise UserError("Please load a project first (Step 1)")
-        
-        api_base = os.getenv('ARKITE_API_BASE')
-        api_key = os.getenv('ARKITE_API_KEY')
-        
-        if not api_base or not api_key:
-            raise UserError("Arkite API configuration is missing.")
-        
-        # Build detection payload
-        detection_data = {
-            "Name": vals.get('name', 'Unnamed Detection'),
-            "DetectionType": vals.get('detection_type', 'OBJECT'),
-        }
-        
-        # Add JobId if job-specific (for now, we'll create project-wide detections)
-        # TODO: Add UI to specify if detection should be job-specific
-        
-        url = f"{api_base}/projects/{wizard.project_id}/detections/"
-        params = {"apiKey": api_key}
-        headers = {"Content-Type": "application/json"}
-        
-        _logger.info("[ARKITE] Creating detection: %s", detection_data)
-        
-        try:
-            response = requests.post(url, params=params, headers=headers, json=[detection_data], verify=False, timeout=10)
-        except Exception as e:
-            _logger.error("[ARKITE] ERROR creating detection: %s", e, exc_info=True)
-            raise UserError(f"Failed to create detection: {str(e)}")
-        
-        _logger.info("[ARKITE] POST /projects/{id}/detections/ STATUS: %s", response.status_code)
-        
-        if not response.ok:
-            error_text = response.text[:500] if response.text else "Unknown error"
-            _logger.error("[ARKITE] Server refused request: %s", error_text)
-            raise UserError(f"Failed to create detection: HTTP {response.status_code}\n{error_text}")
-        
-        try:
-            created_detections = response.json()
-            if isinstance(created_detections, list) and created_detections:
-                created = created_detections[0]
-                vals['detection_id'] = str(created.get("Id", ""))
-                _logger.info("[ARKITE] Created detection with ID: %s", vals['detection_id'])
-            else:
-                # API might return single object instead of list
-                if isinstance(created_detections, dict):
-                    vals['detection_id'] = str(created_detections.get("Id", ""))
-                else:
-                    raise UserError("Unexpected response format from Arkite API")
-        except Exception as e:
-            _logger.error("[ARKITE] Error parsing detection creation response: %s", e)
-            raise UserError(f"Failed to parse detection creation response: {str(e)}")
-        
-        return super().create(vals)
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Override create to create new detections in Arkite (one list POST per project)"""
+        pending = {}
+        for vals in vals_list:
+            # If detection_id is provided, it's a loaded detection - just create the record
+            if vals.get('detection_id'):
+                continue
+            wizard = self.env['product_module.arkite.job.step.wizard'].browse(vals.get('wizard_id'))
+            if not wizard or not wizard.project_id:
+                raise UserError("Please load a project first (Step 1)")
+            pending.setdefault(wizard.project_id, []).append(vals)
+
+        if pending:
+            api_base = os.getenv('ARKITE_API_BASE')
+            api_key = os.getenv('ARKITE_API_KEY')
+            if not api_base or not api_key:
+                raise UserError("Arkite API configuration is missing.")
+            client = ArkiteClient(api_base=api_base, api_key=api_key, verify_ssl=False, timeout_sec=20)
+
+        for project_id, project_vals in pending.items():
+            # Project-wide detections (no JobId)
+            # TODO: Add UI to specify if detection should be job-specific
+            payloads = [{
+                "Name": vals.get('name', 'Unnamed Detection'),
+                "DetectionType": vals.get('detection_type', 'OBJECT'),
+            } for vals in project_vals]
+
+            _logger.info("[ARKITE] Creating %s detection(s) in project %s", len(payloads), project_id)
+            try:
+                created = client.create_many(f"projects/{project_id}/detections/", payloads)
+            except ValueError as e:
+                _logger.error("[ARKITE] Error parsing detection creation response: %s", e)
+                raise UserError(f"Failed to parse detection creation response: {str(e)}")
+            except Exception as e:
+                _logger.error("[ARKITE] ERROR creating detections: %s", e, exc_info=True)
+                raise UserError(f"Failed to create detection: {str(e)}")
+
+            for vals, item in zip(project_vals, created):
+                vals['detection_id'] = str(item["Id"])
+            _logger.info("[ARKITE] Created detection(s) with ID(s): %s", ", ".join(vals['detection_id'] for vals in project_vals))
+
+        return super().create(vals_list)
     
     def write(self, vals):
-        """Override write to update detection in Arkite if name or type changes"""
+        """Override write to queue name/type changes for Arkite (see arkite.write.behind)"""
+        snapshot = self._arkite_snapshot(vals)
         result = super().write(vals)
-        
-        # Only update in Arkite if name or detection_type changed and detection_id exists
-        if not self.detection_id:
-            return result
-        
-        fields_to_sync = ['name', 'detection_type']
-        if not any(field in vals for field in fields_to_sync):
-            return result
-        
-        wizard = self.wizard_id
-        if not wizard or not wizard.project_id:
-            return result
-        
-        api_base = os.getenv('ARKITE_API_BASE')
-        api_key = os.getenv('ARKITE_API_KEY')
-        
-        if not api_base or not api_key:
-            return result
-        
-        # Build update payload
-        update_data = {}
-        if 'name' in vals:
-            update_data["Name"] = vals['name']
-        if 'detection_type' in vals:
-            update_data["DetectionType"] = vals['detection_type']
-        
-        if not update_data:
-            return result
-        
-        url = f"{api_base}/projects/{wizard.project_id}/detections/{self.detection_id}/"
-        params = {"apiKey": api_key}
-        headers = {"Content-Type": "application/json"}
-        
-        _logger.info("[ARKITE] Updating detection %s: %s", self.detection_id, update_data)
-        
-        try:
-            response = requests.patch(url, params=params, headers=headers, json=update_data, verify=False, timeout=10)
-            if not response.ok:
-                _logger.warning("[ARKITE] Failed to update detection: HTTP %s, %s", response.status_code, response.text[:200])
-        except Exception as e:
-            _logger.warning("[ARKITE] Error updating detection: %s", e)
-        
+        self._arkite_queue_changes(snapshot)
         return result
+
+    def _arkite_patch_target(self):
+        self.ensure_one()
+        if not self.detection_id or not self.wizard_id.project_id:
+            return None
+        # Detection lines use the API configuration from the environment
+        return self.env['product_module.project'], self.wizard_id.project_id, f"detections/{self.detection_id}/"
+
+    def _arkite_patch_values(self, field_names):
+        self.ensure_one()
+        values = {}
+        if 'name' in field_names:
+            values["Name"] = self.name
+        if 'detection_type' in field_names:
+            values["DetectionType"] = self.detection_type
+        return values
     
     def unlink(self):
         """Override unlink to delete detection from Arkite"""
@@ -0,0 +1,210 @@
+# product_module/models/arkite_image_cache.py
+from odoo import models, fields, api
+import base64
+import hashlib
+import logging
+import time
+
+import psycopg2
+
+from ..services.arkite_client import ArkiteClient
+
+_logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = (256, 256)
+
+
+class ArkiteImageCache(models.Model):
+    """Local copy of Arkite project images, keyed by (api_base, project, image_id).
+
+    Bytes live in the filestore through ``attachment=True`` binaries, which Odoo stores
+    content-addressed (by SHA1), so identical images are kept once. Entries are reused
+    without a network call within the TTL and revalidated with ETag / Last-Modified after it.
+    Thumbnails are generated once per content checksum and cached next to the original.
+    """
+    _name = 'product_module.arkite.image.cache'
+    _description = 'Arkite Image Cache'
+    _order = 'id'
+
+    api_base = fields.Char(string='API Base URL', required=True, index=True)
+    arkite_project_id = fields.Char(string='Arkite Project ID', required=True, index=True)
+    image_id = fields.Char(string='Arkite Image ID', required=True)
+    datas = fields.Binary(string='Image', attachment=True)
+    checksum = fields.Char(string='Checksum', help='SHA1 of the cached image bytes')
+    etag = fields.Char(string='ETag')
+    last_modified = fields.Char(string='Last-Modified')
+    fetched_at = fields.Datetime(string='Validated At', help='Last time the entry was downloaded or revalidated')
+    thumbnail = fields.Binary(string='Thumbnail', attachment=True)
+    thumbnail_checksum = fields.Char(string='Thumbnail Source Checksum')
+
+    _sql_constraints = [
+        ('image_key_unique',
+         'unique(api_base, arkite_project_id, image_id)',
+         'An Arkite image can only be cached once per server and project.'),
+    ]
+
+    @api.model
+    def _cache_ttl(self):
+        """Seconds an entry is trusted without revalidation (product_module.arkite_image_cache_ttl)."""
+        ICP = self.env['ir.config_parameter'].sudo()
+        try:
+            return max(0, int(ICP.get_param('product_module.arkite_image_cache_ttl', 3600)))
+        except (TypeError, ValueError):
+            return 3600
+
+    @api.model
+    def _get_images(self, project, image_ids, thumbnails=False, on_progress=None):
+        """Return ``{image_id: base64 bytes}`` for ``project``'s Arkite images, using the cache.
+
+        Only missing or expired entries hit Arkite (concurrently, with conditional requests
+        for expired ones). Images Arkite fails to serve are absent from the result unless an
+        older cached copy exists.
+        """
+        project.ensure_one()
+        image_ids = list(dict.fromkeys(
+            str(i).strip() for i in image_ids if i and str(i).strip() not in ('', '0')
+        ))
+        if not image_ids or not project.arkite_project_id:
+            return {}
+
+        creds = project._get_arkite_credentials()
+        api_base = creds['api_base']
+        arkite_project_id = str(project.arkite_project_id)
+
+        Cache = self.sudo()
+        entries = Cache.search([
+            ('api_base', '=', api_base),
+            ('arkite_project_id', '=', arkite_project_id),
+            ('image_id', 'in', image_ids),
+        ])
+        by_id = {entry.image_id: entry for entry in entries}
+
+        ttl = self._cache_ttl()
+        now = fields.Datetime.now()
+        validators = {}
+        uncached = {}
+        for image_id in image_ids:
+            entry = by_id.get(image_id)
+            if not entry or not entry.checksum:
+                validators[image_id] = (None, None)
+            elif not entry.fetched_at or (now - entry.fetched_at).total_seconds() > ttl:
+                validators[image_id] = (entry.etag or None, entry.last_modified or None)
+
+        if validators:
+            client = ArkiteClient(api_base=api_base, api_key=creds['api_key'], verify_ssl=False, timeout_sec=20)
+            started = time.monotonic()
+            fetched = client.fetch_images(
+                arkite_project_id,
+                validators,
+                max_workers=project._arkite_image_pool_size(),
+                on_result=on_progress,
+            )
+            _logger.info(
+                "[ARKITE IMAGE] Cache: %s hit(s), %s fetched/revalidated in %.2fs",
+                len(image_ids) - len(validators), len(validators), time.monotonic() - started,
+            )
+
+            not_modified = Cache.browse()
+            new_vals = []
+            for image_id, result in fetched.items():
+                entry = by_id.get(image_id)
+                if result.not_modified and entry:
+                    not_modified |= entry
+                    continue
+                if not result.data:
+                    continue
+                vals = {
+                    'datas': base64.b64encode(result.data),
+                    'checksum': hashlib.sha1(result.data).hexdigest(),
+                    'etag': result.etag or False,
+                    'last_modified': result.last_modified or False,
+                    'fetched_at': now,
+                }
+                if entry:
+                    if entry.checksum == vals['checksum']:
+                        vals.pop('datas')
+                    entry.write(vals)
+                else:
+                    vals.update({
+                        'api_base': api_base,
+                        'arkite_project_id': arkite_project_id,
+                        'image_id': image_id,
+                    })
+                    new_vals.append(vals)
+            if not_modified:
+                not_modified.write({'fetched_at': now})
+            if new_vals:
+                for entry in self._create_entries(new_vals):
+                    by_id[entry.image_id] = entry
+                # Lost the race for a row another request hasn't committed yet: serve uncached
+                uncached = {vals['image_id']: vals['datas'] for vals in new_vals if vals['image_id'] not in by_id}
+
+        if thumbnails:
+            self._ensure_thumbnails(Cache.browse([e.id for e in by_id.values()]))
+            images = {image_id: by_id[image_id].thumbnail for image_id in image_ids
+                      if image_id in by_id and by_id[image_id].thumbnail}
+            for image_id, datas in uncached.items():
+                thumb = self._thumbnail(base64.b64decode(datas), image_id)
+                if thumb:
+                    images[image_id] = base64.b64encode(thumb)
+            return images
+        images = {image_id: by_id[image_id].datas for image_id in image_ids
+                  if image_id in by_id and by_id[image_id].datas}
+        images.update(uncached)
+        return images
+
+    @api.model
+    def _create_entries(self, vals_list):
+        """Create cache entries, skipping those a concurrent request inserted first.
+
+        One batch create in a savepoint; on a unique violation each entry is retried in its
+        own savepoint and the ones that lost are read back (absent while the winner's
+        transaction is still open).
+        """
+        try:
+            with self.env.cr.savepoint():
+                return self.create(vals_list)
+        except psycopg2.IntegrityError:
+            pass
+        entries = self.browse()
+        for vals in vals_list:
+            try:
+                with self.env.cr.savepoint():
+                    entries |= self.create(vals)
+            except psycopg2.IntegrityError:
+                _logger.debug("[ARKITE IMAGE] Image %s was cached concurrently", vals['image_id'])
+                entries |= self.search([
+                    ('api_base', '=', vals['api_base']),
+                    ('arkite_project_id', '=', vals['arkite_project_id']),
+                    ('image_id', '=', vals['image_id']),
+                ], limit=1)
+        return entries
+
+    @api.model
+    def _ensure_thumbnails(self, entries):
+        """(Re)generate thumbnails whose source checksum no longer matches the cached image."""
+        for entry in entries.filtered(lambda e: e.checksum and e.thumbnail_checksum != e.checksum):
+            # The checksum is still stored on failure so the image isn't retried on every page.
+            thumb = self._thumbnail(base64.b64decode(entry.datas or b''), entry.image_id)
+            entry.write({
+                'thumbnail': base64.b64encode(thumb) if thumb else False,
+                'thumbnail_checksum': entry.checksum,
+            })
+
+    @api.model
+    def _thumbnail(self, raw, image_id):
+        """Thumbnail bytes of image ``raw``, or b'' if it can't be processed."""
+        from odoo.tools.image import image_process
+
+        try:
+            return image_process(raw, size=THUMBNAIL_SIZE)
+        except Exception as e:
+            # Never fall back to the full-size image; the selector shows its placeholder.
+            _logger.debug("[ARKITE IMAGE] Could not thumbnail image %s: %s", image_id, e)
+            return b''
+
+    @api.autovacuum
+    def _gc_stale_entries(self):
+        """Forget images that haven't been used or revalidated for 30 days."""
+        limit_date = fields.Datetime.subtract(fields.Datetime.now(), days=30)
+        self.sudo().search([('fetched_at', '<', limit_date)]).unlink()
@@ -7,6 +7,9 @@ import base64
 
 _logger = logging.getLogger(__name__)
 
+# Number of image cards per page in the selector (keep in sync with the kanban ``limit``)
+THUMBNAIL_PAGE_SIZE = 24
+
 
 class ArkiteImageSelectorWizard(models.TransientModel):
     _name = 'product_module.arkite.image.selector.wizard'
@@ -100,34 +103,30 @@ class ArkiteImageSelectorWizard(models.TransientModel):
             # Clear existing lines
             self.image_ids.unlink()
             
-            # Create image lines
-            from ..services.arkite_client import ArkiteClient
-            client = ArkiteClient(api_base=api_base, api_key=api_key, verify_ssl=False, timeout_sec=20)
-            
+            listed = []
             for img_data in images:
                 image_id = str(img_data.get('Id', ''))
                 if not image_id or image_id == '0':
                     continue
-                
-                # Try to download thumbnail
-                thumbnail = None
-                try:
-                    img_bytes = client.download_image_bytes(str(self.project_id.arkite_project_id), image_id)
-                    if img_bytes:
-                        thumbnail = base64.b64encode(img_bytes)
-                except Exception as e:
-                    _logger.warning("[ARKITE] Could not download image %s: %s", image_id, e)
-                
                 # Get image name/description
                 name = img_data.get('Name') or img_data.get('FileName') or f'Image {image_id}'
-                
-                self.env['product_module.arkite.image.selector.line'].create({
-                    'wizard_id': self.id,
-                    'image_id': image_id,
-                    'name': name,
-                    'thumbnail': thumbnail,
-                })
-            
+                listed.append((image_id, name))
+
+            # Lines only carry the ID and name; thumbnails are computed per displayed page.
+            # Warm the cache for the first page so the picker opens without waiting on Arkite.
+            try:
+                self.env['product_module.arkite.image.cache']._get_images(
+                    self.project_id, [image_id for image_id, _name in listed[:THUMBNAIL_PAGE_SIZE]], thumbnails=True,
+                )
+            except Exception as e:
+                _logger.warning("[ARKITE] Could not load image thumbnails: %s", e)
+
+            self.env['product_module.arkite.image.selector.line'].create([{
+                'wizard_id': self.id,
+                'image_id': image_id,
+                'name': name,
+            } for image_id, name in listed])
+
             self.write({'state': 'loaded'})
             
             # Return action to reload the wizard view
@@ -174,8 +173,22 @@ class ArkiteImageSelectorLine(models.TransientModel):
     
     thumbnail = fields.Binary(
         string='Thumbnail',
-        help='Preview thumbnail of the image'
+        compute='_compute_thumbnail',
+        help='Small preview served from the Arkite image cache (only computed for the page on screen)'
     )
+
+    @api.depends('image_id', 'wizard_id.project_id')
+    def _compute_thumbnail(self):
+        Cache = self.env['product_module.arkite.image.cache']
+        thumbnails = {}
+        for project in self.wizard_id.project_id:
+            lines = self.filtered(lambda l: l.wizard_id.project_id == project)
+            try:
+                thumbnails[project.id] = Cache._get_images(project, lines.mapped('image_id'), thumbnails=True)
+            except Exception as e:
+                _logger.warning("[ARKITE] Could not load image thumbnails: %s", e)
+        for line in self:
+            line.thumbnail = thumbnails.get(line.wizard_id.project_id.id, {}).get(line.image_id) or False
     
     def action_select_image(self):
         """Select this image and assign to material"""
@@ -186,30 +199,18 @@ class ArkiteImageSelectorLine(models.TransientModel):
             # Assign image_id to the material
             material_id.write({'image_id': self.image_id})
             
-            # Try to download the full image
+            # Try to download the full image (served from the local cache when possible)
             success = False
             try:
-                creds = self.wizard_id.project_id._get_arkite_credentials()
-                from ..services.arkite_client import ArkiteClient
-                client = ArkiteClient(
-                    api_base=creds['api_base'],
-                    api_key=creds['api_key'],
-                    verify_ssl=False,
-                    timeout_sec=20
-                )
-                
-                img_bytes = client.download_image_bytes(
-                    str(self.wizard_id.project_id.arkite_project_id),
-                    self.image_id
+                images = self.env['product_module.arkite.image.cache']._get_images(
+                    self.wizard_id.project_id, [self.image_id],
                 )
-                
-                if img_bytes:
-                    material_id.write({'image': base64.b64encode(img_bytes)})
+                if images.get(self.image_id):
+                    material_id.write({'image': images[self.image_id]})
                     success = True
-                    
             except Exception as e:
                 _logger.warning("[ARKITE] Could not download full image: %s", e)
-            
+
             # Close wizard and show notification
             message = _('Image "%s" (ID: %s) has been assigned to material "%s".') % (self.name, self.image_id, material_id.name)
             if success:
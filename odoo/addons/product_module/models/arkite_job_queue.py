@@ -0,0 +1,257 @@
+# product_module/models/arkite_job_queue.py
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+import json
+import logging
+import traceback
+
+_logger = logging.getLogger(__name__)
+
+
+class ArkiteJobQueue(models.Model):
+    """Lightweight background queue for long-running Arkite operations.
+
+    Jobs are plain rows in ``product_module_arkite_job_queue``; the
+    ``ir_cron_arkite_job_queue`` cron claims them with ``FOR UPDATE SKIP LOCKED``
+    so several cron workers never run the same job twice.
+    """
+    _name = 'product_module.arkite.job.queue'
+    _description = 'Arkite Background Job'
+    _order = 'id desc'
+
+    # job_type -> (project method, label). The method is called with
+    # context ``arkite_job_run=True`` so it executes synchronously.
+    _JOB_HANDLERS = {
+        'load_project': ('action_load_arkite_project', 'Load Arkite project'),
+        'sync_from_arkite': ('action_sync_from_arkite', 'Sync from Arkite'),
+        'fetch_material_images': ('action_fetch_material_images_from_arkite', 'Fetch material images'),
+        'arkite_patches': ('_arkite_push_patches', 'Send Arkite updates'),
+    }
+
+    name = fields.Char(string='Job', compute='_compute_name')
+    project_id = fields.Many2one(
+        'product_module.project',
+        string='Project',
+        ondelete='cascade',
+        index=True,
+    )
+    job_type = fields.Selection(
+        [
+            ('load_project', 'Load Arkite Project'),
+            ('sync_from_arkite', 'Sync from Arkite'),
+            ('fetch_material_images', 'Fetch Material Images'),
+            ('arkite_patches', 'Send Arkite Updates'),
+        ],
+        string='Type',
+        required=True,
+        index=True,
+    )
+    state = fields.Selection(
+        [
+            ('pending', 'Pending'),
+            ('running', 'Running'),
+            ('done', 'Done'),
+            ('failed', 'Failed'),
+        ],
+        string='State',
+        default='pending',
+        required=True,
+        index=True,
+    )
+    progress = fields.Integer(string='Progress %', default=0)
+    progress_message = fields.Char(string='Progress')
+    result_message = fields.Text(string='Result')
+    error_message = fields.Text(string='Error')
+    user_id = fields.Many2one('res.users', string='Requested By', default=lambda self: self.env.user)
+    date_started = fields.Datetime(string='Started')
+    date_finished = fields.Datetime(string='Finished')
+    # JSON argument of the handler (``arkite_patches``: ``{path: PATCH body}``)
+    payload = fields.Text(string='Payload')
+
+    @api.depends('job_type', 'project_id')
+    def _compute_name(self):
+        labels = dict(self._fields['job_type'].selection)
+        for job in self:
+            job.name = f"{labels.get(job.job_type, job.job_type)} - {job.project_id.name or ''}"
+
+    # -------------------------------------------------------------------------
+    # Enqueue
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _enqueue(self, project, job_type):
+        """Queue ``job_type`` for ``project`` and wake up the cron.
+
+        Requests for a project that already has the same job pending or running are
+        coalesced: the existing job is returned instead of creating a new one.
+        """
+        project.ensure_one()
+        if job_type not in self._JOB_HANDLERS:
+            raise UserError(_('Unknown Arkite job type: %s') % job_type)
+
+        # Serialize concurrent enqueues for the same project so two clicks can't both insert.
+        # A transaction-level advisory lock, not the project row lock: a running job holds
+        # that one as soon as it writes the project, and the request would wait for the job.
+        self.env.cr.execute(
+            "SELECT pg_advisory_xact_lock(hashtext(%s), %s)",
+            [self._name, project.id],
+        )
+        existing = self.search([
+            ('project_id', '=', project.id),
+            ('job_type', '=', job_type),
+            ('state', 'in', ('pending', 'running')),
+        ], limit=1)
+        if existing:
+            return existing, False
+
+        job = self.create({
+            'project_id': project.id,
+            'job_type': job_type,
+            'progress_message': _('Queued'),
+        })
+        cron = self.env.ref('product_module.ir_cron_arkite_job_queue', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+        return job, True
+
+    @api.model
+    def _enqueue_patches(self, project, patches, delay=0.0):
+        """Merge PATCH bodies ``{path: body}`` into the pending ``arkite_patches`` job of ``project``.
+
+        ``project`` may be empty (the environment credentials are used). The job is stored
+        with the current transaction, so a rollback drops the edits and a restart keeps
+        them; the cron is woken up ``delay`` seconds later so edits close together are
+        sent as one batch.
+        """
+        # Same advisory lock scheme as _enqueue, with its own key so both don't contend
+        self.env.cr.execute(
+            "SELECT pg_advisory_xact_lock(hashtext(%s), %s)",
+            [f"{self._name}.arkite_patches", project.id or 0],
+        )
+        # Lock the pending job: a worker claiming it meanwhile makes it no longer 'pending'
+        self.env.cr.execute(
+            "SELECT id FROM product_module_arkite_job_queue "
+            "WHERE job_type = 'arkite_patches' AND state = 'pending' AND project_id IS NOT DISTINCT FROM %s "
+            "ORDER BY id LIMIT 1 FOR UPDATE",
+            [project.id or None],
+        )
+        row = self.env.cr.fetchone()
+        job = self.browse(row[0]) if row else self.browse()
+        queued = json.loads(job.payload or '{}') if job else {}
+        for path, body in patches.items():
+            queued.setdefault(path, {}).update(body)
+        if job:
+            job.payload = json.dumps(queued)
+            return job
+        job = self.create({
+            'project_id': project.id,
+            'job_type': 'arkite_patches',
+            'progress_message': _('Queued'),
+            'payload': json.dumps(queued),
+        })
+        cron = self.env.ref('product_module.ir_cron_arkite_job_queue', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger(at=fields.Datetime.add(fields.Datetime.now(), seconds=delay))
+        return job
+
+    # -------------------------------------------------------------------------
+    # Progress reporting
+    # -------------------------------------------------------------------------
+
+    def _report_progress(self, progress, message=None):
+        """Persist progress in a separate transaction so the project form sees it mid-job."""
+        self.ensure_one()
+        progress = max(0, min(100, int(progress or 0)))
+        with self.env.registry.cursor() as cr:
+            cr.execute(
+                "UPDATE product_module_arkite_job_queue "
+                "SET progress = %s, progress_message = COALESCE(%s, progress_message) "
+                "WHERE id = %s",
+                [progress, message, self.id],
+            )
+        self.invalidate_recordset(['progress', 'progress_message'])
+
+    # -------------------------------------------------------------------------
+    # Worker
+    # -------------------------------------------------------------------------
+
+    def _claim_next(self):
+        """Lock and return the oldest pending job, or an empty recordset."""
+        self.env.cr.execute(
+            "SELECT id FROM product_module_arkite_job_queue "
+            "WHERE state = 'pending' "
+            "ORDER BY id "
+            "FOR UPDATE SKIP LOCKED "
+            "LIMIT 1"
+        )
+        row = self.env.cr.fetchone()
+        return self.browse(row[0]) if row else self.browse()
+
+    @api.model
+    def _cron_process_jobs(self, limit=10):
+        """Run up to ``limit`` pending jobs, committing after each one."""
+        # A worker killed mid-job leaves its row 'running'; release it so new requests aren't coalesced forever.
+        stale_date = fields.Datetime.subtract(fields.Datetime.now(), hours=1)
+        self.search([('state', '=', 'running'), ('date_started', '<', stale_date)]).write({
+            'state': 'failed',
+            'progress_message': _('Failed'),
+            'error_message': _('Job did not finish within one hour (worker restarted?).'),
+            'date_finished': fields.Datetime.now(),
+        })
+        self.env.cr.commit()
+
+        for _i in range(limit):
+            job = self._claim_next()
+            if not job:
+                break
+            job.write({
+                'state': 'running',
+                'progress': 0,
+                'date_started': fields.Datetime.now(),
+            })
+            self.env.cr.commit()
+            job._run()
+            self.env.cr.commit()
+
+    def _run(self):
+        self.ensure_one()
+        method_name, label = self._JOB_HANDLERS[self.job_type]
+        project = self.project_id.with_user(self.user_id or self.env.user).with_context(
+            arkite_job_run=True,
+            arkite_job_id=self.id,
+        )
+        args = [json.loads(self.payload)] if self.payload else []
+        _logger.info("[ARKITE JOB] Starting %s (job %s, project %s)", label, self.id, project.id)
+        try:
+            result = getattr(project, method_name)(*args)
+        except Exception as e:
+            self.env.cr.rollback()
+            _logger.error("[ARKITE JOB] %s failed (job %s): %s", label, self.id, e, exc_info=True)
+            self.write({
+                'state': 'failed',
+                'progress_message': _('Failed'),
+                'error_message': str(e) or traceback.format_exc(),
+                'date_finished': fields.Datetime.now(),
+            })
+            return
+
+        message = ''
+        if isinstance(result, dict):
+            message = (result.get('params') or {}).get('message') or ''
+        self.write({
+            'state': 'done',
+            'progress': 100,
+            'progress_message': _('Done'),
+            'result_message': message,
+            'date_finished': fields.Datetime.now(),
+        })
+        _logger.info("[ARKITE JOB] Finished %s (job %s)", label, self.id)
+
+    @api.autovacuum
+    def _gc_finished_jobs(self):
+        """Drop finished jobs older than a week."""
+        limit_date = fields.Datetime.subtract(fields.Datetime.now(), days=7)
+        self.search([
+            ('state', 'in', ('done', 'failed')),
+            ('date_finished', '<', limit_date),
+        ]).unlink()
@@ -1,25 +1,29 @@
 ﻿# product_module/models/arkite_job_step.py
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
-import requests
 import os
 import logging
-import time
-import json
 import re
 
+from ..services.arkite_client import ArkiteClient, find_job_parent_step, is_valid_step_id
+
 _logger = logging.getLogger(__name__)
 
 
 class ArkiteJobStep(models.TransientModel):
     """Temporary model for displaying job steps in tree view"""
     _name = 'product_module.arkite.job.step'
+    _inherit = ['product_module.arkite.write.behind']
     _description = 'Arkite Job Step (Temporary)'
     _order = 'sequence, id'
     _rec_name = 'step_name'  # Use step_name for clean display in parent selection
     # web_hierarchy expects the parent field to be named parent_id by default.
     _parent_name = 'parent_id'
     _parent_store = False
+    # Edits pushed to Arkite (see arkite.write.behind)
+    _arkite_patch_fields = ('step_name', 'step_type', 'sequence', 'for_all_variants', 'parent_id')
+    _arkite_mirror_fields = {'Index': 'index', 'ParentStepId': 'parent_step_id'}
+    _arkite_dirty_fields = ('arkite_job_steps_dirty', 'arkite_hierarchy_dirty')
     
     wizard_id = fields.Many2one('product_module.arkite.job.step.wizard', string='Wizard', ondelete='cascade')
     job_id = fields.Many2one('product_module.type', string='Job', ondelete='cascade')
@@ -568,275 +572,153 @@ class ArkiteJobStep(models.TransientModel):
                     f'" title="{full_level}">{short_level}</span>'
                 )
     
-    @api.model
-    def create(self, vals):
-        """Override create to ensure job_step_id is always set"""
-        # Ensure job_step_id is always set - it's required
-        if 'job_step_id' not in vals or not vals.get('job_step_id'):
-            # Try to get it from step_id as fallback
-            if vals.get('step_id'):
-                vals['job_step_id'] = vals['step_id']
-            # If still not set, try to get from parent
-            elif vals.get('parent_id'):
-                try:
-                    parent = self.env['product_module.arkite.job.step'].browse(vals['parent_id'])
-                    if parent.exists() and parent.job_step_id:
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Create new job steps in Arkite first (one list POST per project), then the records.
+
+        Rows that already carry a ``step_id`` were loaded from Arkite and are created as-is.
+        """
+        pending = {}
+        for vals in vals_list:
+            # Normalize StepType coming from Arkite/UI so it always matches selection keys.
+            if vals.get('step_type'):
+                normalized, raw = self._normalize_step_type_value(vals['step_type'])
+                vals['step_type'] = normalized
+                if raw:
+                    vals['step_type_raw'] = raw
+
+            # Ensure job_step_id is always set - it's required
+            if not vals.get('job_step_id'):
+                # Try to get it from step_id as fallback
+                if vals.get('step_id'):
+                    vals['job_step_id'] = vals['step_id']
+                # If still not set, try to get from parent
+                elif vals.get('parent_id'):
+                    parent = self.browse(vals['parent_id']).exists()
+                    if parent.job_step_id:
                         vals['job_step_id'] = parent.job_step_id
-                except Exception:
-                    pass
-            # If still not set, try to find existing job steps for this project
-            elif vals.get('project_id'):
-                try:
-                    existing = self.env['product_module.arkite.job.step'].search([
-                        ('project_id', '=', vals['project_id'])
-                    ], limit=1, order='id desc')
-                    if existing and existing.job_step_id:
+                # If still not set, try to find existing job steps for this project
+                elif vals.get('project_id'):
+                    existing = self.search([('project_id', '=', vals['project_id'])], limit=1, order='id desc')
+                    if existing.job_step_id:
                         vals['job_step_id'] = existing.job_step_id
-                except Exception:
-                    pass
-        
-        # If still not set and we're creating a new step (not loading from Arkite), 
-        # we'll set it after creating the step in Arkite
-        # Don't raise error yet - let the Arkite creation logic handle it
-        
-        # If step_id is not provided, create the step in Arkite first
-        if not vals.get('step_id'):
-            # Create new step in Arkite
-            try:
-                project_id = None
-                if vals.get('project_id'):
-                    project = self.env['product_module.project'].browse(vals['project_id'])
-                    if project and project.arkite_project_id:
-                        project_id = project.arkite_project_id
-                
-                if not project_id:
+            # Otherwise it is set from the step created in Arkite below
+
+            if not vals.get('step_id'):
+                project = self.env['product_module.project'].browse(vals.get('project_id'))
+                if not project.arkite_project_id:
                     raise UserError("Project must have an Arkite project ID to create steps.")
-                
-                # Get credentials
-                api_base = os.getenv('ARKITE_API_BASE')
-                api_key = os.getenv('ARKITE_API_KEY')
-                
-                if vals.get('project_id'):
-                    try:
-                        project = self.env['product_module.project'].browse(vals['project_id'])
-                        if project:
-                            creds = project._get_arkite_credentials()
-                            api_base = creds['api_base']
-                            api_key = creds['api_key']
-                    except Exception:
-                        pass
-                
-                if not api_base or not api_key:
-                    raise UserError("Arkite API configuration is missing.")
-                
-                # Determine parent step ID - job steps MUST have a valid parent
-                parent_step_id = None
-                
-                # Helper function to validate step ID
-                def is_valid_step_id(step_id):
-                    """Check if step ID is valid (not None, 0, empty, or "0")"""
-                    if not step_id:
-                        return False
-                    step_id_str = str(step_id).strip()
-                    return step_id_str != "" and step_id_str != "0" and step_id_str.lower() != "none"
-                
-                # First, try to get parent from parent_id
-                if vals.get('parent_id'):
-                    try:
-                        parent = self.env['product_module.arkite.job.step'].browse(vals['parent_id'])
-                        if parent.exists() and parent.step_id and is_valid_step_id(parent.step_id):
-                            if parent.step_type == 'COMPOSITE':
-                                parent_step_id = str(parent.step_id).strip()
-                                _logger.info("[ARKITE] Using COMPOSITE parent step %s for new job step", parent_step_id)
-                            else:
-                                _logger.warning("[ARKITE] Parent step %s is not COMPOSITE, will auto-detect", parent.step_id)
-                        elif parent.exists() and parent.step_id:
-                            _logger.warning("[ARKITE] Parent step ID %s is invalid, will auto-detect", parent.step_id)
-                    except Exception as e:
-                        _logger.warning("[ARKITE] Error getting parent step: %s", e)
-                
-                # If no valid parent found, auto-detect from existing steps (like the wizard does)
-                if not parent_step_id or not is_valid_step_id(parent_step_id):
-                    _logger.info("[ARKITE] Auto-detecting parent step from existing job steps...")
-                    try:
-                        url_check = f"{api_base}/projects/{project_id}/steps/"
-                        params_check = {"apiKey": api_key}
-                        headers_check = {"Content-Type": "application/json"}
-                        check_response = requests.get(url_check, params=params_check, headers=headers_check, verify=False, timeout=10)
-                        if check_response.ok:
-                            all_steps = check_response.json()
-                            if isinstance(all_steps, list) and all_steps:
-                                # Filter for job steps (Type="Job" or ProcessId="0")
-                                job_steps = [s for s in all_steps 
-                                           if s.get("Type") == "Job" or 
-                                           (not s.get("ProcessId") or str(s.get("ProcessId", "")) == "0")]
-                                
-                                if job_steps:
-                                    # Priority 1: Find root COMPOSITE step (Type="Job", StepType="COMPOSITE", no parent)
-                                    for step in job_steps:
-                                        step_id = step.get("Id")
-                                        if (step.get("Type") == "Job" and 
-                                            step.get("StepType") == "COMPOSITE" and
-                                            is_valid_step_id(step_id) and
-                                            (not step.get("ParentStepId") or 
-                                             str(step.get("ParentStepId", "")) == "0")):
-                                            parent_step_id = str(step_id).strip()
-                                            _logger.info("[ARKITE] Auto-detected root COMPOSITE step %s as parent", parent_step_id)
-                                            break
-                                    
-                                    # Priority 2: If no COMPOSITE found, use any COMPOSITE step
-                                    if not parent_step_id or not is_valid_step_id(parent_step_id):
-                                        for step in job_steps:
-                                            step_id = step.get("Id")
-                                            if step.get("StepType") == "COMPOSITE" and is_valid_step_id(step_id):
-                                                parent_step_id = str(step_id).strip()
-                                                _logger.info("[ARKITE] Found COMPOSITE step %s to use as parent", parent_step_id)
-                                                break
-                                    
-                                    # Priority 3: Fallback to any root job step
-                                    if not parent_step_id or not is_valid_step_id(parent_step_id):
-                                        for step in job_steps:
-                                            step_id = step.get("Id")
-                                            if (is_valid_step_id(step_id) and
-                                                (not step.get("ParentStepId") or str(step.get("ParentStepId", "")) == "0")):
-                                                parent_step_id = str(step_id).strip()
-                                                _logger.info("[ARKITE] Using root job step %s as parent (fallback)", parent_step_id)
-                                                break
-                                    
-                                    # Priority 4: Last resort - use any job step
-                                    if not parent_step_id or not is_valid_step_id(parent_step_id):
-                                        for step in job_steps:
-                                            step_id = step.get("Id")
-                                            if is_valid_step_id(step_id):
-                                                parent_step_id = str(step_id).strip()
-                                                _logger.info("[ARKITE] Using job step %s as parent (last resort)", parent_step_id)
-                                                break
-                                else:
-                                    _logger.warning("[ARKITE] No job steps found in project")
-                            else:
-                                _logger.warning("[ARKITE] No steps found in project or invalid response format")
-                        else:
-                            _logger.warning("[ARKITE] Failed to fetch steps: HTTP %s", check_response.status_code)
-                    except Exception as e:
-                        _logger.error("[ARKITE] Error auto-detecting parent step: %s", e, exc_info=True)
-                
-                # Build step payload for job step
-                step_data = {
-                    "Type": "Job",  # Job steps have Type="Job"
-                    "Name": vals.get('step_name', 'Unnamed Step'),
-                    "StepType": vals.get('step_type', 'WORK_INSTRUCTION'),
-                    "ProcessId": "0",  # Job steps have ProcessId="0"
-                    "Index": vals.get('sequence', 0) // 10 if vals.get('sequence', 0) > 0 else 0,
-                    "ForAllVariants": vals.get('for_all_variants', False),
-                    "VariantIds": [],
-                    "TextInstruction": {},
-                    "ImageInstructionId": "0",
-                    "ChildStepOrder": "None" if vals.get('step_type') != "COMPOSITE" else "Sequential",
-                    "StepControlflow": "None",
-                    "StepConditions": [],
-                    "Comment": None
-                }
-                
-                # CRITICAL: Arkite REQUIRES ParentStepId for job steps - we must ALWAYS set it to a valid ID
-                # Validate that we have a valid parent step ID
-                if not parent_step_id or not is_valid_step_id(parent_step_id):
-                    raise UserError(_(
-                        "Cannot create job step: No valid parent step found.\n\n"
-                        "Please ensure:\n"
-                        "1. There is at least one existing job step in the project\n"
-                        "2. Or create a COMPOSITE step first in Arkite UI\n"
-                        "3. Or specify a valid Parent Step ID manually"
-                    ))
-                
-                # ALWAYS set ParentStepId - Arkite requires it for job steps
-                step_data["ParentStepId"] = str(parent_step_id).strip()
-                _logger.info("[ARKITE] Setting ParentStepId to %s", step_data["ParentStepId"])
-                
-                # Create step in Arkite
-                url = f"{api_base}/projects/{project_id}/steps/"
-                params = {"apiKey": api_key}
-                headers = {"Content-Type": "application/json"}
-                
-                # Final verification - ensure ParentStepId is valid and not "0"
-                if "ParentStepId" not in step_data:
-                    raise UserError(_("ParentStepId is required for job steps but was not set. This should not happen."))
-                
-                parent_id_value = step_data["ParentStepId"]
-                if not is_valid_step_id(parent_id_value):
-                    raise UserError(_("Invalid ParentStepId: '%s'. Cannot create job step with invalid parent.") % parent_id_value)
-                
-                # Log the final payload (for debugging)
-                payload_summary = {k: v for k, v in step_data.items() if k not in ["TextInstruction", "StepConditions"]}
-                _logger.info("[ARKITE] Creating job step - Name: '%s', ParentStepId: '%s'", step_data.get("Name"), parent_id_value)
-                _logger.debug("[ARKITE] Full payload: %s", json.dumps(payload_summary, indent=2))
-                
-                response = requests.post(url, params=params, json=[step_data], headers=headers, verify=False, timeout=10)
-                
-                step_created = False
-                created_step_id = None
-                
-                if response.ok:
-                    created_steps = response.json()
-                    if isinstance(created_steps, list) and created_steps:
-                        created_step_id = created_steps[0].get("Id", "Unknown")
-                        step_created = True
-                    elif isinstance(created_steps, dict):
-                        created_step_id = created_steps.get("Id", "Unknown")
-                        step_created = True
-                else:
-                    # Check if step was created despite error (API bug)
-                    _logger.warning("[ARKITE] API returned error, checking if step was created...")
-                    time.sleep(1)
-                    verify_response = requests.get(url, params=params, headers=headers, verify=False, timeout=10)
-                    if verify_response.ok:
-                        all_steps = verify_response.json()
-                        matching_steps = [s for s in all_steps 
-                                         if s.get("Name") == step_data["Name"] 
-                                         and str(s.get("ProcessId", "")) == "0"]
-                        if matching_steps:
-                            created_step_id = matching_steps[0].get("Id", "Unknown")
-                            step_created = True
-                            _logger.info("[ARKITE] Step was created successfully despite API error (ID: %s)", created_step_id)
-                
-                if step_created:
-                    vals['step_id'] = str(created_step_id)
-                    # Ensure required job_step_id is set when creating a new root step
-                    # (fresh projects may have no existing job_step_id to inherit).
-                    if not vals.get('job_step_id'):
-                        vals['job_step_id'] = vals['step_id']
-                    # Get actual index
-                    verify_response = requests.get(url, params=params, headers=headers, verify=False, timeout=10)
-                    if verify_response.ok:
-                        steps = verify_response.json()
-                        new_step = next((s for s in steps if str(s.get("Id", "")) == str(created_step_id)), None)
-                        if new_step:
-                            vals['index'] = new_step.get("Index", 0)
-                else:
-                    error_text = response.text[:500] if response.text else "Unknown error"
-                    raise UserError(f"Failed to create job step in Arkite: HTTP {response.status_code}\n{error_text}")
-                    
-            except UserError:
-                raise
-            except Exception as e:
-                _logger.error("[ARKITE] Error creating job step: %s", e, exc_info=True)
-                raise UserError(f"Error creating job step in Arkite: {str(e)}")
-        
-        # Create the record (either with existing step_id or newly created one)
-        record = super().create(vals)
-        
+                pending.setdefault(project, []).append(vals)
+
+        for project, project_vals in pending.items():
+            self._arkite_create_job_steps(project, project_vals)
+
+        records = super().create(vals_list)
+
         # Force recomputation of hierarchical_level and hierarchy_css_class after creation
-        if record.project_id:
+        for project in records.project_id:
             # Invalidate first, then recompute for all records in the project
-            all_records = self.env['product_module.arkite.job.step'].search([
-                ('project_id', '=', record.project_id.id)
-            ])
+            all_records = self.search([('project_id', '=', project.id)])
             all_records.invalidate_recordset(['hierarchical_level', 'parent_step_name', 'hierarchy_css_class', 'hierarchical_level_html'])
             all_records._compute_hierarchical_level()
             all_records._compute_parent_step_name()
             all_records._compute_hierarchy_css_class()
             all_records._compute_hierarchical_level_html()
-        
-        return record
+
+        return records
+
+    @api.model
+    def _arkite_create_job_steps(self, project, vals_list):
+        """POST the job steps of ``vals_list`` to ``project`` in one request.
+
+        Job steps need a parent: a COMPOSITE ``parent_id`` when given, else the parent
+        auto-detected from one read of the project's steps. Fills ``step_id``,
+        ``job_step_id`` and ``index`` into each ``vals`` from the created steps.
+        """
+        api_base = os.getenv('ARKITE_API_BASE')
+        api_key = os.getenv('ARKITE_API_KEY')
+        try:
+            creds = project._get_arkite_credentials()
+            api_base = creds['api_base']
+            api_key = creds['api_key']
+        except Exception:
+            pass
+        if not api_base or not api_key:
+            raise UserError("Arkite API configuration is missing.")
+        client = ArkiteClient(api_base=api_base, api_key=api_key, verify_ssl=False, timeout_sec=20)
+        project_id = project.arkite_project_id
+
+        existing_steps = None  # read once, only if a step needs an auto-detected parent
+        known_ids = None  # Ids from before the POST; create_steps reads them if we didn't
+        default_parent = None
+        payloads = []
+        for vals in vals_list:
+            parent_step_id = None
+            parent = self.browse(vals.get('parent_id')).exists()
+            if parent:
+                if parent.step_type == 'COMPOSITE' and is_valid_step_id(parent.step_id):
+                    parent_step_id = str(parent.step_id).strip()
+                else:
+                    _logger.warning("[ARKITE] Parent step %s is not a valid COMPOSITE step, will auto-detect", parent.step_id)
+            if not parent_step_id:
+                if existing_steps is None:
+                    try:
+                        existing_steps = client.list_project_steps(project_id)
+                        known_ids = [s.get("Id") for s in existing_steps]
+                    except Exception as e:
+                        _logger.error("[ARKITE] Error auto-detecting parent step: %s", e, exc_info=True)
+                        existing_steps = []
+                    default_parent = find_job_parent_step(existing_steps)
+                    _logger.info("[ARKITE] Auto-detected parent step %s for new job steps", default_parent)
+                parent_step_id = default_parent
+
+            # CRITICAL: Arkite REQUIRES ParentStepId for job steps
+            if not parent_step_id:
+                raise UserError(_(
+                    "Cannot create job step: No valid parent step found.\n\n"
+                    "Please ensure:\n"
+                    "1. There is at least one existing job step in the project\n"
+                    "2. Or create a COMPOSITE step first in Arkite UI\n"
+                    "3. Or specify a valid Parent Step ID manually"
+                ))
+            payloads.append(self._arkite_job_step_payload(vals, parent_step_id))
+
+        _logger.info("[ARKITE] Creating %s job step(s) in project %s", len(payloads), project_id)
+        try:
+            created = client.create_steps(project_id, payloads, known_ids=known_ids)
+        except Exception as e:
+            _logger.error("[ARKITE] Error creating job steps: %s", e, exc_info=True)
+            raise UserError(f"Error creating job step in Arkite: {str(e)}")
+
+        for vals, step in zip(vals_list, created):
+            if not step:
+                raise UserError(f"Failed to create job step '{vals.get('step_name', 'Unnamed Step')}' in Arkite.")
+            vals['step_id'] = str(step.get("Id"))
+            # Fresh projects may have no existing job_step_id to inherit
+            if not vals.get('job_step_id'):
+                vals['job_step_id'] = vals['step_id']
+            vals['index'] = step.get("Index", 0)
+
+    @api.model
+    def _arkite_job_step_payload(self, vals, parent_step_id):
+        """Arkite payload for a new job step built from create ``vals``."""
+        sequence = vals.get('sequence', 0)
+        return {
+            "Type": "Job",  # Job steps have Type="Job"
+            "Name": vals.get('step_name', 'Unnamed Step'),
+            "StepType": vals.get('step_type', 'WORK_INSTRUCTION'),
+            "ProcessId": "0",  # Job steps have ProcessId="0"
+            "Index": sequence // 10 if sequence > 0 else 0,
+            "ForAllVariants": vals.get('for_all_variants', False),
+            "VariantIds": [],
+            "TextInstruction": {},
+            "ImageInstructionId": "0",
+            "ChildStepOrder": "None" if vals.get('step_type') != "COMPOSITE" else "Sequential",
+            "StepControlflow": "None",
+            "StepConditions": [],
+            "Comment": None,
+            "ParentStepId": parent_step_id,
+        }
     
     def write(self, vals):
         """Override write to sync changes back to Arkite"""
@@ -848,6 +730,10 @@ class ArkiteJobStep(models.TransientModel):
             if raw:
                 vals['step_type_raw'] = raw
 
+        # Skip Arkite sync if context flag is set (to prevent infinite loops) or when user is editing in a staged UI.
+        sync = not (self.env.context.get('skip_arkite_sync') or self.env.context.get('defer_arkite_sync'))
+        snapshot = self._arkite_snapshot(vals) if sync else ([], {})
+
         result = super().write(vals)
 
         # If the user is editing in "deferred sync" mode (hierarchy/diagram screens), mark project dirty.
@@ -901,87 +787,38 @@ class ArkiteJobStep(models.TransientModel):
                     # The fields will be recomputed on next read
                     _logger.warning("[HIERARCHY] Could not recompute levels during write: %s", e)
         
-        # Skip Arkite sync if context flag is set (to prevent infinite loops) or when user is editing in a staged UI.
-        if self.env.context.get('skip_arkite_sync') or self.env.context.get('defer_arkite_sync'):
+        if not sync:
             return result
-        
-        # Sync to Arkite if relevant fields changed
-        sync_fields = ['step_name', 'step_type', 'sequence', 'for_all_variants', 'parent_id']
-        if any(field in vals for field in sync_fields):
-            for record in self:
-                if not record.step_id or not record.project_id:
-                    continue
-                
-                try:
-                    project = record.project_id
-                    if not project.arkite_project_id:
-                        continue
-                    
-                    creds = project._get_arkite_credentials()
-                    api_base = creds['api_base']
-                    api_key = creds['api_key']
-                    
-                    # Get current step data from Arkite
-                    url = f"{api_base}/projects/{project.arkite_project_id}/steps/{record.step_id}/"
-                    params = {"apiKey": api_key}
-                    headers = {"Content-Type": "application/json"}
-                    
-                    response = requests.get(url, params=params, headers=headers, verify=False, timeout=10)
-                    if not response.ok:
-                        _logger.warning("[ARKITE] Could not fetch step %s for update", record.step_id)
-                        continue
-                    
-                    step_data = response.json()
-                    
-                    # Update fields that changed
-                    if 'step_name' in vals:
-                        step_data["Name"] = record.step_name
-                    if 'step_type' in vals:
-                        step_data["StepType"] = record.step_type
-                        step_data["ChildStepOrder"] = "Sequential" if record.step_type == "COMPOSITE" else "None"
-                    if 'sequence' in vals:
-                        # Convert sequence to Index (sequence is typically multiples of 10, Index is the actual order)
-                        new_index = record.sequence // 10 if record.sequence > 0 else 0
-                        old_index = step_data.get("Index", 0)
-                        _logger.info("[ARKITE] Job step %s sequence changed: %s -> Index %s (was %s)", record.step_id, record.sequence, new_index, old_index)
-                        step_data["Index"] = new_index
-                    if 'for_all_variants' in vals:
-                        step_data["ForAllVariants"] = record.for_all_variants
-                    if 'parent_id' in vals:
-                        if record.parent_id and record.parent_id.step_id:
-                            step_data["ParentStepId"] = record.parent_id.step_id
-                        else:
-                            # Remove ParentStepId or set to "0" for root steps
-                            if "ParentStepId" in step_data:
-                                del step_data["ParentStepId"]
-                    
-                    # Update step in Arkite
-                    _logger.info("[ARKITE] Patching job step %s with data: %s", record.step_id, {k: v for k, v in step_data.items() if k in ['Name', 'StepType', 'Index', 'ParentStepId']})
-                    patch_response = requests.patch(url, params=params, headers=headers, json=step_data, verify=False, timeout=10)
-                    if patch_response.ok:
-                        _logger.info("[ARKITE] Successfully updated job step %s in Arkite", record.step_id)
-                        # Update index from response
-                        updated_data = patch_response.json()
-                        if isinstance(updated_data, dict) and updated_data.get("Index") is not None:
-                            record.index = updated_data.get("Index", 0)
-                    else:
-                        _logger.warning("[ARKITE] Failed to update step %s: HTTP %s", record.step_id, patch_response.status_code)
-                        
-                except Exception as e:
-                    _logger.warning("[ARKITE] Error syncing job step %s to Arkite: %s", record.step_id, e)
-        
+
+        # Queue the changed fields for Arkite (see arkite.write.behind); index follows once sent
+        self._arkite_queue_changes(snapshot)
+
         return result
 
-    @api.model
-    def create(self, vals):
-        # Normalize StepType coming from Arkite/UI so it always matches selection keys.
-        if vals.get('step_type'):
-            original = vals.get('step_type')
-            normalized, raw = self._normalize_step_type_value(original)
-            vals['step_type'] = normalized
-            if raw:
-                vals['step_type_raw'] = raw
-        return super().create(vals)
+    def _arkite_patch_target(self):
+        self.ensure_one()
+        project = self.project_id
+        if not self.step_id or not project.arkite_project_id:
+            return None
+        return project, project.arkite_project_id, f"steps/{self.step_id}/"
+
+    def _arkite_patch_values(self, field_names):
+        self.ensure_one()
+        values = {}
+        if 'step_name' in field_names:
+            values["Name"] = self.step_name
+        if 'step_type' in field_names:
+            values["StepType"] = self.step_type
+            values["ChildStepOrder"] = "Sequential" if self.step_type == "COMPOSITE" else "None"
+        if 'sequence' in field_names:
+            # Convert sequence to Index (sequence is typically multiples of 10, Index is the actual order)
+            values["Index"] = self.sequence // 10 if self.sequence > 0 else 0
+        if 'for_all_variants' in field_names:
+            values["ForAllVariants"] = self.for_all_variants
+        if 'parent_id' in field_names:
+            # "0" makes it a root step
+            values["ParentStepId"] = self.parent_id.step_id or "0"
+        return values
 
     @api.model
     def _normalize_step_type_value(self, value):
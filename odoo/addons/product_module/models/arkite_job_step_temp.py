@@ -4,17 +4,29 @@ from odoo.exceptions import UserError
 import requests
 import os
 import logging
-import time
+
+from ..services.arkite_client import ArkiteClient, find_job_parent_step, is_valid_step_id
 
 _logger = logging.getLogger(__name__)
 
+# Step types that take a DetectionId
+DETECTION_STEP_TYPES = (
+    'TOOL_PLACING', 'TOOL_TAKING', 'OBJECT_PLACING', 'OBJECT_TAKING',
+    'PICKING_BIN_PLACING', 'PICKING_BIN_TAKING', 'ACTIVITY',
+    'CHECK_NO_CHANGE_ZONE', 'VIRTUAL_BUTTON_PRESS', 'MATERIAL_GRAB',
+)
+
 
 class ArkiteJobStepTemp(models.TransientModel):
     """Temporary model for displaying job steps in tree view"""
     _name = 'product_module.arkite.job.step.temp'
+    _inherit = ['product_module.arkite.write.behind']
     _description = 'Arkite Job Step (Temporary)'
     _order = 'sequence, id'
     _rec_name = 'step_name'
+    # Edits pushed to Arkite (see arkite.write.behind)
+    _arkite_patch_fields = ('sequence',)
+    _arkite_mirror_fields = {'Index': 'index'}
     
     wizard_id = fields.Many2one('product_module.arkite.job.step.wizard', string='Wizard', ondelete='cascade')
     job_id = fields.Many2one('product_module.type', string='Job', ondelete='cascade')
@@ -57,224 +69,140 @@ class ArkiteJobStepTemp(models.TransientModel):
         help='Variants assigned to this step (leave empty for all variants)'
     )
     
-    @api.model
-    def create(self, vals):
-        """Override create to create step in Arkite if step_id is empty (new step)"""
-        # If step_id is provided, it's a loaded step - just create the record
-        if vals.get('step_id'):
-            return super().create(vals)
-        
-        # Get project ID from either wizard or job
-        project_id = None
-        if vals.get('wizard_id'):
-            wizard = self.env['product_module.arkite.job.step.wizard'].browse(vals.get('wizard_id'))
-            if wizard and wizard.project_id:
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Create new steps in Arkite (one list POST per project) before creating the records.
+
+        Rows with a ``step_id`` were loaded from Arkite and are created as-is.
+        """
+        pending = {}
+        for vals in vals_list:
+            if vals.get('step_id'):
+                continue
+            # Get project ID from either wizard or job
+            project_id = None
+            if vals.get('wizard_id'):
+                wizard = self.env['product_module.arkite.job.step.wizard'].browse(vals['wizard_id'])
                 project_id = wizard.project_id
-        elif vals.get('job_id'):
-            job = self.env['product_module.type'].browse(vals.get('job_id'))
-            if job and job.arkite_project_id:
+            elif vals.get('job_id'):
+                job = self.env['product_module.type'].browse(vals['job_id'])
                 project_id = job.arkite_project_id
-        
-        if not project_id:
-            raise UserError("Please load a project first")
-        
-        # Use the wizard's action_add_step logic to create the step
-        # We'll create the step via API and then update vals with the returned step_id
-        api_base = os.getenv('ARKITE_API_BASE')
-        api_key = os.getenv('ARKITE_API_KEY')
-        
-        if not api_base or not api_key:
-            raise UserError("Arkite API configuration is missing.")
-        
-        # Build step payload
+            if not project_id:
+                raise UserError("Please load a project first")
+            pending.setdefault(project_id, []).append(vals)
+
+        if pending:
+            api_base = os.getenv('ARKITE_API_BASE')
+            api_key = os.getenv('ARKITE_API_KEY')
+            if not api_base or not api_key:
+                raise UserError("Arkite API configuration is missing.")
+            client = ArkiteClient(api_base=api_base, api_key=api_key, verify_ssl=False, timeout_sec=20)
+            for project_id, project_vals in pending.items():
+                self._arkite_create_steps(client, project_id, project_vals)
+        return super().create(vals_list)
+
+    @api.model
+    def _arkite_create_steps(self, client, project_id, vals_list):
+        """POST the steps of ``vals_list`` to Arkite project ``project_id`` in one request.
+
+        Steps without a Parent Step ID get the root composite (or first job step), detected
+        from a single read of the project's steps. Fills ``step_id`` / ``index`` into each ``vals``.
+        """
+        existing_steps = None
+        known_ids = None  # Ids from before the POST; create_steps reads them if we didn't
+        default_parent = None
+        payloads = []
+        for vals in vals_list:
+            parent_step_id = (vals.get('parent_step_id') or '').strip()
+            if not is_valid_step_id(parent_step_id):
+                if existing_steps is None:
+                    try:
+                        existing_steps = client.list_project_steps(project_id)
+                        known_ids = [s.get("Id") for s in existing_steps]
+                    except Exception as e:
+                        _logger.error("Error auto-detecting parent step: %s", e)
+                        existing_steps = []
+                    default_parent = find_job_parent_step(existing_steps)
+                    _logger.info("[ARKITE] Auto-detected parent step for new job steps: %s", default_parent)
+                parent_step_id = default_parent
+            payloads.append(self._arkite_step_payload(vals, parent_step_id))
+
+        _logger.info("[ARKITE] Creating %s job step(s) in project %s", len(payloads), project_id)
+        try:
+            created = client.create_steps(project_id, payloads, known_ids=known_ids)
+        except Exception as e:
+            _logger.error("Error creating step in Arkite: %s", e)
+            raise UserError(f"Error creating step: {str(e)}")
+
+        for vals, step in zip(vals_list, created):
+            if not step:
+                raise UserError(f"Failed to create step '{vals.get('step_name', 'Unnamed Step')}' in Arkite.")
+            vals['step_id'] = str(step.get("Id"))
+            vals['index'] = step.get("Index", vals.get('sequence', 0))
+
+    @api.model
+    def _arkite_step_payload(self, vals, parent_step_id):
+        """Arkite payload for a new job step built from create ``vals``."""
+        step_type = vals.get('step_type', 'WORK_INSTRUCTION')
+        sequence = vals.get('sequence', 0)
         step_data = {
             "Type": "Job",
             "Name": vals.get('step_name', 'Unnamed Step'),
-            "StepType": vals.get('step_type', 'WORK_INSTRUCTION'),
+            "StepType": step_type,
             "ProcessId": "0",
-            "Index": vals.get('sequence', 0) if vals.get('sequence', 0) > 0 else 0,
+            "Index": sequence if sequence > 0 else 0,
             "ForAllVariants": True,
             "VariantIds": [],
             "TextInstruction": {},
             "ImageInstructionId": "0",
-            "ChildStepOrder": "None" if vals.get('step_type') != "COMPOSITE" else "Sequential",
+            "ChildStepOrder": "None" if step_type != "COMPOSITE" else "Sequential",
             "StepControlflow": "None",
             "StepConditions": [],
             "Comment": None
         }
-        
-        # Handle parent step - only set if we have a valid parent ID
-        parent_step_id = None
-        if vals.get('parent_step_id'):
-            parent_val = vals['parent_step_id']
-            if isinstance(parent_val, str) and parent_val.strip() and parent_val.strip() != "0":
-                parent_step_id = parent_val.strip()
-        
-        # Auto-detect parent if not provided
-        if not parent_step_id:
-            try:
-                url = f"{api_base}/projects/{project_id}/steps/"
-                params = {"apiKey": api_key}
-                headers = {"Content-Type": "application/json"}
-                response = requests.get(url, params=params, headers=headers, verify=False, timeout=10)
-                if response.ok:
-                    existing_steps = response.json()
-                    if isinstance(existing_steps, list) and existing_steps:
-                        job_steps = [s for s in existing_steps if s.get("Type") == "Job" or not s.get("ProcessId") or s.get("ProcessId") == "0"]
-                        if job_steps:
-                            # Find root composite or first job step
-                            root_composite = next((s.get("Id") for s in job_steps if s.get("StepType") == "COMPOSITE" and (not s.get("ParentStepId") or s.get("ParentStepId") == "0" or str(s.get("ParentStepId")) == "0")), None)
-                            if root_composite:
-                                parent_step_id = str(root_composite)
-                                _logger.info("[ARKITE] Auto-detected root composite as parent: %s", parent_step_id)
-                            else:
-                                # Use first job step as parent
-                                first_step_id = job_steps[0].get("Id", "")
-                                if first_step_id and str(first_step_id) != "0":
-                                    parent_step_id = str(first_step_id)
-                                    _logger.info("[ARKITE] Auto-detected first job step as parent: %s", parent_step_id)
-            except Exception as e:
-                _logger.error("Error auto-detecting parent step: %s", e)
-        
-        # Only add ParentStepId to payload if we have a valid parent ID (not "0" or empty)
-        if parent_step_id and str(parent_step_id) != "0" and str(parent_step_id).strip():
-            step_data["ParentStepId"] = str(parent_step_id).strip()
-            _logger.info("[ARKITE] Setting ParentStepId to: %s", step_data["ParentStepId"])
-        else:
-            _logger.info("[ARKITE] No valid parent step found, omitting ParentStepId (creating as root step)")
-            # Explicitly ensure ParentStepId is not in the payload
-            if "ParentStepId" in step_data:
-                del step_data["ParentStepId"]
-        
+        # Only send ParentStepId when we have a valid parent (otherwise a root step is created)
+        if parent_step_id:
+            step_data["ParentStepId"] = parent_step_id
+
         # Add optional fields
-        if vals.get('step_instruction') and vals.get('step_type') == 'WORK_INSTRUCTION':
+        if vals.get('step_instruction') and step_type == 'WORK_INSTRUCTION':
             step_data["TextInstruction"] = {"en-US": vals['step_instruction']}
-        
-        if vals.get('detection_id'):
-            step_data["DetectionId"] = vals['detection_id']
-        if vals.get('material_id'):
-            step_data["MaterialId"] = vals['material_id']
-        if vals.get('button_id'):
-            step_data["ButtonId"] = vals['button_id']
-        
-        # Create step in Arkite (API expects an array)
-        url = f"{api_base}/projects/{project_id}/steps/"
-        params = {"apiKey": api_key}
-        headers = {"Content-Type": "application/json"}
-        
-        # Log the payload before sending
-        _logger.info("[ARKITE] Creating job step with payload: %s", step_data)
-        
-        try:
-            # API expects an array of steps
-            response = requests.post(url, params=params, json=[step_data], headers=headers, verify=False, timeout=10)
-            
-            # IMPORTANT: Arkite API has a bug - it creates the step successfully but returns 500 error
-            step_created = False
-            created_step_id = None
-            
-            if response.ok:
-                created_steps = response.json()
-                if isinstance(created_steps, list) and created_steps:
-                    created_step_id = created_steps[0].get("Id", "Unknown")
-                    step_created = True
-                elif isinstance(created_steps, dict):
-                    created_step_id = created_steps.get("Id", "Unknown")
-                    step_created = True
-            else:
-                # Even if we get an error, check if step was created (API bug)
-                _logger.warning("[ARKITE] API returned error, but checking if step was created anyway...")
-                time.sleep(1)
-                
-                # Verify by fetching steps
-                verify_response = requests.get(url, params=params, headers=headers, verify=False, timeout=10)
-                if verify_response.ok:
-                    all_steps = verify_response.json()
-                    parent_id = step_data.get("ParentStepId", "")
-                    matching_steps = [s for s in all_steps 
-                                     if s.get("Name") == step_data["Name"] 
-                                     and str(s.get("ParentStepId", "")) == str(parent_id)]
-                    if matching_steps:
-                        created_step_id = matching_steps[0].get("Id", "Unknown")
-                        step_created = True
-                        _logger.info("[ARKITE] Step was created successfully despite API error (ID: %s)", created_step_id)
-            
-            if step_created:
-                vals['step_id'] = str(created_step_id)
-                # Get the actual index from the created step
-                verify_response = requests.get(url, params=params, headers=headers, verify=False, timeout=10)
-                if verify_response.ok:
-                    steps = verify_response.json()
-                    new_step = next((s for s in steps if str(s.get("Id", "")) == str(created_step_id)), None)
-                    if new_step:
-                        vals['index'] = new_step.get("Index", vals.get('sequence', 0))
-            else:
-                error_text = response.text[:500] if response.text else "Unknown error"
-                raise UserError(f"Failed to create step: HTTP {response.status_code}\n{error_text}")
-        except UserError:
-            raise
-        except Exception as e:
-            _logger.error("Error creating step in Arkite: %s", e)
-            raise UserError(f"Error creating step: {str(e)}")
-        
-        return super().create(vals)
+        if vals.get('detection_id') and step_type in DETECTION_STEP_TYPES:
+            step_data["DetectionId"] = vals['detection_id'].strip()
+        if vals.get('material_id') and step_type == 'MATERIAL_GRAB':
+            step_data["MaterialId"] = vals['material_id'].strip()
+        if vals.get('button_id') and step_type == 'VIRTUAL_BUTTON_PRESS':
+            step_data["ButtonId"] = vals['button_id'].strip()
+        return step_data
     
     def write(self, vals):
-        """Override write to save sequence changes to Arkite API"""
+        """Override write to queue sequence changes for Arkite (see arkite.write.behind)"""
+        snapshot = self._arkite_snapshot(vals)
         result = super().write(vals)
-        
-        for record in self:
-            # Get project ID from either wizard, project, or job's project
-            project_id = None
-            if record.wizard_id and record.wizard_id.project_id:
-                project_id = record.wizard_id.project_id
-            elif record.project_id and record.project_id.arkite_project_id:
-                project_id = record.project_id.arkite_project_id
-            elif record.job_id:
-                # Try to get from job's project
-                project = self.env['product_module.project'].search([
-                    ('job_ids', 'in', [record.job_id.id])
-                ], limit=1)
-                if project and project.arkite_project_id:
-                    project_id = project.arkite_project_id
-            
-            if not project_id:
-                continue
-            
-            # Update sequence/index if changed
-            if 'sequence' in vals and record.step_id:
-                api_base = os.getenv('ARKITE_API_BASE')
-                api_key = os.getenv('ARKITE_API_KEY')
-                
-                if not api_base or not api_key:
-                    continue
-                
-                try:
-                    url = f"{api_base}/projects/{record.wizard_id.project_id}/steps/{record.step_id}"
-                    params = {"apiKey": api_key}
-                    headers = {"Content-Type": "application/json"}
-                    
-                    # Get current step
-                    response = requests.get(url, params=params, headers=headers, verify=False, timeout=10)
-                    if not response.ok:
-                        continue
-                    
-                    step_data = response.json()
-                    new_index = record.sequence
-                    if step_data.get("Index") != new_index:
-                        step_data["Index"] = new_index
-                        patch_response = requests.patch(url, params=params, headers=headers, json=step_data, verify=False, timeout=10)
-                        if patch_response.ok:
-                            # Verify update
-                            time.sleep(0.3)
-                            verify_response = requests.get(url, params=params, headers=headers, verify=False, timeout=10)
-                            if verify_response.ok:
-                                updated_data = verify_response.json()
-                                record.index = updated_data.get("Index", record.sequence)
-                except Exception as e:
-                    _logger.error("Error updating job step sequence: %s", e)
-        
+        self._arkite_queue_changes(snapshot)
         return result
+
+    def _arkite_patch_target(self):
+        self.ensure_one()
+        if not self.step_id:
+            return None
+        # Get project ID from either wizard, project, or job's project
+        project_id = None
+        if self.wizard_id and self.wizard_id.project_id:
+            project_id = self.wizard_id.project_id
+        elif self.project_id and self.project_id.arkite_project_id:
+            project_id = self.project_id.arkite_project_id
+        elif self.job_id:
+            project = self.env['product_module.project']._arkite_project_for_job(self.job_id)
+            project_id = project.arkite_project_id
+        if not project_id:
+            return None
+        # Step lines use the API configuration from the environment
+        return self.env['product_module.project'], project_id, f"steps/{self.step_id}/"
+
+    def _arkite_patch_values(self, field_names):
+        self.ensure_one()
+        return {"Index": self.sequence} if 'sequence' in field_names else {}
     
     def unlink(self):
         """Override unlink to delete step from Arkite when removed from list"""
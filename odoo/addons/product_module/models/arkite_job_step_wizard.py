@@ -1,7 +1,6 @@
 # product_module/models/arkite_job_step_wizard.py
 import os
 import logging
-import json
 import time
 import requests
 from odoo import models, fields, api, _
@@ -432,25 +431,20 @@ class ArkiteJobStepWizard(models.Model):
                     self.job_step_ids.unlink()
                     
                     if job_steps:
-                        # Create job step records
-                        step_records = []
+                        # Create job step records (loaded steps carry a step_id: no Arkite calls)
+                        vals_list = []
                         for idx, step in enumerate(job_steps):
-                            step_id = str(step.get("Id", ""))
-                            step_name = step.get("Name", "Unnamed")
-                            step_type = step.get("StepType", step.get("Type", "N/A"))
-                            parent_id = str(step.get("ParentStepId", "0"))
                             step_index = step.get("Index", idx * 10)
-                            
-                            step_record = self.env['product_module.arkite.job.step.temp'].create({
+                            vals_list.append({
                                 'wizard_id': self.id,
-                                'step_id': step_id,
-                                'step_name': step_name,
-                                'step_type': step_type,
+                                'step_id': str(step.get("Id", "")),
+                                'step_name': step.get("Name", "Unnamed"),
+                                'step_type': step.get("StepType", step.get("Type", "N/A")),
                                 'sequence': step_index,
                                 'index': step_index,
-                                'parent_step_id': parent_id
+                                'parent_step_id': str(step.get("ParentStepId", "0"))
                             })
-                        step_records.append(step_record.id)
+                        self.env['product_module.arkite.job.step.temp'].create(vals_list)
                     
                         # Reload form to show the new records
                         return {'type': 'ir.actions.client', 'tag': 'reload'}
@@ -598,213 +592,46 @@ class ArkiteJobStepWizard(models.Model):
         if not self.project_id:
             raise UserError("Project information is missing")
         
-        api_base = os.getenv('ARKITE_API_BASE')
-        api_key = os.getenv('ARKITE_API_KEY')
+        # The step line creates the step in Arkite (same list POST path as batched creates)
+        _logger.info("[ARKITE] Adding job step to project %s", self.project_id)
+        step = self.env['product_module.arkite.job.step.temp'].create({
+            'wizard_id': self.id,
+            'step_name': self.step_name,
+            'step_type': self.step_type,
+            'step_instruction': self.step_instruction,
+            'sequence': self.index if self.index > 0 else 0,
+            'parent_step_id': self.parent_step_id,
+            'detection_id': self.detection_id,
+            'material_id': self.material_id,
+            'button_id': self.button_id,
+        })
+        created_step_id = step.step_id
+        step_name_saved = self.step_name
         
-        if not api_base or not api_key:
-            raise UserError("Arkite API configuration is missing.")
+        # Clear only step input fields (keep project loaded, keep steps list)
+        self.write({
+            'step_name': "",
+            'step_instruction': "",
+            'parent_step_id': "",
+            'detection_id': "",
+            'material_id': "",
+            'button_id': "",
+            'index': 0
+        })
         
-        # Build step payload for JOB step
-        # Based on manual testing: API returns 500 error BUT steps ARE created successfully
-        # Use string IDs (matching API response format) - ProcessId and ParentStepId as strings
-        step_data = {
-            "Type": "Job",  # Must be "Job" for job steps
-            "Name": self.step_name,
-            "StepType": self.step_type,
-            "ProcessId": "0",  # String "0" (matching API response format)
-            "Index": self.index if self.index > 0 else 0,
-            "ForAllVariants": True,
-            "VariantIds": [],
-            "TextInstruction": {},
-            "ImageInstructionId": "0",  # String "0" (matching API response format)
-            "ChildStepOrder": "None" if self.step_type != "COMPOSITE" else "Sequential",
-            "StepControlflow": "None",
-            "StepConditions": [],
-            "Comment": None
-        }
+        # Reload steps so indexes/parents reflect Arkite
+        self.action_load_steps()
         
-        # Handle ParentStepId - must be a valid step ID (string, matching API format)
-        if self.parent_step_id and self.parent_step_id.strip():
-            # Keep as string (matching API response format)
-            step_data["ParentStepId"] = self.parent_step_id.strip()
-        else:
-            # Auto-detect parent step: find the root composite step
-            try:
-                url = f"{api_base}/projects/{self.project_id}/steps/"
-                params = {"apiKey": api_key}
-                headers = {"Content-Type": "application/json"}
-                response = requests.get(url, params=params, headers=headers, verify=False, timeout=10)
-                if response.ok:
-                    existing_steps = response.json()
-                    if isinstance(existing_steps, list) and existing_steps:
-                        # Filter job steps: Type="Job" OR ProcessId is 0/null/empty
-                        job_steps = []
-                        for s in existing_steps:
-                            step_type = s.get("Type", "")
-                            process_id = s.get("ProcessId")
-                            if step_type == "Job" or not process_id or process_id == "0" or process_id == 0:
-                                job_steps.append(s)
-                        
-                        if job_steps:
-                            # Find the root composite step (Type="Job", StepType="COMPOSITE", ParentStepId="0")
-                            root_composite = None
-                            for step in job_steps:
-                                step_type = step.get("Type", "")
-                                step_step_type = step.get("StepType", "")
-                                parent_id = step.get("ParentStepId", "0")
-                                # Root composite: Type="Job", StepType="COMPOSITE", ParentStepId="0"
-                                if (step_type == "Job" and 
-                                    step_step_type == "COMPOSITE" and 
-                                    (not parent_id or parent_id == "0" or parent_id == 0)):
-                                    root_composite = step.get("Id")
-                                    break
-                            
-                            if root_composite:
-                                # Use root composite step as parent
-                                # Keep as string (matching API response format)
-                                step_data["ParentStepId"] = str(root_composite) if not isinstance(root_composite, str) else root_composite
-                                _logger.info("[ARKITE] Using root composite step %s as parent", step_data["ParentStepId"])
-                            else:
-                                # Fallback: find any root step (ParentStepId="0")
-                                for step in job_steps:
-                                    parent_id = step.get("ParentStepId", "0")
-                                    if not parent_id or parent_id == "0" or parent_id == 0:
-                                        step_id = step.get("Id")
-                                        step_data["ParentStepId"] = str(step_id) if not isinstance(step_id, str) else step_id
-                                        break
-                                else:
-                                    # Last resort: use first job step as parent
-                                    step_id = job_steps[0].get("Id")
-                                    step_data["ParentStepId"] = str(step_id) if not isinstance(step_id, str) else step_id
-                        else:
-                            # No existing job steps - cannot add step without a parent
-                            raise UserError("No existing job steps found. Please create a root composite step in Arkite UI first, or specify a Parent Step ID.")
-                    else:
-                        raise UserError("No steps found in project. Please create a root composite step in Arkite UI first, or specify a Parent Step ID.")
-                else:
-                    error_text = response.text[:200] if response.text else "Unknown error"
-                    raise UserError(f"Failed to fetch existing steps: HTTP {response.status_code}\n{error_text}")
-            except UserError:
-                raise
-            except Exception as e:
-                _logger.error("Could not determine parent step: %s", e, exc_info=True)
-                raise UserError(f"Could not determine parent step. Please specify a Parent Step ID manually. Error: {str(e)}")
-        
-        # Add optional fields based on step type
-        if self.step_instruction and self.step_type == 'WORK_INSTRUCTION':
-            # TextInstruction should be an object with language codes
-            step_data["TextInstruction"] = {
-                "en-US": self.step_instruction
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Success',
+                'message': f'Step "{step_name_saved}" added successfully (ID: {created_step_id}). Steps list updated. You can add another step.',
+                'type': 'success',
+                'sticky': False,
             }
-        # Note: Even if empty, TextInstruction should be {} (empty object), not omitted
-        
-        if self.detection_id and self.step_type in ['TOOL_PLACING', 'TOOL_TAKING', 'OBJECT_PLACING', 'OBJECT_TAKING', 
-                                                     'PICKING_BIN_PLACING', 'PICKING_BIN_TAKING', 'ACTIVITY', 
-                                                     'CHECK_NO_CHANGE_ZONE', 'VIRTUAL_BUTTON_PRESS', 'MATERIAL_GRAB']:
-            # Keep as string (matching API format)
-            step_data["DetectionId"] = str(self.detection_id).strip() if self.detection_id else None
-        
-        if self.material_id and self.step_type == 'MATERIAL_GRAB':
-            # Keep as string (matching API format)
-            step_data["MaterialId"] = str(self.material_id).strip() if self.material_id else None
-        
-        if self.button_id and self.step_type == 'VIRTUAL_BUTTON_PRESS':
-            # Keep as string (matching API format)
-            step_data["ButtonId"] = str(self.button_id).strip() if self.button_id else None
-        
-        if self.index > 0:
-            step_data["Index"] = self.index
-        
-        # Add step via API
-        try:
-            url = f"{api_base}/projects/{self.project_id}/steps/"
-            params = {"apiKey": api_key}
-            headers = {"Content-Type": "application/json"}
-            
-            _logger.info("[ARKITE] Adding job step to project %s", self.project_id)
-            _logger.debug("[ARKITE] Step payload: %s", json.dumps(step_data, indent=2))
-            # API expects an array of steps
-            response = requests.post(url, params=params, json=[step_data], headers=headers, verify=False, timeout=10)
-            
-            # IMPORTANT: Arkite API has a bug - it creates the step successfully but returns 500 error
-            # So we need to verify if the step was actually created even if we get an error
-            step_created = False
-            created_step_id = None
-            
-            if response.ok:
-                # Success response
-                created_steps = response.json()
-                if isinstance(created_steps, list) and created_steps:
-                    created_step_id = created_steps[0].get("Id", "Unknown")
-                    step_created = True
-                elif isinstance(created_steps, dict):
-                    created_step_id = created_steps.get("Id", "Unknown")
-                    step_created = True
-            else:
-                # Even if we get an error, check if step was created (API bug)
-                _logger.warning("[ARKITE] API returned error, but checking if step was created anyway...")
-                error_text = response.text[:500] if response.text else "Unknown error"
-                
-                # Wait a moment for step to be created
-                import time
-                time.sleep(1)
-                
-                # Verify by fetching steps and checking if our step name exists
-                verify_url = f"{api_base}/projects/{self.project_id}/steps/"
-                verify_response = requests.get(verify_url, params=params, headers=headers, verify=False, timeout=10)
-                if verify_response.ok:
-                    all_steps = verify_response.json()
-                    # Find step with our name and parent
-                    parent_id = step_data.get("ParentStepId")
-                    matching_steps = [s for s in all_steps 
-                                     if s.get("Name") == self.step_name 
-                                     and str(s.get("ParentStepId")) == str(parent_id)]
-                    if matching_steps:
-                        # Step was created despite the error!
-                        created_step_id = matching_steps[0].get("Id", "Unknown")
-                        step_created = True
-                        _logger.info("[ARKITE] Step was created successfully despite API error (ID: %s)", created_step_id)
-            
-            if step_created:
-                # Save step name for notification
-                step_name_saved = self.step_name
-                
-                # Clear only step input fields (keep project loaded, keep steps list)
-                self.write({
-                    'step_name': "",
-                    'step_instruction': "",
-                    'parent_step_id': "",
-                    'detection_id': "",
-                    'material_id': "",
-                    'button_id': "",
-                    'index': 0
-                })
-                
-                # Automatically reload steps to show the new one
-                # Wait a moment for API to process
-                time.sleep(0.5)
-                self.action_load_steps()
-                
-                return {
-                    'type': 'ir.actions.client',
-                    'tag': 'display_notification',
-                    'params': {
-                        'title': 'Success',
-                        'message': f'Step "{step_name_saved}" added successfully (ID: {created_step_id}). Steps list updated. You can add another step.',
-                        'type': 'success',
-                        'sticky': False,
-                    }
-                }
-            else:
-                error_text = response.text[:500] if response.text else "Unknown error"
-                _logger.error("[ARKITE] Failed to add step: HTTP %s - %s", response.status_code, error_text)
-                raise UserError(f"Failed to add step: HTTP {response.status_code}\n{error_text}\n\nNote: The Arkite API may have a bug where it returns an error even when steps are created. Please verify if the step was actually created.")
-        except requests.exceptions.RequestException as e:
-            _logger.error("Network error adding step: %s", e)
-            raise UserError(f"Network error: {str(e)}")
-        except Exception as e:
-            _logger.error("Error adding step: %s", e, exc_info=True)
-            raise UserError(f"Error adding step: {str(e)}")
+        }
     
     def action_load_variants(self):
         """Step 3a: Load existing variants for the project"""
@@ -894,25 +721,20 @@ class ArkiteJobStepWizard(models.Model):
                     # Clear existing detections
                     self.detection_ids.unlink()
                     
-                    # Create detection records
-                    detection_records = []
+                    # Create detection records (loaded detections carry an Id: no Arkite calls)
+                    vals_list = []
                     for idx, d in enumerate(detections):
-                        detection_id = str(d.get("Id", ""))
-                        detection_name = d.get("Name", "Unnamed Detection")
-                        detection_type = d.get("DetectionType", "OBJECT")
                         job_id = d.get("JobId")  # Check if detection is job-specific
-                        is_job_specific = bool(job_id)
-                        
-                        detection_temp = self.env['product_module.arkite.detection.temp'].create({
+                        vals_list.append({
                             'wizard_id': self.id,
-                            'detection_id': detection_id,
-                            'name': detection_name,
-                            'detection_type': detection_type,
+                            'detection_id': str(d.get("Id", "")),
+                            'name': d.get("Name", "Unnamed Detection"),
+                            'detection_type': d.get("DetectionType", "OBJECT"),
                             'sequence': (idx + 1) * 10,
-                            'is_job_specific': is_job_specific,
+                            'is_job_specific': bool(job_id),
                             'job_id': str(job_id) if job_id else ""
                         })
-                        detection_records.append(detection_temp.id)
+                    self.env['product_module.arkite.detection.temp'].create(vals_list)
                     
                     # Reload form to show the detections
                     return {'type': 'ir.actions.client', 'tag': 'reload'}
@@ -1176,25 +998,13 @@ class ArkiteJobStepWizard(models.Model):
             response_variants = requests.get(url_variants, params=params, headers=headers, verify=False, timeout=10)
             
             # Create/update variant temp records
-            variant_records = []
+            variant_map = {}
             if response_variants.ok:
                 variants = response_variants.json()
                 if isinstance(variants, list):
-                    for v in variants:
-                        variant_id = str(v.get("Id", ""))
-                        # Find or create variant temp record
-                        variant_temp = self.env['product_module.arkite.variant.temp'].search([
-                            ('variant_id', '=', variant_id),
-                            ('wizard_id', '=', self.id)
-                        ], limit=1)
-                        if not variant_temp:
-                            variant_temp = self.env['product_module.arkite.variant.temp'].create({
-                                'wizard_id': self.id,
-                                'variant_id': variant_id,
-                                'name': v.get("Name", "Unknown"),
-                                'description': v.get("Description", "")
-                            })
-                        variant_records.append(variant_temp.id)
+                    variant_map = self.env['product_module.arkite.variant.temp']._arkite_variant_map(
+                        {'wizard_id': self.id}, variants)
+            variant_records = [variant_temp.id for variant_temp in variant_map.values()]
             
             # Clear existing process steps
             self.process_step_ids.unlink()
@@ -1210,14 +1020,7 @@ class ArkiteJobStepWizard(models.Model):
                 step_index = step.get("Index", idx * 10)
                 
                 # Get variant records for this step
-                step_variant_records = []
-                for vid in variant_ids:
-                    variant_temp = self.env['product_module.arkite.variant.temp'].search([
-                        ('variant_id', '=', str(vid)),
-                        ('wizard_id', '=', self.id)
-                    ], limit=1)
-                    if variant_temp:
-                        step_variant_records.append(variant_temp.id)
+                step_variant_records = [variant_map[str(vid)].id for vid in variant_ids if str(vid) in variant_map]
                 
                 step_record = self.env['product_module.arkite.process.step'].create({
                     'wizard_id': self.id,
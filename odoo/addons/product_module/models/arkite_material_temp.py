@@ -5,6 +5,8 @@ import requests
 import os
 import logging
 
+from ..services.arkite_client import ArkiteClient
+
 _logger = logging.getLogger(__name__)
 
 class ArkiteMaterialTemp(models.TransientModel):
@@ -70,79 +72,70 @@ class ArkiteMaterialTemp(models.TransientModel):
         
         return False
     
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Create materials in Arkite (one list POST per project) and then in Odoo"""
+        pending = {}
+        for vals in vals_list:
+            # Loaded from Arkite: already exists there
+            if vals.get('material_id'):
+                continue
+            project = self.env['product_module.project'].browse(vals.get('project_id'))
+            if not project or not project.arkite_project_id:
+                raise UserError(_('Please link this project to an Arkite project first.'))
+            pending.setdefault(project, []).append(vals)
+
+        for project, project_vals in pending.items():
+            # Get credentials
+            try:
+                creds = project._get_arkite_credentials()
+            except Exception:
+                raise UserError(_('Could not get API credentials. Please check your Arkite unit configuration.'))
+            client = ArkiteClient(api_base=creds['api_base'], api_key=creds['api_key'], verify_ssl=False, timeout_sec=20)
+            payloads = [self._arkite_payload(vals) for vals in project_vals]
+
+            _logger.info("[ARKITE] Creating %s material(s) in project %s", len(payloads), project.arkite_project_id)
+            try:
+                created = client.create_many(f"projects/{project.arkite_project_id}/materials/", payloads)
+            except requests.HTTPError as e:
+                _logger.error("[ARKITE] Failed to create materials: %s", e)
+                raise UserError(_('Failed to create material in Arkite: %s') % str(e))
+            except ValueError:
+                raise UserError(_('Unexpected response format from Arkite API'))
+            except requests.exceptions.RequestException as e:
+                _logger.error("[ARKITE] Error creating materials: %s", e, exc_info=True)
+                raise UserError(_('Error connecting to Arkite API: %s') % str(e))
+
+            for vals, item in zip(project_vals, created):
+                vals['material_id'] = str(item["Id"])
+            _logger.info("[ARKITE] Created material(s) with ID(s): %s", ", ".join(vals['material_id'] for vals in project_vals))
+
+        return super().create(vals_list)
+
     @api.model
-    def create(self, vals):
-        """Create material in Arkite and then in Odoo"""
-        # Get project
-        project = self.env['product_module.project'].browse(vals.get('project_id'))
-        if not project or not project.arkite_project_id:
-            raise UserError(_('Please link this project to an Arkite project first.'))
-        
-        # Get credentials
-        try:
-            creds = project._get_arkite_credentials()
-            api_base = creds['api_base']
-            api_key = creds['api_key']
-        except Exception:
-            raise UserError(_('Could not get API credentials. Please check your Arkite unit configuration.'))
-        
+    def _arkite_payload(self, vals):
+        """Arkite material payload built from create ``vals``."""
         # Parse picking bin IDs
         picking_bin_ids = []
-        if vals.get('picking_bin_ids_text'):
-            text = vals.get('picking_bin_ids_text', '').strip()
-            if text:
-                try:
-                    picking_bin_ids = [int(bid.strip()) for bid in text.split(',') if bid.strip().isdigit()]
-                except ValueError:
-                    raise UserError(_('Invalid picking bin IDs format. Use comma-separated numbers (e.g., 1111,2222).'))
-        
-        # Build material payload
+        text = (vals.get('picking_bin_ids_text') or '').strip()
+        if text:
+            picking_bin_ids = [int(bid.strip()) for bid in text.split(',') if bid.strip().isdigit()]
+
         material_data = {
             "Name": vals.get('name', 'Unnamed Material'),
             "Type": vals.get('material_type', 'PickingBinMaterial'),
             "Description": vals.get('description', ''),
         }
-        
+
         if vals.get('image_id'):
             try:
                 material_data["ImageId"] = int(vals['image_id'])
             except ValueError:
                 pass  # Skip if not a valid number
-        
+
         if picking_bin_ids:
             material_data["PickingBinIds"] = picking_bin_ids
-        
-        # Create material in Arkite
-        url = f"{api_base}/projects/{project.arkite_project_id}/materials/"
-        params = {"apiKey": api_key}
-        headers = {"Content-Type": "application/json"}
-        
-        _logger.info("[ARKITE] Creating material: %s", material_data)
-        
-        try:
-            response = requests.post(url, params=params, headers=headers, json=[material_data], verify=False, timeout=10)
-            if not response.ok:
-                error_text = response.text[:500] if response.text else "Unknown error"
-                _logger.error("[ARKITE] Failed to create material: HTTP %s - %s", response.status_code, error_text)
-                raise UserError(_('Failed to create material in Arkite: HTTP %s\n%s') % (response.status_code, error_text))
-            
-            # Get created material ID
-            created_materials = response.json()
-            if isinstance(created_materials, list) and created_materials:
-                created = created_materials[0]
-                vals['material_id'] = str(created.get("Id", ""))
-            elif isinstance(created_materials, dict):
-                vals['material_id'] = str(created_materials.get("Id", ""))
-            else:
-                raise UserError(_('Unexpected response format from Arkite API'))
-            
-            _logger.info("[ARKITE] Created material with ID: %s", vals['material_id'])
-            
-        except requests.exceptions.RequestException as e:
-            _logger.error("[ARKITE] Error creating material: %s", e, exc_info=True)
-            raise UserError(_('Error connecting to Arkite API: %s') % str(e))
-        
-        return super().create(vals)
+        return material_data
     
     def write(self, vals):
         """Update material in Arkite when fields change"""
@@ -0,0 +1,105 @@
+# product_module/models/arkite_mirror.py
+from odoo import models, fields, api
+import hashlib
+import json
+
+# kind -> path of its list endpoint below projects/{id}/
+MIRROR_PATHS = {
+    'step': 'steps/',
+    'variant': 'variants/',
+    'process': 'processes/',
+    'detection': 'detections/',
+    'material': 'materials/',
+}
+
+
+class ArkiteMirror(models.Model):
+    """Persistent copy of the objects of linked Arkite projects, one row per object.
+
+    Unlike the transient editing models (steps, variants, processes, ...) rows survive the
+    auto-vacuum, so a new session can seed those models from here without calling Arkite.
+    Rows are only rewritten when their checksum changes; each project has a mirror version
+    that goes up with every change, and a row keeps the version it last changed in.
+    """
+    _name = 'product_module.arkite.mirror'
+    _description = 'Arkite Project Mirror'
+    _order = 'project_id, kind, id'
+
+    project_id = fields.Many2one(
+        'product_module.project',
+        string='Project',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    kind = fields.Selection(
+        [
+            ('step', 'Step'),
+            ('variant', 'Variant'),
+            ('process', 'Process'),
+            ('detection', 'Detection'),
+            ('material', 'Material'),
+        ],
+        string='Kind',
+        required=True,
+    )
+    object_id = fields.Char(string='Arkite ID', required=True)
+    data = fields.Text(string='Data', help='The Arkite object as JSON')
+    checksum = fields.Char(string='Checksum', help='SHA1 of the JSON data')
+    version = fields.Integer(string='Version', help='Project mirror version this object last changed in')
+
+    _sql_constraints = [
+        ('object_key_unique',
+         'unique(project_id, kind, object_id)',
+         'An Arkite object can only be mirrored once per project.'),
+    ]
+
+    @api.model
+    def _store(self, project, kind, objects, version):
+        """Make the ``kind`` rows of ``project`` match ``objects``; returns the number of rows changed.
+
+        Objects are matched on their Arkite ``Id``; new ones are created, changed ones get
+        ``version`` and the ones that are gone are removed.
+        """
+        Mirror = self.sudo()
+        existing = {
+            row['object_id']: row for row in Mirror.search_read(
+                [('project_id', '=', project.id), ('kind', '=', kind)], ['object_id', 'checksum'])
+        }
+        new_vals = []
+        changed = 0
+        seen = set()
+        for obj in objects:
+            if not isinstance(obj, dict) or obj.get("Id") in (None, ""):
+                continue
+            object_id = str(obj["Id"])
+            if object_id in seen:
+                continue
+            seen.add(object_id)
+            data = json.dumps(obj, sort_keys=True, default=str)
+            checksum = hashlib.sha1(data.encode('utf-8')).hexdigest()
+            row = existing.get(object_id)
+            if row is None:
+                new_vals.append({
+                    'project_id': project.id,
+                    'kind': kind,
+                    'object_id': object_id,
+                    'data': data,
+                    'checksum': checksum,
+                    'version': version,
+                })
+            elif row['checksum'] != checksum:
+                Mirror.browse(row['id']).write({'data': data, 'checksum': checksum, 'version': version})
+                changed += 1
+        if new_vals:
+            Mirror.create(new_vals)
+        gone = Mirror.browse([row['id'] for object_id, row in existing.items() if object_id not in seen])
+        if gone:
+            gone.unlink()
+        return changed + len(new_vals) + len(gone)
+
+    @api.model
+    def _objects(self, project, kind):
+        """The mirrored ``kind`` objects of ``project``, as decoded Arkite JSON."""
+        rows = self.sudo().search_read([('project_id', '=', project.id), ('kind', '=', kind)], ['data'])
+        return [json.loads(row['data']) for row in rows if row['data']]
@@ -13,12 +13,17 @@ _logger = logging.getLogger(__name__)
 class ArkiteProcessStep(models.TransientModel):
     """Temporary model for displaying process steps in tree view"""
     _name = 'product_module.arkite.process.step'
+    _inherit = ['product_module.arkite.write.behind']
     _description = 'Arkite Process Step (Temporary)'
     _order = 'sequence, id'
     _rec_name = 'step_name'  # Use step_name for clean display in parent selection
     # web_hierarchy expects the parent field to be named parent_id by default.
     _parent_name = 'parent_id'
     _parent_store = False
+    # Edits pushed to Arkite (see arkite.write.behind)
+    _arkite_patch_fields = ('step_name', 'step_type', 'sequence', 'variant_ids', 'for_all_variants', 'parent_id')
+    _arkite_mirror_fields = {'Index': 'index', 'ParentStepId': 'parent_step_id'}
+    _arkite_dirty_fields = ('arkite_process_steps_dirty', 'arkite_hierarchy_dirty')
 
     # -------------------------------------------------------------------------
     # Hierarchy editing helpers (NO custom JS): indent/outdent + reorder siblings
@@ -827,6 +832,7 @@ class ArkiteProcessStep(models.TransientModel):
         if self.env.context.get('skip_arkite_sync'):
             return super().write(vals)
 
+        snapshot = ([], {}) if self.env.context.get('defer_arkite_sync') else self._arkite_snapshot(vals)
         result = super().write(vals)
 
         # If order/parent changed from the DIAGRAM drag (not list resequence), normalize sibling sequences
@@ -890,156 +896,76 @@ class ArkiteProcessStep(models.TransientModel):
                 except Exception as e:
                     _logger.warning("[HIERARCHY] Could not recompute levels during write: %s", e)
         
-        for record in self:
-            # Get project ID from either wizard, project, or job's project
-            project_id = None
-            if record.wizard_id and record.wizard_id.project_id:
-                project_id = record.wizard_id.project_id
-            elif record.project_id and record.project_id.arkite_project_id:
-                project_id = record.project_id.arkite_project_id
-            elif record.job_id:
-                # Try to get from job's project
-                project = self.env['product_module.project'].search([
-                    ('job_ids', 'in', [record.job_id.id])
-                ], limit=1)
-                if project and project.arkite_project_id:
-                    project_id = project.arkite_project_id
-            
-            if not project_id:
-                continue
-            
-            # Skip if step_id is not set (new step being created)
-            if not record.step_id:
-                continue
-            
-            # Get credentials from project if available
-            api_base = os.getenv('ARKITE_API_BASE')
-            api_key = os.getenv('ARKITE_API_KEY')
-            
-            if record.project_id:
-                try:
-                    creds = record.project_id._get_arkite_credentials()
-                    api_base = creds['api_base']
-                    api_key = creds['api_key']
-                except Exception:
-                    pass
-            
-            if not api_base or not api_key:
-                continue
-            
-            try:
-                url = f"{api_base}/projects/{project_id}/steps/{record.step_id}"
-                params = {"apiKey": api_key}
-                headers = {"Content-Type": "application/json"}
-                
-                # Get current step
-                response = requests.get(url, params=params, headers=headers, verify=False, timeout=10)
-                if not response.ok:
-                    continue
-                
-                step_data = response.json()
-                updated = False
-                
-                # Update step name if changed
-                if 'step_name' in vals and step_data.get("Name") != record.step_name:
-                    step_data["Name"] = record.step_name
-                    updated = True
-                
-                # Update step type if changed
-                if 'step_type' in vals and step_data.get("StepType") != record.step_type:
-                    step_data["StepType"] = record.step_type
-                    # Update ChildStepOrder for composite steps
-                    if record.step_type == "COMPOSITE":
-                        step_data["ChildStepOrder"] = "Sequential"
-                    else:
-                        step_data["ChildStepOrder"] = "None"
-                    updated = True
-                
-                # Update sequence/index if changed
-                if 'sequence' in vals:
-                    # Convert sequence to Index (sequence is typically multiples of 10, Index is the actual order)
-                    new_index = record.sequence // 10 if record.sequence > 0 else 0
-                    old_index = step_data.get("Index", 0)
-                    _logger.info("[ARKITE] Process step %s sequence changed: %s -> Index %s (was %s)", record.step_id, record.sequence, new_index, old_index)
-                    if old_index != new_index:
-                        step_data["Index"] = new_index
-                        updated = True
-                    else:
-                        _logger.debug("[ARKITE] Process step %s Index already %s, skipping update", record.step_id, new_index)
-                
-                # Update variants if changed
-                if 'variant_ids' in vals or 'for_all_variants' in vals:
-                    if record.for_all_variants:
-                        step_data["ForAllVariants"] = True
-                        step_data["VariantIds"] = []
-                    else:
-                        step_data["ForAllVariants"] = False
-                        step_data["VariantIds"] = [v.variant_id for v in record.variant_ids]
-                    updated = True
-                
-                # Update parent step if changed
-                if 'parent_id' in vals:
-                    # Validate that parent is a COMPOSITE step
-                    if record.parent_id:
-                        if record.parent_id.step_type != 'COMPOSITE':
-                            raise UserError(_("Only COMPOSITE steps can be parent steps. Please select a COMPOSITE step as the parent."))
-                        
-                        # Prevent circular reference (step cannot be its own parent or ancestor)
-                        if record.parent_id.id == record.id:
-                            raise UserError(_("A step cannot be its own parent."))
-                        
-                        # Check for circular references (parent cannot be a descendant of this step)
-                        ancestor = record.parent_id
-                        while ancestor.parent_id:
-                            if ancestor.parent_id.id == record.id:
-                                raise UserError(_("Circular reference detected. A step cannot be an ancestor of its parent."))
-                            ancestor = ancestor.parent_id
-                        
-                        # Update parent_step_id to match the parent record's step_id
-                        parent_step_id = record.parent_id.step_id
-                        if parent_step_id and str(parent_step_id) != "0":
-                            step_data["ParentStepId"] = str(parent_step_id)
-                            record.parent_step_id = str(parent_step_id)
-                            _logger.info("[ARKITE] Updating ParentStepId to: %s", parent_step_id)
-                        else:
-                            # Remove ParentStepId if parent doesn't have a valid step_id
-                            if "ParentStepId" in step_data:
-                                del step_data["ParentStepId"]
-                            record.parent_step_id = ""
-                            _logger.info("[ARKITE] Removing ParentStepId (parent has no step_id)")
-                    else:
-                        # No parent - remove ParentStepId
-                        if "ParentStepId" in step_data:
-                            del step_data["ParentStepId"]
-                        record.parent_step_id = ""
-                        _logger.info("[ARKITE] Removing ParentStepId (no parent selected)")
-                    updated = True
-                
-                # Update step if anything changed
-                if updated:
-                    _logger.info("[ARKITE] Patching process step %s with data: %s", record.step_id, {k: v for k, v in step_data.items() if k in ['Name', 'StepType', 'Index', 'ParentStepId']})
-                    patch_response = requests.patch(url, params=params, headers=headers, json=step_data, verify=False, timeout=10)
-                    if patch_response.ok:
-                        _logger.info("[ARKITE] Successfully updated process step %s in Arkite", record.step_id)
-                        # Avoid an extra verify GET; update our local mirror fields cheaply.
-                        updates = {}
-                        if 'sequence' in vals and step_data.get('Index') is not None:
-                            updates['index'] = int(step_data.get('Index', 0))
-                        if 'parent_id' in vals:
-                            updates['parent_step_id'] = str(step_data.get('ParentStepId', '') or '')
-                        if updates:
-                            sets = ", ".join(f"{k}=%s" for k in updates.keys())
-                            params_sql = list(updates.values()) + [record.id]
-                            self.env.cr.execute(
-                                f"UPDATE product_module_arkite_process_step SET {sets} WHERE id=%s",
-                                params_sql,
-                            )
-                            record.invalidate_recordset(list(updates.keys()))
-            except Exception as e:
-                _logger.error("Error updating step in Arkite: %s", e)
-        
+        # Queue the changed fields for Arkite (see arkite.write.behind)
+        synced = self.filtered(lambda r: r._arkite_patch_target())
+        if 'parent_id' in vals:
+            for record in synced:
+                error = record._arkite_parent_error()
+                if error:
+                    _logger.error("Error updating step in Arkite: %s", error)
+                    synced -= record
+        # index / parent_step_id follow once Arkite accepted the update (see _arkite_patches_done)
+        synced._arkite_queue_changes(snapshot)
+
         return result
 
+    def _arkite_parent_error(self):
+        """Why ``parent_id`` can't be this step's parent in Arkite, or None."""
+        self.ensure_one()
+        if not self.parent_id:
+            return None
+        # Validate that parent is a COMPOSITE step
+        if self.parent_id.step_type != 'COMPOSITE':
+            return _("Only COMPOSITE steps can be parent steps. Please select a COMPOSITE step as the parent.")
+        # Prevent circular reference (step cannot be its own parent or ancestor)
+        if self.parent_id.id == self.id:
+            return _("A step cannot be its own parent.")
+        ancestor = self.parent_id
+        while ancestor.parent_id:
+            if ancestor.parent_id.id == self.id:
+                return _("Circular reference detected. A step cannot be an ancestor of its parent.")
+            ancestor = ancestor.parent_id
+        return None
+
+    def _arkite_patch_target(self):
+        self.ensure_one()
+        if not self.step_id:
+            return None
+        # Get project ID from either wizard, project, or job's project
+        project = self.project_id
+        project_id = None
+        if self.wizard_id and self.wizard_id.project_id:
+            project_id = self.wizard_id.project_id
+        elif project.arkite_project_id:
+            project_id = project.arkite_project_id
+        elif self.job_id:
+            project = self.env['product_module.project']._arkite_project_for_job(self.job_id)
+            project_id = project.arkite_project_id
+        if not project_id:
+            return None
+        return project, project_id, f"steps/{self.step_id}/"
+
+    def _arkite_patch_values(self, field_names):
+        self.ensure_one()
+        values = {}
+        if 'step_name' in field_names:
+            values["Name"] = self.step_name
+        if 'step_type' in field_names:
+            values["StepType"] = self.step_type
+            # Update ChildStepOrder for composite steps
+            values["ChildStepOrder"] = "Sequential" if self.step_type == "COMPOSITE" else "None"
+        if 'sequence' in field_names:
+            # Convert sequence to Index (sequence is typically multiples of 10, Index is the actual order)
+            values["Index"] = self.sequence // 10 if self.sequence > 0 else 0
+        if 'variant_ids' in field_names or 'for_all_variants' in field_names:
+            values["ForAllVariants"] = bool(self.for_all_variants)
+            values["VariantIds"] = [] if self.for_all_variants else [v.variant_id for v in self.variant_ids]
+        if 'parent_id' in field_names:
+            parent_step_id = self.parent_id.step_id
+            # "0" makes it a root step
+            values["ParentStepId"] = str(parent_step_id) if parent_step_id and str(parent_step_id) != "0" else "0"
+        return values
+
     @api.model
     def create(self, vals):
         # Normalize StepType coming from Arkite/UI so it always matches selection keys.
@@ -1211,3 +1137,31 @@ class ArkiteVariantTemp(models.TransientModel):
     name = fields.Char(string='Name', required=True)
     description = fields.Text(string='Description')
 
+    @api.model
+    def _arkite_variant_map(self, owner, variants, create_missing=True):
+        """``{Arkite variant id: record}`` for the fetched Arkite ``variants`` of ``owner``.
+
+        ``owner`` is ``{'project_id': id}`` or ``{'wizard_id': id}``. Its records are read
+        with one search; variants without a record are created in one batch (unless
+        ``create_missing`` is False, then they are left out).
+        """
+        (owner_field, owner_id), = owner.items()
+        known = {}
+        for record in self.search([(owner_field, '=', owner_id)]):
+            known.setdefault(record.variant_id, record)
+        missing = {}
+        for variant in variants:
+            variant_id = str(variant.get("Id", ""))
+            if variant_id not in known and variant_id not in missing:
+                missing[variant_id] = dict(
+                    owner,
+                    variant_id=variant_id,
+                    name=variant.get("Name", "Unknown"),
+                    description=variant.get("Description", ""),
+                )
+        if missing and create_missing:
+            for record in self.create(list(missing.values())):
+                known[record.variant_id] = record
+        variant_ids = (str(variant.get("Id", "")) for variant in variants)
+        return {variant_id: known[variant_id] for variant_id in variant_ids if variant_id in known}
+
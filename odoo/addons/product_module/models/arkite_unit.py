@@ -14,6 +14,17 @@ class ArkiteUnit(models.Model):
     _rec_name = 'display_name'
     _order = 'name'
     
+    def write(self, vals):
+        result = super().write(vals)
+        if any(field in vals for field in ('api_base', 'api_key', 'unit_id')):
+            # Projects using this unit must resolve their credentials again
+            self.env['product_module.project']._arkite_credentials_cache_clear()
+        return result
+    
+    def unlink(self):
+        self.env['product_module.project']._arkite_credentials_cache_clear()
+        return super().unlink()
+    
     @api.model
     def create_from_env(self):
         """Helper method to create a unit from environment variables (for initial setup)"""
@@ -0,0 +1,159 @@
+# product_module/models/arkite_write_behind.py
+from odoo import models, api
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Key of the projects whose mirror was marked stale in ``cr.postcommit.data``
+_STALE_KEY = 'product_module.arkite_write_behind.stale'
+
+
+class ProductModuleArkiteWriteBehind(models.AbstractModel):
+    """Deferred, coalesced Arkite PATCHes for field edits.
+
+    ``write()`` overrides take a snapshot of the Arkite values of the edited fields
+    (``_arkite_patch_values``), write, and queue the keys whose value changed. The local
+    record is the snapshot, so no GET of the Arkite object is needed. Changes are merged
+    per object into the pending ``arkite_patches`` job of the project (see
+    ``arkite.job.queue._enqueue_patches``), which commits and rolls back with the edit.
+
+    Mirror fields of the Arkite values (``_arkite_mirror_fields``) are only updated once
+    Arkite accepted the PATCH (``_arkite_patches_done``); when it fails, the projects of
+    the objects get ``_arkite_dirty_fields`` set so the staged changes are pushed again.
+    """
+    _name = 'product_module.arkite.write.behind'
+    _description = 'Arkite Write-Behind'
+
+    # Fields whose edits are pushed to Arkite; override in the concrete model.
+    _arkite_patch_fields = ()
+    # Object paths are ``projects/<id>/<_arkite_object_path>/<record[_arkite_object_field]>/``
+    _arkite_object_path = 'steps'
+    _arkite_object_field = 'step_id'
+    # Arkite key -> field storing the value Arkite has
+    _arkite_mirror_fields = {}
+    # Boolean fields of ``project_id`` set when an update of the record failed
+    _arkite_dirty_fields = ()
+
+    def _arkite_patch_values(self, field_names):
+        """Arkite ``{key: value}`` of this record for the edited ``field_names``."""
+        return {}
+
+    def _arkite_patch_target(self):
+        """``(project, arkite_project_id, object path)`` of this record, or None if not synced.
+
+        ``project`` (a product_module.project, possibly empty) provides the credentials.
+        """
+        return None
+
+    @api.model
+    def _arkite_write_delay(self):
+        """Seconds edits wait to be coalesced (system parameter product_module.arkite_write_delay)."""
+        ICP = self.env['ir.config_parameter'].sudo()
+        try:
+            return max(0.0, float(ICP.get_param('product_module.arkite_write_delay', 1.0)))
+        except (TypeError, ValueError):
+            return 1.0
+
+    def _arkite_snapshot(self, vals):
+        """Arkite values of the fields in ``vals`` before the write: ``(field names, {id: values})``."""
+        field_names = [name for name in self._arkite_patch_fields if name in vals]
+        if not field_names:
+            return field_names, {}
+        return field_names, {record.id: record._arkite_patch_values(field_names) for record in self}
+
+    def _arkite_queue_changes(self, snapshot):
+        """Queue the Arkite keys that changed since ``snapshot`` (from ``_arkite_snapshot``)."""
+        field_names, before = snapshot
+        if not field_names:
+            return
+        # Grouped per project, so its credentials are resolved once for all of its records
+        patches_by_project = {}
+        for record in self:
+            target = record._arkite_patch_target()
+            if not target:
+                continue
+            old = before.get(record.id, {})
+            body = {
+                key: value for key, value in record._arkite_patch_values(field_names).items()
+                if key not in old or old[key] != value
+            }
+            if body:
+                project, arkite_project_id, path = target
+                patches = patches_by_project.setdefault(project, {})
+                patches.setdefault(f"projects/{arkite_project_id}/{path}", {}).update(body)
+        for project, patches in patches_by_project.items():
+            self._arkite_queue_patches(project, patches)
+
+    @api.model
+    def _arkite_queue_patch(self, project, path, body):
+        """Merge a PATCH ``body`` for ``path`` into this transaction's pending Arkite updates."""
+        self._arkite_queue_patches(project, {path: body})
+
+    @api.model
+    def _arkite_queue_patches(self, project, patches):
+        """Merge PATCH bodies ``{path: body}`` sent with the credentials of ``project``."""
+        self.env['product_module.arkite.job.queue']._enqueue_patches(
+            project, patches, delay=self._arkite_write_delay(),
+        )
+        # The mirror no longer matches Arkite once this goes out
+        marked = self.env.cr.postcommit.data.setdefault(_STALE_KEY, set())
+        if project.id not in marked:
+            marked.add(project.id)
+            project._arkite_mirror_mark_stale()
+
+    @api.model
+    def _arkite_patches_done(self, project, sent, failed):
+        """Mirror the accepted PATCH bodies ``sent`` and flag the projects of ``failed`` paths.
+
+        Both are ``{path: ...}`` of the ``arkite_patches`` job of ``project``. Only records whose
+        ``_arkite_patch_target`` is that project and path match, so objects with the same Id
+        in another Arkite project or unit are left alone.
+        """
+        if self._abstract:
+            return
+        prefix = f"/{self._arkite_object_path}/"
+
+        def records_by_path(paths):
+            object_ids = [path.rstrip('/').rsplit('/', 1)[1] for path in paths if prefix in path]
+            if not object_ids:
+                return {}
+            found = {}
+            for record in self.search([(self._arkite_object_field, 'in', object_ids)]):
+                target = record._arkite_patch_target()
+                if target and target[0] == project:
+                    path = f"projects/{target[1]}/{target[2]}"
+                    if path in paths:
+                        found.setdefault(path, self.browse())
+                        found[path] |= record
+            return found
+
+        if self._arkite_mirror_fields:
+            columns = {}  # (field, value) -> record ids
+            for path, records in records_by_path(sent).items():
+                for key, value in sent[path].items():
+                    name = self._arkite_mirror_fields.get(key)
+                    if name:
+                        if key == 'ParentStepId' and str(value) == '0':
+                            value = ''  # Root step
+                        columns.setdefault((name, value), []).extend(records.ids)
+            for (name, value), ids in columns.items():
+                self.env.cr.execute(
+                    f'UPDATE "{self._table}" SET "{name}" = %s WHERE id = ANY(%s)',
+                    [value, ids],
+                )
+            if columns:
+                self.invalidate_model(list({name for name, _value in columns}))
+
+        failed_records = self.browse()
+        for records in records_by_path(failed).values():
+            failed_records |= records
+        if failed_records:
+            _logger.warning("[ARKITE] Update of %s %s record(s) failed", len(failed_records), self._name)
+            projects = failed_records.mapped('project_id') if self._arkite_dirty_fields else None
+            if projects:
+                sets = ", ".join(f'"{name}" = TRUE' for name in self._arkite_dirty_fields)
+                self.env.cr.execute(
+                    f"UPDATE product_module_project SET {sets} WHERE id = ANY(%s)",
+                    [projects.ids],
+                )
+                projects.invalidate_recordset(list(self._arkite_dirty_fields))
@@ -34,6 +34,7 @@ class ProductModuleInstruction(models.Model):
         'product_module.project',
         string='Project',
         ondelete='cascade',
+        index=True,
         help='Project this process belongs to'
     )
     is_completed = fields.Boolean(
@@ -186,6 +187,22 @@ class ProductModuleInstruction(models.Model):
                 # Clear existing steps
                 self.process_step_ids.unlink()
                 
+                # Arkite variant id -> Odoo variant id, matched by name (assumes names match between
+                # Arkite and Odoo); resolved once here instead of per step
+                odoo_variant_ids = {}
+                if self.project_id:
+                    arkite_variant_names = {v.variant_id: v.name for v in self.project_id.arkite_variant_ids}
+                    variant_id_by_name = {}
+                    for odoo_variant in self.env['product_module.variant'].search_read(
+                            [('name', 'in', list(set(arkite_variant_names.values())))], ['name']):
+                        variant_id_by_name.setdefault(odoo_variant['name'], odoo_variant['id'])
+                    for arkite_variant_id, name in arkite_variant_names.items():
+                        if name in variant_id_by_name:
+                            odoo_variant_ids.setdefault(arkite_variant_id, variant_id_by_name[name])
+                        else:
+                            _logger.debug("[ARKITE] No Odoo variant found for Arkite variant '%s' (ID: %s)",
+                                          name, arkite_variant_id)
+                
                 # Create step records
                 for step_data in steps:
                     _logger.debug("[ARKITE] Creating step: Name='%s', Id='%s', ProcessId='%s', Type='%s'", 
@@ -204,28 +221,11 @@ class ProductModuleInstruction(models.Model):
                     image_instruction_id = str(step_data.get("ImageInstructionId", "")) if step_data.get("ImageInstructionId") and str(step_data.get("ImageInstructionId")) != "0" else ""
                     
                     # Get VariantIds and map to Odoo variants (if project has variants)
-                    variant_ids_list = []
-                    variant_ids_from_arkite = step_data.get("VariantIds", [])
-                    if variant_ids_from_arkite and self.project_id:
-                        # Map Arkite variant IDs to Odoo variants
-                        # First, try to find matching variants via arkite_variant_ids (temporary model)
-                        for arkite_variant_id in variant_ids_from_arkite:
-                            arkite_variant_id_str = str(arkite_variant_id)
-                            # Find the temporary variant record in the project
-                            arkite_variant_temp = self.project_id.arkite_variant_ids.filtered(
-                                lambda v: v.variant_id == arkite_variant_id_str
-                            )
-                            if arkite_variant_temp:
-                                # Try to find matching Odoo variant by name
-                                # Note: This assumes variant names match between Arkite and Odoo
-                                odoo_variant = self.env['product_module.variant'].search([
-                                    ('name', '=', arkite_variant_temp.name)
-                                ], limit=1)
-                                if odoo_variant:
-                                    variant_ids_list.append(odoo_variant.id)
-                                else:
-                                    _logger.debug("[ARKITE] No Odoo variant found for Arkite variant '%s' (ID: %s)", 
-                                                arkite_variant_temp.name, arkite_variant_id_str)
+                    variant_ids_list = [
+                        odoo_variant_ids[str(arkite_variant_id)]
+                        for arkite_variant_id in step_data.get("VariantIds") or []
+                        if str(arkite_variant_id) in odoo_variant_ids
+                    ]
                     
                     # Get ChildStepOrder and StepControlflow
                     child_step_order = step_data.get("ChildStepOrder", "Sequential")
@@ -3,7 +3,19 @@ from odoo import models, fields, api, _
 from odoo.exceptions import UserError
 import base64
 import csv
-from io import StringIO
+import io
+import logging
+import tempfile
+import time
+
+_logger = logging.getLogger(__name__)
+
+REQUIRED_HEADERS = ['Product Name', 'Product Code', 'Step #', 'Title', 'Description']
+
+# Instructions inserted per create() call
+IMPORT_CHUNK_SIZE = 1000
+# Invalid rows listed in the import report
+MAX_REPORTED_ERRORS = 20
 
 
 class InstructionImportWizard(models.TransientModel):
@@ -13,7 +25,7 @@ class InstructionImportWizard(models.TransientModel):
     product_id = fields.Many2one('product_module.product', string='Product', required=True, readonly=True)
     csv_file = fields.Binary(string='CSV File', help='Upload a CSV file with columns: Product Name, Product Code, Step #, Title, Description', attachment=False)
     csv_filename = fields.Char(string='Filename')
-    replace_existing = fields.Boolean(string='Replace instructions', default=True, 
+    replace_existing = fields.Boolean(string='Replace instructions', default=True,
                                       help='If checked, existing instructions will be deleted before import')
     update_product_info = fields.Boolean(string='Update name & code', default=False,
                                          help='If checked, product name and code will be updated from CSV')
@@ -26,74 +38,159 @@ class InstructionImportWizard(models.TransientModel):
                 if not wizard.csv_filename.lower().endswith('.csv'):
                     raise UserError(_('Invalid file type. Please upload a CSV file.'))
 
+    def _iter_csv_rows(self):
+        """Yield ``(line_number, row dict)`` from the uploaded file without decoding it as one string."""
+        with tempfile.TemporaryFile() as raw:
+            raw.write(base64.b64decode(self.csv_file))
+            raw.seek(0)
+            text = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+            reader = csv.DictReader(text)
+            if reader.fieldnames is None or not all(header in reader.fieldnames for header in REQUIRED_HEADERS):
+                raise UserError(_('Invalid CSV format. Required columns: Product Name, Product Code, Step #, Title, Description'))
+            for row in reader:
+                # line_num counts physical lines, so quoted multi-line cells keep numbers right
+                yield reader.line_num, row
+
+    @api.model
+    def _parse_row(self, row):
+        """Return ``(vals, error)`` for one CSV row; ``vals`` lacks the product."""
+        title = (row.get('Title') or '').strip()
+        if not title:
+            return None, _('"Title" is required.')
+        if len(title) > 250:
+            return None, _('"Title" cannot exceed 250 characters.')
+        try:
+            sequence = int((row.get('Step #') or '').strip())
+        except ValueError:
+            return None, _('"Step #" must be a number.')
+        return {
+            'sequence': sequence,
+            'title': title,
+            'arkite_comment': (row.get('Description') or '').strip() or False,
+        }, None
+
+    def _read_groups(self):
+        """Validate every row and group the valid ones by Product Code.
+
+        Returns ``(groups, errors)``: ``groups`` maps a product code to
+        ``{'name': first Product Name, 'vals': [...]}`` in file order, ``errors`` is a list of
+        ``(line_number, message)``.
+        """
+        groups = {}
+        errors = []
+        for line, row in self._iter_csv_rows():
+            if not any((value or '').strip() for value in row.values() if isinstance(value, str)):
+                continue
+            vals, error = self._parse_row(row)
+            if error:
+                errors.append((line, error))
+                continue
+            code = (row.get('Product Code') or '').strip()
+            group = groups.setdefault(code, {'name': (row.get('Product Name') or '').strip(), 'vals': []})
+            group['vals'].append(vals)
+        return groups, errors
+
+    def _resolve_products(self, groups, errors):
+        """Map each product code to a product.
+
+        A file with a single product code imports into the wizard's product, as before.
+        With several codes, each group goes to the product carrying that code; groups
+        without a matching product are reported and skipped.
+        """
+        if len(groups) <= 1:
+            return {code: self.product_id for code in groups}
+
+        codes = [code for code in groups if code]
+        products = {}
+        if codes:
+            for product in self.env['product_module.product'].search([('product_code', 'in', codes)]):
+                products.setdefault(product.product_code, product)
+        if self.product_id.product_code in groups:
+            products[self.product_id.product_code] = self.product_id
+
+        for code in list(groups):
+            if code not in products:
+                errors.append((0, _('No product with code "%s": %s row(s) skipped.') % (code, len(groups[code]['vals']))))
+                del groups[code]
+        return {code: products[code] for code in groups}
+
     def action_import(self):
         """Import instructions from uploaded CSV file"""
         self.ensure_one()
-        
+
         if not self.csv_file:
             raise UserError(_('Please select a CSV file to import.'))
-        
+
         # Validate file type
         if not self.csv_filename or not self.csv_filename.lower().endswith('.csv'):
             raise UserError(_('Invalid file type. Please upload a CSV file.'))
-        
+
+        started = time.monotonic()
         try:
-            # Decode CSV file
-            csv_data = base64.b64decode(self.csv_file).decode('utf-8')
-            csv_reader = csv.DictReader(StringIO(csv_data))
-            
-            # Validate CSV format by checking headers
-            required_headers = ['Product Name', 'Product Code', 'Step #', 'Title', 'Description']
-            if csv_reader.fieldnames is None or not all(header in csv_reader.fieldnames for header in required_headers):
-                raise UserError(_('Invalid CSV format. Required columns: Product Name, Product Code, Step #, Title, Description'))
-            
-            # Update product info if checkbox is checked
-            first_row = True
-            product_name = None
-            product_code = None
-            
-            # Delete existing instructions if replace option is checked
-            if self.replace_existing:
-                self.product_id.instruction_ids.unlink()
-            
-            # Import new instructions
-            instruction_obj = self.env['product_module.instruction']
-            row_count = 0
-            for row in csv_reader:
-                row_count += 1
-                
-                # Get product info from first row
-                if first_row:
-                    product_name = row.get('Product Name', '').strip()
-                    product_code = row.get('Product Code', '').strip()
-                    first_row = False
-                    
-                    # Update product if checkbox is checked
-                    if self.update_product_info:
-                        update_vals = {}
-                        if product_name:
-                            update_vals['name'] = product_name
-                        if product_code:
-                            update_vals['product_code'] = product_code
-                        if update_vals:
-                            self.product_id.write(update_vals)
-                
-                try:
-                    sequence = int(row.get('Step #', 10))
-                except ValueError:
-                    raise UserError(_(f'Invalid CSV format. Row {row_count}: "Step #" must be a number.'))
-                
-                instruction_obj.create({
-                    'product_id': self.product_id.id,
-                    'sequence': sequence,
-                    'title': row.get('Title', '').strip(),
-                    'description': row.get('Description', '').strip(),
-                })
-            
-            return {'type': 'ir.actions.act_window_close'}
-            
+            groups, errors = self._read_groups()
         except UnicodeDecodeError:
             raise UserError(_('Invalid CSV format. File encoding must be UTF-8.'))
         except csv.Error:
             raise UserError(_('Invalid CSV format. Please check your file structure.'))
 
+        targets = self._resolve_products(groups, errors)
+        if not targets:
+            raise UserError(_('No valid rows to import.\n\n%s') % self._format_errors(errors))
+
+        # Update product info if checkbox is checked
+        if self.update_product_info:
+            for code, product in targets.items():
+                update_vals = {}
+                if groups[code]['name']:
+                    update_vals['name'] = groups[code]['name']
+                if code and len(targets) == 1:
+                    update_vals['product_code'] = code
+                if update_vals:
+                    product.write(update_vals)
+
+        # Delete existing instructions if replace option is checked
+        products = self.env['product_module.product'].browse(list(dict.fromkeys(p.id for p in targets.values())))
+        if self.replace_existing:
+            products.instruction_ids.unlink()
+
+        instruction_obj = self.env['product_module.instruction']
+        vals_list = [
+            dict(vals, product_id=targets[code].id)
+            for code in targets
+            for vals in groups[code]['vals']
+        ]
+        for start in range(0, len(vals_list), IMPORT_CHUNK_SIZE):
+            instruction_obj.create(vals_list[start:start + IMPORT_CHUNK_SIZE])
+
+        elapsed = time.monotonic() - started
+        _logger.info("[IMPORT] Imported %s instruction(s) for %s product(s) in %.2fs (%s rejected row(s))",
+                     len(vals_list), len(products), elapsed, len(errors))
+
+        message = _('%(count)s process(es) imported for %(products)s product(s) in %(seconds).1fs.') % {
+            'count': len(vals_list),
+            'products': len(products),
+            'seconds': elapsed,
+        }
+        if errors:
+            message += '\n\n' + _('%s row(s) were skipped:') % len(errors) + '\n' + self._format_errors(errors)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Import Finished'),
+                'message': message,
+                'type': 'warning' if errors else 'success',
+                'sticky': bool(errors),
+                'next': {'type': 'ir.actions.act_window_close'},
+            }
+        }
+
+    @api.model
+    def _format_errors(self, errors):
+        lines = [
+            (_('Row %(line)s: %(error)s') % {'line': line, 'error': error}) if line else error
+            for line, error in errors[:MAX_REPORTED_ERRORS]
+        ]
+        if len(errors) > MAX_REPORTED_ERRORS:
+            lines.append(_('... and %s more.') % (len(errors) - MAX_REPORTED_ERRORS))
+        return '\n'.join(lines)
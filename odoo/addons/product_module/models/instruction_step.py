@@ -4,13 +4,15 @@ from odoo.exceptions import UserError
 import requests
 import os
 import logging
-import time
+
+from ..services.arkite_client import ArkiteClient, is_valid_step_id
 
 _logger = logging.getLogger(__name__)
 
 
 class ProductModuleInstructionStep(models.Model):
     _name = 'product_module.instruction.step'
+    _inherit = ['product_module.arkite.write.behind']
     _description = 'Process Step for Instruction'
     _order = 'index, id'
     _rec_name = 'name'
@@ -138,114 +140,133 @@ class ProductModuleInstructionStep(models.Model):
     ], string='Step Control Flow', default='None',
        help='Control flow type for this step')
 
+    _arkite_patch_fields = (
+        'name', 'step_type', 'sequence', 'for_all_variants', 'variant_ids', 'text_instruction',
+        'image_instruction_id', 'detection_id', 'material_id', 'button_id', 'comment',
+        'child_step_order', 'step_controlflow',
+    )
+    _arkite_object_field = 'arkite_step_id'
+    _arkite_mirror_fields = {'Index': 'index'}
+
     _sql_constraints = [
         ('arkite_step_id_unique',
         'unique(arkite_step_id)',
         'Arkite Step ID must be unique'),
     ]
     
-    @api.model
-    def create(self, vals):
-        """Override create to create step in Arkite if arkite_step_id is empty (new step)"""
-        # Set project_id from instruction_id if not already set
-        if 'instruction_id' in vals and not vals.get('project_id'):
-            instruction = self.env['product_module.instruction'].browse(vals.get('instruction_id'))
-            if instruction and instruction.project_id:
-                vals['project_id'] = instruction.project_id.id
-        elif self.env.context.get('default_instruction_id') and not vals.get('project_id'):
-            instruction = self.env['product_module.instruction'].browse(self.env.context.get('default_instruction_id'))
-            if instruction and instruction.project_id:
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Create new steps in Arkite first: one list POST per project for the whole batch.
+
+        Rows that already carry an ``arkite_step_id`` are synced steps and are created as-is.
+        """
+        Instruction = self.env['product_module.instruction']
+        default_instruction_id = self.env.context.get('default_instruction_id')
+        pending = {}
+        for vals in vals_list:
+            instruction = Instruction.browse(vals.get('instruction_id') or default_instruction_id)
+            # Set project_id from instruction_id if not already set
+            if instruction and instruction.project_id and not vals.get('project_id'):
                 vals['project_id'] = instruction.project_id.id
-        
-        # If arkite_step_id is provided, it's a synced step - just create the record
-        if vals.get('arkite_step_id'):
-            return super().create(vals)
-        
-        # Otherwise, create a new step in Arkite for the process
-        instruction = None
-        if vals.get('instruction_id'):
-            instruction = self.env['product_module.instruction'].browse(vals.get('instruction_id'))
-        elif self.env.context.get('default_instruction_id'):
-            instruction = self.env['product_module.instruction'].browse(self.env.context.get('default_instruction_id'))
-        
-        if not instruction or not instruction.project_id:
-            raise UserError(_('Process step must be linked to a process with a project.'))
-        
-        if not instruction.arkite_process_id:
-            raise UserError(_('The process must have an Arkite Process ID to create steps. Please sync the process from Arkite first.'))
-        
-        if not instruction.project_id.arkite_project_id:
-            raise UserError(_('The project must have an Arkite Project ID to create steps.'))
-        
-        # Get credentials
+
+            # If arkite_step_id is provided, it's a synced step - just create the record
+            if vals.get('arkite_step_id'):
+                continue
+
+            if not instruction or not instruction.project_id:
+                raise UserError(_('Process step must be linked to a process with a project.'))
+            if not instruction.arkite_process_id:
+                raise UserError(_('The process must have an Arkite Process ID to create steps. Please sync the process from Arkite first.'))
+            if not instruction.project_id.arkite_project_id:
+                raise UserError(_('The project must have an Arkite Project ID to create steps.'))
+            pending.setdefault(instruction.project_id, []).append((vals, instruction))
+
+        for project, items in pending.items():
+            self._arkite_create_steps(project, items)
+        return super().create(vals_list)
+
+    @api.model
+    def _arkite_create_steps(self, project, items):
+        """POST the steps of ``items`` (``(vals, instruction)`` pairs) to ``project`` in one request.
+
+        Fills ``arkite_step_id`` / ``index`` into each ``vals`` from the created steps.
+        """
         try:
-            creds = instruction.project_id._get_arkite_credentials()
-            api_base = creds['api_base']
-            api_key = creds['api_key']
+            creds = project._get_arkite_credentials()
         except Exception as e:
             raise UserError(_('Could not get API credentials. Please check your Arkite unit configuration. Error: %s') % str(e))
-        
-        project_id = instruction.project_id.arkite_project_id
-        process_id = instruction.arkite_process_id
-        
-        # Find parent composite step if needed
-        parent_composite_id = None
+        client = ArkiteClient(api_base=creds['api_base'], api_key=creds['api_key'], verify_ssl=False, timeout_sec=20)
+        project_id = project.arkite_project_id
+
+        # Parent composite per process, from a single read of the project's steps
+        existing_steps = []
+        known_ids = None  # Ids from before the POST; create_steps reads them if we couldn't
         try:
-            url_check = f"{api_base}/projects/{project_id}/steps/"
-            params_check = {"apiKey": api_key}
-            headers_check = {"Content-Type": "application/json"}
-            check_response = requests.get(url_check, params=params_check, headers=headers_check, verify=False, timeout=10)
-            if check_response.ok:
-                all_steps = check_response.json()
-                if isinstance(all_steps, list):
-                    existing_process_steps = [s for s in all_steps if str(s.get("ProcessId", "")) == str(process_id)]
-                    if existing_process_steps:
-                        composite_in_process = next((s for s in existing_process_steps if s.get("StepType") == "COMPOSITE"), None)
-                        if composite_in_process:
-                            parent_composite_id = str(composite_in_process.get("Id", ""))
+            existing_steps = client.list_project_steps(project_id)
+            known_ids = [s.get("Id") for s in existing_steps]
         except Exception as e:
             _logger.warning("[ARKITE] Error checking existing process steps: %s", e)
-        
-        # Build step payload
+        parent_by_process = {}
+        for step in existing_steps:
+            if step.get("StepType") == "COMPOSITE" and is_valid_step_id(step.get("Id")):
+                parent_by_process.setdefault(str(step.get("ProcessId", "")), str(step["Id"]))
+
+        variant_by_name = {}
+        for variant in project.arkite_variant_ids:
+            if variant.variant_id:
+                variant_by_name.setdefault(variant.name, variant.variant_id)
+
+        payloads = [
+            self._arkite_step_payload(
+                vals, instruction.arkite_process_id,
+                parent_by_process.get(str(instruction.arkite_process_id)), variant_by_name,
+            )
+            for vals, instruction in items
+        ]
+        try:
+            created = client.create_steps(project_id, payloads, known_ids=known_ids)
+        except Exception as e:
+            _logger.error("[ARKITE] Error creating steps in Arkite: %s", e, exc_info=True)
+            raise UserError(_('Failed to create step in Arkite: %s') % str(e))
+
+        for (vals, instruction), step in zip(items, created):
+            if not step:
+                _logger.warning("[ARKITE] Step '%s' was not found in Arkite after creation", vals.get('name'))
+                continue
+            vals['arkite_step_id'] = str(step.get("Id"))
+            if step.get("Index") is not None:
+                vals['index'] = step["Index"]
+        _logger.info("[ARKITE] Created %s process step(s) in project %s", len(payloads), project_id)
+
+    @api.model
+    def _arkite_step_payload(self, vals, process_id, parent_step_id, variant_by_name):
+        """Arkite payload for a new process step built from create ``vals``."""
         # Fix: Convert sequence to Index by dividing by 10
         sequence_val = vals.get('sequence', 0)
         index_val = sequence_val // 10 if sequence_val > 0 else 0
-        
-        # Get variant IDs from Many2many field if provided
+
+        # Map variant commands ([(6, 0, ids)] or [(4, id), ...]) to Arkite variant IDs by name
+        odoo_variant_ids = []
+        for cmd in vals.get('variant_ids') or []:
+            if cmd[0] == 6:  # Replace all
+                odoo_variant_ids.extend(cmd[2] if len(cmd) > 2 else [])
+            elif cmd[0] == 4:  # Add one
+                odoo_variant_ids.append(cmd[1])
         variant_ids_arkite = []
-        if 'variant_ids' in vals and vals['variant_ids']:
-            # Extract variant IDs from the Many2many command list
-            # Format: [(6, 0, [id1, id2, ...])] or [(4, id), ...]
-            variant_commands = vals['variant_ids']
-            odoo_variant_ids = []
-            for cmd in variant_commands:
-                if cmd[0] == 6:  # Replace all
-                    odoo_variant_ids.extend(cmd[2] if len(cmd) > 2 else [])
-                elif cmd[0] == 4:  # Add one
-                    odoo_variant_ids.append(cmd[1])
-            
-            # Map Odoo variant IDs to Arkite variant IDs
-            if odoo_variant_ids and instruction.project_id:
-                odoo_variants = self.env['product_module.variant'].browse(odoo_variant_ids)
-                for odoo_variant in odoo_variants:
-                    # Try to find matching Arkite variant by name
-                    arkite_variant_temp = instruction.project_id.arkite_variant_ids.filtered(
-                        lambda v: v.name == odoo_variant.name
-                    )
-                    if arkite_variant_temp and arkite_variant_temp.variant_id:
-                        try:
-                            variant_ids_arkite.append(int(arkite_variant_temp.variant_id))
-                        except (ValueError, TypeError):
-                            pass
-        
+        for odoo_variant in self.env['product_module.variant'].browse(odoo_variant_ids):
+            try:
+                variant_ids_arkite.append(int(variant_by_name[odoo_variant.name]))
+            except (KeyError, ValueError, TypeError):
+                pass
+
         step_data = {
             "Type": "Process",
             "Name": vals.get('name', 'Unnamed Step'),
             "StepType": vals.get('step_type', 'WORK_INSTRUCTION'),
             "ProcessId": str(process_id),
-            "Index": index_val,  # Fixed: Use converted index value
+            "Index": index_val,
             "ForAllVariants": vals.get('for_all_variants', True),
-            "VariantIds": variant_ids_arkite,  # Fixed: Include variant IDs
+            "VariantIds": variant_ids_arkite,
             "TextInstruction": {},
             "ImageInstructionId": vals.get('image_instruction_id', "0") if vals.get('image_instruction_id') else "0",
             "ChildStepOrder": "Sequential" if vals.get('step_type') == "COMPOSITE" else "None",
@@ -253,184 +274,82 @@ class ProductModuleInstructionStep(models.Model):
             "StepConditions": [],
             "Comment": vals.get('comment', "") or None
         }
-        
+
         # Add optional fields based on step type
         if vals.get('text_instruction') and vals.get('step_type') == 'WORK_INSTRUCTION':
             step_data["TextInstruction"] = {"en-US": vals['text_instruction']}
-        
+
         if vals.get('detection_id'):
             step_data["DetectionId"] = vals['detection_id']
         if vals.get('material_id'):
             step_data["MaterialId"] = vals['material_id']
         if vals.get('button_id'):
             step_data["ButtonId"] = vals['button_id']
-        
-        if parent_composite_id and str(parent_composite_id) != "0":
-            step_data["ParentStepId"] = str(parent_composite_id)
-        
-        # Create step in Arkite
-        url = f"{api_base}/projects/{project_id}/steps/"
-        params = {"apiKey": api_key}
-        headers = {"Content-Type": "application/json"}
-        
-        try:
-            response = requests.post(url, params=params, json=[step_data], headers=headers, verify=False, timeout=10)
-            
-            if response.ok:
-                created_steps = response.json()
-                if isinstance(created_steps, list) and created_steps:
-                    created_step_id = created_steps[0].get("Id", "")
-                    vals['arkite_step_id'] = str(created_step_id)
-                    # Get actual index from created step
-                    if created_steps[0].get("Index") is not None:
-                        vals['index'] = created_steps[0].get("Index", 0)
-                elif isinstance(created_steps, dict):
-                    created_step_id = created_steps.get("Id", "")
-                    vals['arkite_step_id'] = str(created_step_id)
-            else:
-                # Check if step was created despite error (API bug)
-                time.sleep(1)
-                verify_response = requests.get(url, params=params, headers=headers, verify=False, timeout=10)
-                if verify_response.ok:
-                    all_steps = verify_response.json()
-                    matching_steps = [s for s in all_steps 
-                                     if s.get("Name") == step_data["Name"] 
-                                     and str(s.get("ProcessId", "")) == str(process_id)]
-                    if matching_steps:
-                        created_step_id = matching_steps[0].get("Id", "")
-                        vals['arkite_step_id'] = str(created_step_id)
-                        vals['index'] = matching_steps[0].get("Index", 0)
-        except Exception as e:
-            _logger.error("[ARKITE] Error creating step in Arkite: %s", e, exc_info=True)
-            raise UserError(_('Failed to create step in Arkite: %s') % str(e))
-        
-        return super().create(vals)
+
+        if parent_step_id:
+            step_data["ParentStepId"] = parent_step_id
+        return step_data
     
     def write(self, vals):
-        """Override write to save changes to Arkite API"""
+        """Override write to queue the changed fields for Arkite (see arkite.write.behind)"""
         # Note: project_id is a related field, so it updates automatically when instruction_id changes
+        snapshot = self._arkite_snapshot(vals)
         result = super().write(vals)
-        
-        for record in self:
-            if not record.arkite_step_id or not record.instruction_id or not record.instruction_id.project_id:
-                continue
-            
-            if not record.instruction_id.arkite_process_id or not record.instruction_id.project_id.arkite_project_id:
-                continue
-            
-            # Get credentials
-            try:
-                creds = record.instruction_id.project_id._get_arkite_credentials()
-                api_base = creds['api_base']
-                api_key = creds['api_key']
-            except Exception:
-                continue
-            
-            project_id = record.instruction_id.project_id.arkite_project_id
-            
-            try:
-                url = f"{api_base}/projects/{project_id}/steps/{record.arkite_step_id}"
-                params = {"apiKey": api_key}
-                headers = {"Content-Type": "application/json"}
-                
-                # Get current step from Arkite
-                response = requests.get(url, params=params, headers=headers, verify=False, timeout=10)
-                if not response.ok:
-                    continue
-                
-                step_data = response.json()
-                updated = False
-                
-                # Update fields that changed
-                if 'name' in vals and step_data.get("Name") != record.name:
-                    step_data["Name"] = record.name
-                    updated = True
-                
-                if 'step_type' in vals and step_data.get("StepType") != record.step_type:
-                    step_data["StepType"] = record.step_type
-                    step_data["ChildStepOrder"] = "Sequential" if record.step_type == "COMPOSITE" else "None"
-                    updated = True
-                
-                if 'sequence' in vals:
-                    # Fix: Convert sequence to Index by dividing by 10
-                    new_index = record.sequence // 10 if record.sequence > 0 else 0
-                    step_data["Index"] = new_index
-                    updated = True
-                    # Also update the index field in Odoo
-                    record.index = new_index
-                
-                if 'for_all_variants' in vals:
-                    step_data["ForAllVariants"] = record.for_all_variants
-                    if record.for_all_variants:
-                        step_data["VariantIds"] = []
-                    updated = True
-                
-                # Update variant IDs if changed
-                if 'variant_ids' in vals:
-                    variant_ids_arkite = []
-                    if record.variant_ids and record.instruction_id.project_id:
-                        # Map Odoo variant IDs to Arkite variant IDs
-                        for odoo_variant in record.variant_ids:
-                            arkite_variant_temp = record.instruction_id.project_id.arkite_variant_ids.filtered(
-                                lambda v: v.name == odoo_variant.name
-                            )
-                            if arkite_variant_temp and arkite_variant_temp.variant_id:
-                                try:
-                                    variant_ids_arkite.append(int(arkite_variant_temp.variant_id))
-                                except (ValueError, TypeError):
-                                    pass
-                    step_data["VariantIds"] = variant_ids_arkite
-                    updated = True
-                
-                if 'text_instruction' in vals and record.step_type == 'WORK_INSTRUCTION':
-                    step_data["TextInstruction"] = {"en-US": record.text_instruction} if record.text_instruction else {}
-                    updated = True
-                
-                if 'image_instruction_id' in vals:
-                    step_data["ImageInstructionId"] = record.image_instruction_id if record.image_instruction_id else "0"
-                    updated = True
-                
-                if 'detection_id' in vals:
-                    step_data["DetectionId"] = record.detection_id if record.detection_id else None
-                    updated = True
-                
-                if 'material_id' in vals:
-                    step_data["MaterialId"] = record.material_id if record.material_id else None
-                    updated = True
-                
-                if 'button_id' in vals:
-                    step_data["ButtonId"] = record.button_id if record.button_id else None
-                    updated = True
-                
-                if 'comment' in vals:
-                    step_data["Comment"] = record.comment if record.comment else None
-                    updated = True
-                
-                if 'child_step_order' in vals:
-                    step_data["ChildStepOrder"] = record.child_step_order
-                    updated = True
-                
-                if 'step_controlflow' in vals:
-                    step_data["StepControlflow"] = record.step_controlflow
-                    updated = True
-                
-                # Update step in Arkite if anything changed
-                if updated:
-                    patch_response = requests.patch(url, params=params, headers=headers, json=step_data, verify=False, timeout=10)
-                    if patch_response.ok and 'sequence' in vals:
-                        # Update index from Arkite
-                        verify_response = requests.get(url, params=params, headers=headers, verify=False, timeout=10)
-                        if verify_response.ok:
-                            updated_data = verify_response.json()
-                            # Fix: Convert Index back to sequence format for consistency
-                            arkite_index = updated_data.get("Index", 0)
-                            record.index = arkite_index
-                            # Update sequence to match (multiply by 10)
-                            record.sequence = arkite_index * 10
-            except Exception as e:
-                _logger.error("[ARKITE] Error updating step in Arkite: %s", e, exc_info=True)
-        
+        # index follows once Arkite accepted the update (see _arkite_patches_done)
+        self._arkite_queue_changes(snapshot)
         return result
+
+    def _arkite_patch_target(self):
+        self.ensure_one()
+        project = self.instruction_id.project_id
+        if not self.arkite_step_id or not self.instruction_id.arkite_process_id or not project.arkite_project_id:
+            return None
+        return project, project.arkite_project_id, f"steps/{self.arkite_step_id}/"
+
+    def _arkite_patch_values(self, field_names):
+        self.ensure_one()
+        values = {}
+        if 'name' in field_names:
+            values["Name"] = self.name
+        if 'step_type' in field_names:
+            values["StepType"] = self.step_type
+            values["ChildStepOrder"] = "Sequential" if self.step_type == "COMPOSITE" else "None"
+        if 'sequence' in field_names:
+            values["Index"] = self.sequence // 10 if self.sequence > 0 else 0
+        if 'for_all_variants' in field_names:
+            values["ForAllVariants"] = self.for_all_variants
+            if self.for_all_variants:
+                values["VariantIds"] = []
+        if 'variant_ids' in field_names:
+            # Map Odoo variants to Arkite variant IDs by name
+            variant_by_name = {}
+            for variant in self.instruction_id.project_id.arkite_variant_ids:
+                if variant.variant_id:
+                    variant_by_name.setdefault(variant.name, variant.variant_id)
+            variant_ids_arkite = []
+            for odoo_variant in self.variant_ids:
+                try:
+                    variant_ids_arkite.append(int(variant_by_name[odoo_variant.name]))
+                except (KeyError, ValueError, TypeError):
+                    pass
+            values["VariantIds"] = variant_ids_arkite
+        if 'text_instruction' in field_names and self.step_type == 'WORK_INSTRUCTION':
+            values["TextInstruction"] = {"en-US": self.text_instruction} if self.text_instruction else {}
+        if 'image_instruction_id' in field_names:
+            values["ImageInstructionId"] = self.image_instruction_id or "0"
+        if 'detection_id' in field_names:
+            values["DetectionId"] = self.detection_id or None
+        if 'material_id' in field_names:
+            values["MaterialId"] = self.material_id or None
+        if 'button_id' in field_names:
+            values["ButtonId"] = self.button_id or None
+        if 'comment' in field_names:
+            values["Comment"] = self.comment or None
+        if 'child_step_order' in field_names:
+            values["ChildStepOrder"] = self.child_step_order
+        if 'step_controlflow' in field_names:
+            values["StepControlflow"] = self.step_controlflow
+        return values
     
     def unlink(self):
         """Override unlink to delete step from Arkite when removed"""
@@ -4,7 +4,12 @@ from odoo.exceptions import UserError
 import requests
 import logging
 import base64
+import hashlib
 import io
+import json
+import time
+
+from ..services.arkite_client import ArkiteClient, created_by_position
 
 _logger = logging.getLogger(__name__)
 
@@ -13,14 +18,23 @@ class ProductModuleMaterial(models.Model):
     _description = 'Product Material'
     _order = 'name, id'
     
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """Auto-set page_id from project_id if not provided"""
-        if not vals.get('page_id') and vals.get('project_id'):
-            project = self.env['product_module.project'].browse(vals['project_id'])
-            if project and project.page_id:
-                vals['page_id'] = project.page_id.id
-        return super().create(vals)
+        for vals in vals_list:
+            if not vals.get('page_id') and vals.get('project_id'):
+                project = self.env['product_module.project'].browse(vals['project_id'])
+                if project and project.page_id:
+                    vals['page_id'] = project.page_id.id
+        records = super().create(vals_list)
+        synced = [
+            record.id for record, vals in zip(records, vals_list)
+            if vals.get('arkite_material_id') and 'arkite_sync_hash' not in vals
+        ]
+        if synced:
+            # Created from Arkite data: already in sync
+            self.browse(synced)._arkite_mark_synced()
+        return records
     
     def write(self, vals):
         """Auto-update page_id when project_id changes, and sync to Arkite if needed"""
@@ -36,12 +50,14 @@ class ProductModuleMaterial(models.Model):
             sync_needed = True
         
         result = super().write(vals)
+        from_arkite = self.env.context.get('skip_arkite_sync')
+        if (vals.get('arkite_material_id') or from_arkite and sync_needed) and 'arkite_sync_hash' not in vals:
+            # Values read from Arkite: already in sync
+            self._arkite_mark_synced()
         
         # Sync to Arkite if relevant fields changed
-        if sync_needed:
-            for material in self:
-                if material.project_id and material.project_id.arkite_project_id:
-                    material._sync_to_arkite(create=False)
+        if sync_needed and not from_arkite:
+            self._arkite_sync_changed()
         
         return result
 
@@ -68,6 +84,12 @@ class ProductModuleMaterial(models.Model):
         readonly=True,
         help='Material ID from Arkite platform (auto-filled when synced)'
     )
+    arkite_sync_hash = fields.Char(
+        string='Arkite Sync Hash',
+        readonly=True,
+        copy=False,
+        help='Checksum of the data last pushed to Arkite; unchanged materials are not sent again'
+    )
 
     # Relationships
     page_id = fields.Many2one('product_module.page', string='Page', ondelete='cascade')
@@ -257,119 +279,142 @@ class ProductModuleMaterial(models.Model):
         
         return False
     
-    def _sync_to_arkite(self, create=False):
-        """Sync material to Arkite (create or update)"""
+    def _arkite_payload(self):
+        """Material as sent to Arkite"""
         self.ensure_one()
-        
-        if not self.project_id or not self.project_id.arkite_project_id:
-            return
-        
-        # Get credentials
-        try:
-            creds = self.project_id._get_arkite_credentials()
-            api_base = creds['api_base']
-            api_key = creds['api_key']
-        except Exception:
-            _logger.warning("Could not get credentials for syncing material to Arkite")
-            return
-        
         # Parse picking bin IDs
         picking_bin_ids = []
         if self.picking_bin_ids_text:
             text = self.picking_bin_ids_text.strip()
             if text:
-                try:
-                    picking_bin_ids = [int(bid.strip()) for bid in text.split(',') if bid.strip().isdigit()]
-                except ValueError:
-                    _logger.warning("Invalid picking bin IDs format, skipping")
-        
-        # Build material payload
+                picking_bin_ids = [int(bid.strip()) for bid in text.split(',') if bid.strip().isdigit()]
+
         material_data = {
             "Name": self.name or 'Unnamed Material',
             "Type": self.material_type or 'StandardMaterial',
             "Description": self.description or '',
         }
-        
         if self.image_id:
             try:
                 material_data["ImageId"] = int(self.image_id)
             except ValueError:
                 pass  # Skip if not a valid number
-        
         if picking_bin_ids:
             material_data["PickingBinIds"] = picking_bin_ids
-        
-        if create:
-            # Create material in Arkite
-            url = f"{api_base}/projects/{self.project_id.arkite_project_id}/materials/"
-            params = {"apiKey": api_key}
-            headers = {"Content-Type": "application/json"}
-            
-            _logger.info("[ARKITE] Creating material: %s", material_data)
-            
-            try:
-                response = requests.post(url, params=params, headers=headers, json=[material_data], verify=False, timeout=10)
-                if response.ok:
-                    created_materials = response.json()
-                    if isinstance(created_materials, list) and created_materials:
-                        created = created_materials[0]
-                        arkite_id = str(created.get("Id", ""))
-                        if arkite_id:
-                            # Use sudo to write to avoid recursion
-                            self.sudo().write({'arkite_material_id': arkite_id})
-                            _logger.info("[ARKITE] Created material with ID: %s", arkite_id)
-                    elif isinstance(created_materials, dict):
-                        arkite_id = str(created_materials.get("Id", ""))
-                        if arkite_id:
-                            self.sudo().write({'arkite_material_id': arkite_id})
-                            _logger.info("[ARKITE] Created material with ID: %s", arkite_id)
-                else:
-                    error_text = response.text[:500] if response.text else "Unknown error"
-                    _logger.error("[ARKITE] Failed to create material: HTTP %s - %s", response.status_code, error_text)
-            except requests.exceptions.RequestException as e:
-                _logger.error("[ARKITE] Error creating material: %s", e, exc_info=True)
+        return material_data
+
+    @staticmethod
+    def _arkite_payload_hash(payload):
+        return hashlib.sha1(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _arkite_mark_synced(self):
+        """Record the current data as the last state known to Arkite."""
+        self._arkite_store_sync({
+            material.id: self._arkite_payload_hash(material._arkite_payload()) for material in self
+        })
+
+    @api.model
+    def _arkite_store_sync(self, hashes, arkite_ids=None):
+        """Store ``{material id: sync hash}`` (and ``{material id: Arkite id}``) in one UPDATE.
+
+        Bypasses ``write()``, so storing the sync state never triggers another sync.
+        """
+        if not hashes:
+            return
+        ids = list(hashes)
+        if arkite_ids:
+            self.env.cr.execute(
+                f'UPDATE "{self._table}" AS m SET arkite_sync_hash = v.hash, arkite_material_id = v.arkite_id '
+                'FROM unnest(%s::int[], %s::varchar[], %s::varchar[]) AS v(id, hash, arkite_id) WHERE m.id = v.id',
+                [ids, [hashes[i] for i in ids], [arkite_ids[i] for i in ids]],
+            )
+            self.browse(ids).invalidate_recordset(['arkite_sync_hash', 'arkite_material_id'])
         else:
-            # Update material in Arkite
-            if not self.arkite_material_id:
-                # If no Arkite ID exists, create it instead
-                self._sync_to_arkite(create=True)
-                return
-            
-            url = f"{api_base}/projects/{self.project_id.arkite_project_id}/materials/{self.arkite_material_id}/"
-            params = {"apiKey": api_key}
-            headers = {"Content-Type": "application/json"}
-            
-            _logger.info("[ARKITE] Updating material %s: %s", self.arkite_material_id, material_data)
-            
+            self.env.cr.execute(
+                f'UPDATE "{self._table}" AS m SET arkite_sync_hash = v.hash '
+                'FROM unnest(%s::int[], %s::varchar[]) AS v(id, hash) WHERE m.id = v.id',
+                [ids, [hashes[i] for i in ids]],
+            )
+            self.browse(ids).invalidate_recordset(['arkite_sync_hash'])
+
+    def _arkite_sync_changed(self, force=False):
+        """Push the materials whose Arkite data changed since their last sync.
+
+        Unchanged materials (same payload hash) are skipped unless ``force``. New materials
+        of a project are created with one list POST (Ids matched back by position), known
+        ones patched; the calls of a project run concurrently, bounded by
+        ``product_module.arkite_sync_workers``. Returns the number of materials sent.
+        """
+        materials = self.filtered(lambda m: m.project_id.arkite_project_id)
+        sent = 0
+        for project in materials.project_id:
             try:
-                response = requests.patch(url, params=params, headers=headers, json=material_data, verify=False, timeout=10)
-                if response.ok:
-                    _logger.info("[ARKITE] Updated material %s successfully", self.arkite_material_id)
+                creds = project._get_arkite_credentials()
+            except Exception:
+                _logger.warning("Could not get credentials for syncing material to Arkite")
+                continue
+
+            base_path = f"projects/{project.arkite_project_id}/materials/"
+            project_materials = materials.filtered(lambda m: m.project_id == project)
+            calls = []
+            hashes = {}
+            new_materials = self.browse()
+            new_payloads = []
+            for material in project_materials:
+                payload = material._arkite_payload()
+                digest = self._arkite_payload_hash(payload)
+                if material.arkite_material_id:
+                    if not force and digest == material.arkite_sync_hash:
+                        continue
+                    calls.append((material.id, 'PATCH', f"{base_path}{material.arkite_material_id}/", payload))
                 else:
-                    _logger.warning("[ARKITE] Failed to update material: HTTP %s, %s", response.status_code, response.text[:200])
-            except requests.exceptions.RequestException as e:
-                _logger.error("[ARKITE] Error updating material: %s", e, exc_info=True)
-    
+                    new_materials |= material
+                    new_payloads.append(payload)
+                hashes[material.id] = digest
+            if new_payloads:
+                calls.append(('create', 'POST', base_path, new_payloads))
+            if not calls:
+                continue
+
+            started = time.monotonic()
+            client = ArkiteClient(api_base=creds['api_base'], api_key=creds['api_key'], verify_ssl=False, timeout_sec=10)
+            results = client.send_many(calls, max_workers=project._arkite_sync_pool_size())
+
+            failed = 0
+            if new_payloads:
+                reply, error = results.pop('create')
+                created = None if error else created_by_position(reply, len(new_payloads))
+                if created is None:
+                    failed += len(new_materials)
+                    _logger.warning("[ARKITE] Failed to create %s material(s): %s",
+                                    len(new_materials), error or "Arkite returned no matching IDs")
+                else:
+                    self._arkite_store_sync(
+                        {material.id: hashes[material.id] for material in new_materials},
+                        {material.id: str(item["Id"]) for material, item in zip(new_materials, created)},
+                    )
+            patched = {}
+            for material in project_materials.filtered(lambda m: m.id in results):
+                reply, error = results[material.id]
+                if error:
+                    failed += 1
+                    _logger.warning("[ARKITE] Failed to sync material %s: %s", material.name, error)
+                    continue
+                patched[material.id] = hashes[material.id]
+            self._arkite_store_sync(patched)
+            sent += len(hashes)
+            _logger.info("[ARKITE] Synced %s of %s material(s) for project %s in %.2fs (%s failed)",
+                         len(hashes), len(project_materials), project.arkite_project_id,
+                         time.monotonic() - started, failed)
+        return sent
+
     def unlink(self):
         """Delete material from Arkite when deleted in Odoo"""
-        for material in self:
-            if material.arkite_material_id and material.project_id and material.project_id.arkite_project_id:
-                try:
-                    creds = material.project_id._get_arkite_credentials()
-                    api_base = creds['api_base']
-                    api_key = creds['api_key']
-                    
-                    url = f"{api_base}/projects/{material.project_id.arkite_project_id}/materials/{material.arkite_material_id}/"
-                    params = {"apiKey": api_key}
-                    
-                    response = requests.delete(url, params=params, verify=False, timeout=10)
-                    if response.ok:
-                        _logger.info("[ARKITE] Deleted material %s", material.arkite_material_id)
-                    else:
-                        _logger.warning("[ARKITE] Failed to delete material: HTTP %s", response.status_code)
-                except Exception as e:
-                    _logger.warning("[ARKITE] Error deleting material: %s", e)
-        
+        remote = self.filtered(lambda m: m.arkite_material_id and m.project_id.arkite_project_id)
+        for project in remote.project_id:
+            project._arkite_delete_materials(
+                remote.filtered(lambda m: m.project_id == project).mapped('arkite_material_id')
+            )
         return super().unlink()
     
     def action_select_arkite_image(self):
@@ -43,12 +43,12 @@ class ProductAssemblePage(models.Model):
         string='Progress Tracking'
     )
 
-    # Computed counts for display
-    project_count = fields.Integer(string='Project Count', compute='_compute_counts')
-    job_count = fields.Integer(string='Job Count', compute='_compute_counts')
-    product_count = fields.Integer(string='Product Count', compute='_compute_counts')
-    material_count = fields.Integer(string='Material Count', compute='_compute_counts')
-    progress_count = fields.Integer(string='Progress Count', compute='_compute_counts')
+    # Computed counts for display (stored, so the dashboard doesn't load every child record)
+    project_count = fields.Integer(string='Project Count', compute='_compute_counts', store=True)
+    job_count = fields.Integer(string='Job Count', compute='_compute_counts', store=True)
+    product_count = fields.Integer(string='Product Count', compute='_compute_counts', store=True)
+    material_count = fields.Integer(string='Material Count', compute='_compute_counts', store=True)
+    progress_count = fields.Integer(string='Progress Count', compute='_compute_counts', store=True)
 
     # Selected product for Product Details tab
     selected_product_id = fields.Many2one('product_module.product', string='Selected Product')
@@ -61,12 +61,25 @@ class ProductAssemblePage(models.Model):
     @api.depends('project_ids', 'product_type_ids', 'product_ids', 'material_ids', 'progress_ids')
     def _compute_counts(self):
         """Compute project, job, product, material and progress counts for display"""
-        for record in self:
-            record.project_count = len(record.project_ids)
-            record.job_count = len(record.product_type_ids)
-            record.product_count = len(record.product_ids)
-            record.material_count = len(record.material_ids)
-            record.progress_count = len(record.progress_ids)
+        counters = {
+            'project_count': 'product_module.project',
+            'job_count': 'product_module.type',
+            'product_count': 'product_module.product',
+            'material_count': 'product_module.material',
+            'progress_count': 'product_module.progress',
+        }
+        page_ids = [pid for pid in self.ids if pid]
+        for field_name, model_name in counters.items():
+            counts = {}
+            if page_ids:
+                counts = {
+                    page.id: count
+                    for page, count in self.env[model_name]._read_group(
+                        [('page_id', 'in', page_ids)], ['page_id'], ['__count'],
+                    )
+                }
+            for record in self:
+                record[field_name] = counts.get(record.id, 0)
 
     def action_edit_product(self):
         """Open the selected product for editing"""
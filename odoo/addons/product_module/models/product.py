@@ -3,16 +3,17 @@ from odoo import models, fields, api, _
 from odoo.exceptions import UserError
 
 import base64
-import io
-import csv
 import os
 import json
 from datetime import datetime, timezone
-from io import StringIO, BytesIO
+
+from ..services.instruction_export import export_url
+from ..services.qr_render import render_qr_label_png
 
 
 class ProductModuleProduct(models.Model):
     _name = 'product_module.product'
+    _inherit = ['product_module.qr.mixin']
     _description = 'Registered Product for Assembly'
     _order = 'sequence, id'
 
@@ -26,15 +27,11 @@ class ProductModuleProduct(models.Model):
 
     # Product Information
     name = fields.Char(string='Product Name', required=True, size=12)
-    product_code = fields.Char(string='Product Code', required=True, size=16)
+    # Indexed on its own: the unique constraint is skipped on databases that already hold duplicates
+    product_code = fields.Char(string='Product Code', required=True, size=16, index=True)
     description = fields.Text(string='Product Description', size=250)
     image = fields.Binary(string='Image', attachment=True)
 
-    # QR Code fields
-    qr_text = fields.Char(string='QR Text', compute='_compute_qr', store=False)
-    qr_image = fields.Binary(string='QR Code', compute='_compute_qr', attachment=True, store=False)
-    qr_image_name = fields.Char(string='QR Filename', compute='_compute_qr_filename', store=False)
-
     # Materials relationship
     material_ids = fields.Many2many(
         'product_module.material',
@@ -46,6 +43,13 @@ class ProductModuleProduct(models.Model):
     instruction_ids = fields.One2many('product_module.instruction', 'product_id', string='Processes')
     instruction_count = fields.Integer(string='Process Count', compute='_compute_instruction_count')
 
+    _sql_constraints = [
+        # Unique index also serves QR scanner lookups by code
+        ('product_code_unique',
+        'unique(product_code)',
+        'Product Code must be unique'),
+    ]
+
     # -------------------------
     # Input constraints
     # -------------------------
@@ -67,55 +71,35 @@ class ProductModuleProduct(models.Model):
             if record.description and len(record.description) > 250:
                 raise UserError(_('Description cannot exceed 250 characters.'))
 
-    # -------------------------
-    # QR generation
-    # -------------------------
-    @api.depends('product_code')
-    def _compute_qr(self):
-        """Generate QR code from product_code"""
-        for record in self:
-            code = (record.product_code or '').strip()
-            record.qr_text = code or False
-
-            if not code:
-                record.qr_image = False
-                continue
-
-            try:
-                import qrcode
-            except ImportError:
-                record.qr_image = False
-                continue
-
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=2,
-            )
-            qr.add_data(code)
-            qr.make(fit=True)
-            img = qr.make_image(fill_color="black", back_color="white")
-
-            buf = io.BytesIO()
-            img.save(buf, format='PNG')
-            record.qr_image = base64.b64encode(buf.getvalue())
-
-    @api.depends('product_code')
-    def _compute_qr_filename(self):
-        """Generate filename for QR code download"""
-        for record in self:
-            if record.product_code:
-                record.qr_image_name = f'qr_{record.product_code}.png'
-            else:
-                record.qr_image_name = 'qr_code.png'
-
     @api.depends('instruction_ids')
     def _compute_instruction_count(self):
         """Count number of processes for this product"""
         for record in self:
             record.instruction_count = len(record.instruction_ids)
 
+    def copy_data(self, default=None):
+        """Give duplicates a free product code (the code must be unique)"""
+        vals_list = super().copy_data(default=default)
+        if default and 'product_code' in default:
+            return vals_list
+        taken = set()
+        for record, vals in zip(self, vals_list):
+            vals['product_code'] = record._copy_product_code(taken)
+            taken.add(vals['product_code'])
+        return vals_list
+
+    def _copy_product_code(self, taken=()):
+        """The code with the first free -2, -3, ... suffix, cut to stay within 16 characters."""
+        self.ensure_one()
+        code = self.product_code or ''
+        number = 2
+        while True:
+            suffix = f'-{number}'
+            candidate = code[:16 - len(suffix)] + suffix
+            if candidate not in taken and not self.search_count([('product_code', '=', candidate)], limit=1):
+                return candidate
+            number += 1
+
     # -------------------------
     # Helpers: MQTT publishing
     # -------------------------
@@ -270,46 +254,9 @@ class ProductModuleProduct(models.Model):
             raise UserError(_('Please set a product code first to generate QR code.'))
 
         try:
-            import qrcode
-            from PIL import Image, ImageDraw, ImageFont
+            img_bytes = render_qr_label_png((self.product_code, self.name or 'Product'))
         except ImportError:
             raise UserError(_('QR code generation library not available.'))
-
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(self.product_code)
-        qr.make(fit=True)
-        qr_img = qr.make_image(fill_color="black", back_color="white")
-
-        qr_width, qr_height = qr_img.size
-        text_height = 80
-        total_height = qr_height + text_height
-
-        final_img = Image.new('RGB', (qr_width, total_height), 'white')
-        final_img.paste(qr_img, (0, 0))
-
-        draw = ImageDraw.Draw(final_img)
-        text = self.name or 'Product'
-
-        try:
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 24)
-        except Exception:
-            font = ImageFont.load_default()
-
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_x = (qr_width - text_width) // 2
-        text_y = qr_height + 20
-
-        draw.text((text_x, text_y), text, fill='black', font=font)
-
-        img_buffer = BytesIO()
-        final_img.save(img_buffer, format='PNG')
-        img_bytes = img_buffer.getvalue()
         img_base64 = base64.b64encode(img_bytes)
 
         filename = f"{self.product_code}_qr_code.png"
@@ -358,40 +305,12 @@ class ProductModuleProduct(models.Model):
             }
         }
 
-    def action_export_instructions(self):
-        """Export product info and processes to CSV file"""
-        output = StringIO()
-        writer = csv.writer(output)
-
-        writer.writerow(['Product Name', 'Product Code', 'Step #', 'Process Title', 'Process Steps'])
-
-        for instruction in self.instruction_ids.sorted(key=lambda r: r.sequence):
-            writer.writerow([
-                self.name or '',
-                self.product_code or '',
-                instruction.sequence,
-                instruction.title or '',
-                dict(instruction._fields['process_step'].selection).get(instruction.process_step, '') or ''
-            ])
-
-        csv_data = output.getvalue()
-        output.close()
-
-        csv_bytes = csv_data.encode('utf-8')
-        csv_base64 = base64.b64encode(csv_bytes)
-
-        filename = f"{self.name or 'product'}_processes.csv"
-        attachment = self.env['ir.attachment'].create({
-            'name': filename,
-            'type': 'binary',
-            'datas': csv_base64,
-            'res_model': self._name,
-            'res_id': self.id,
-            'mimetype': 'text/csv'
-        })
-
+    def action_export_instructions(self, file_format='csv'):
+        """Download the processes of the selected products (streamed, no attachment is stored)"""
+        if not self:
+            raise UserError(_('Please select at least one product.'))
         return {
             'type': 'ir.actions.act_url',
-            'url': f'/web/content/{attachment.id}?download=true',
+            'url': export_url(self._name, self.ids, file_format),
             'target': 'self',
         }
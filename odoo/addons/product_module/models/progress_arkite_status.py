@@ -0,0 +1,104 @@
+# product_module/models/progress_arkite_status.py
+from odoo import models, fields, api
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import time
+
+from ..services.arkite_client import ArkiteClient
+
+_logger = logging.getLogger(__name__)
+
+# Fields copied from ArkiteClient.get_unit_status() into the snapshot
+STATUS_FIELDS = ('loaded_project_id', 'loaded_project_name', 'active_process_id', 'active_step_info')
+
+
+class ProductModuleProgressArkiteStatus(models.Model):
+    """Last known Arkite state of a Unit Tracking record.
+
+    Written by the ``ir_cron_poll_unit_arkite_status`` poller so the Unit Tracking
+    views read a table instead of calling Arkite on every render.
+    """
+    _name = 'product_module.progress.arkite.status'
+    _description = 'Unit Tracking Arkite Status Snapshot'
+    _order = 'progress_id'
+
+    progress_id = fields.Many2one(
+        'product_module.progress',
+        string='Unit',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    loaded_project_id = fields.Char(string='Loaded Project ID')
+    loaded_project_name = fields.Char(string='Loaded Project Name')
+    active_process_id = fields.Char(string='Active Process ID')
+    active_step_info = fields.Text(string='Active Step Info')
+    error_message = fields.Char(string='Last Error')
+    fetched_at = fields.Datetime(string='Last Updated')
+
+    _sql_constraints = [
+        ('progress_unique', 'unique(progress_id)', 'A unit can only have one Arkite status snapshot.'),
+    ]
+
+    @staticmethod
+    def _fetch_unit_status(api_base, api_key, unit_id):
+        """Runs in a worker thread: network only, no ORM access."""
+        client = ArkiteClient(api_base=api_base, api_key=api_key, verify_ssl=False, timeout_sec=5)
+        try:
+            return client.get_unit_status(unit_id), False
+        except Exception as e:
+            return None, str(e)[:250]
+
+    @api.model
+    def _poll(self, progress_records):
+        """Fetch the Arkite status of ``progress_records`` concurrently and store the snapshots."""
+        units = {
+            record.id: (record.arkite_api_base, record.arkite_api_key, record.arkite_unit_id)
+            for record in progress_records
+            if record.arkite_api_base and record.arkite_api_key and record.arkite_unit_id
+        }
+        if not units:
+            return
+
+        started = time.monotonic()
+        ICP = self.env['ir.config_parameter'].sudo()
+        try:
+            workers = max(1, int(ICP.get_param('product_module.arkite_status_workers', 8)))
+        except (TypeError, ValueError):
+            workers = 8
+        with ThreadPoolExecutor(max_workers=min(workers, len(units))) as pool:
+            futures = {
+                progress_id: pool.submit(self._fetch_unit_status, *config)
+                for progress_id, config in units.items()
+            }
+            results = {progress_id: future.result() for progress_id, future in futures.items()}
+
+        now = fields.Datetime.now()
+        snapshots = {snap.progress_id.id: snap for snap in self.search([('progress_id', 'in', list(units))])}
+        new_vals = []
+        for progress_id, (status, error) in results.items():
+            if status is None:
+                # Keep the last known state; only record the error
+                vals = {'error_message': error}
+            else:
+                vals = {name: status[name] for name in STATUS_FIELDS}
+                vals.update({'error_message': False, 'fetched_at': now})
+            if progress_id in snapshots:
+                snapshots[progress_id].write(vals)
+            else:
+                new_vals.append(dict(vals, progress_id=progress_id))
+        if new_vals:
+            self.create(new_vals)
+
+        failed = sum(1 for status, _error in results.values() if status is None)
+        _logger.info("[ARKITE STATUS] Polled %s unit(s) in %.2fs (%s failed)",
+                     len(units), time.monotonic() - started, failed)
+
+    @api.model
+    def _cron_poll_unit_status(self):
+        units = self.env['product_module.progress'].search([
+            ('arkite_unit_id', '!=', False),
+            ('arkite_api_base', '!=', False),
+            ('arkite_api_key', '!=', False),
+        ])
+        self._poll(units)
@@ -159,6 +159,18 @@ class ProductModuleProgress(models.Model):
         store=False,
         help='Information about the currently active step'
     )
+    arkite_status_updated_at = fields.Datetime(
+        string='Arkite Status Updated',
+        compute='_compute_arkite_project_info',
+        store=False,
+        help='When the Arkite status of this unit was last fetched'
+    )
+    arkite_status_error = fields.Char(
+        string='Arkite Status Error',
+        compute='_compute_arkite_project_info',
+        store=False,
+        help='Error of the last failed status poll, if any'
+    )
 
     @api.depends('completed_steps', 'total_steps')
     def _compute_progress_percentage(self):
@@ -279,65 +291,24 @@ class ProductModuleProgress(models.Model):
             record.arkite_projects_html = '<div style="text-align: center; padding: 20px; color: #856404;"><i class="fa fa-info-circle"></i> No projects loaded yet.</div>'
     
     def _compute_arkite_project_info(self):
-        """Fetch current project and step info from Arkite API"""
+        """Read the unit's Arkite state from the status snapshot (kept fresh by the status poller)"""
+        snapshots = {
+            snap.progress_id.id: snap
+            for snap in self.env['product_module.progress.arkite.status'].search([('progress_id', 'in', self.ids)])
+        }
         for record in self:
-            record.arkite_project_name = ''
-            record.arkite_loaded_project_id = ''
-            record.arkite_loaded_project_name = ''
-            record.arkite_active_process_id = ''
-            record.arkite_active_step_info = ''
-            
-            if not record.arkite_api_base or not record.arkite_api_key or not record.arkite_unit_id:
-                continue
-            
-            try:
-                # Get loaded project
-                url = f"{record.arkite_api_base}/units/{record.arkite_unit_id}/loadedProject"
-                params = {"apiKey": record.arkite_api_key}
-                headers = {"Content-Type": "application/json"}
-                
-                response = requests.get(url, params=params, headers=headers, verify=False, timeout=5)
-                if response.ok:
-                    project_data = response.json()
-                    if project_data and project_data.get('Id'):
-                        record.arkite_loaded_project_id = str(project_data.get('Id'))
-                        record.arkite_loaded_project_name = project_data.get('Name', 'Unknown')
-                        record.arkite_project_name = project_data.get('Name', 'Unknown')
-                        
-                        # Try to get active steps
-                        # First, get processes for the project
-                        processes_url = f"{record.arkite_api_base}/projects/{record.arkite_loaded_project_id}/processes"
-                        processes_response = requests.get(processes_url, params=params, headers=headers, verify=False, timeout=5)
-                        if processes_response.ok:
-                            processes = processes_response.json()
-                            if processes and isinstance(processes, list) and len(processes) > 0:
-                                # Get first process ID
-                                process_id = processes[0].get('Id')
-                                if process_id:
-                                    record.arkite_active_process_id = str(process_id)
-                                    
-                                    # Get active steps for this process
-                                    steps_url = f"{record.arkite_api_base}/units/{record.arkite_unit_id}/processes/{process_id}/activeSteps"
-                                    steps_response = requests.get(steps_url, params=params, headers=headers, verify=False, timeout=5)
-                                    if steps_response.ok:
-                                        steps_data = steps_response.json()
-                                        if steps_data:
-                                            step_info_parts = []
-                                            if isinstance(steps_data, list):
-                                                for step in steps_data[:3]:  # Show first 3 steps
-                                                    step_name = step.get('Name', 'Unknown')
-                                                    step_info_parts.append(step_name)
-                                            elif isinstance(steps_data, dict):
-                                                step_name = steps_data.get('Name', 'Unknown')
-                                                step_info_parts.append(step_name)
-                                            
-                                            if step_info_parts:
-                                                record.arkite_active_step_info = ' | '.join(step_info_parts)
-                                            else:
-                                                record.arkite_active_step_info = 'No active steps'
-            except Exception as e:
-                _logger.debug("Error fetching Arkite project info: %s", e)
-                # Silently fail - don't show errors in computed fields
+            snap = snapshots.get(record.id)
+            record.arkite_project_name = snap.loaded_project_name if snap else ''
+            record.arkite_loaded_project_id = snap.loaded_project_id if snap else ''
+            record.arkite_loaded_project_name = snap.loaded_project_name if snap else ''
+            record.arkite_active_process_id = snap.active_process_id if snap else ''
+            record.arkite_active_step_info = snap.active_step_info if snap else ''
+            record.arkite_status_updated_at = snap.fetched_at if snap else False
+            record.arkite_status_error = snap.error_message if snap else False
+
+    def action_refresh_arkite_status(self):
+        """Poll Arkite for these units now instead of waiting for the background poller"""
+        self.env['product_module.progress.arkite.status']._poll(self)
 
     @api.constrains('name')
     def _check_name(self):
@@ -399,12 +370,16 @@ class ProductModuleProgress(models.Model):
         # If product is being changed, recompute total_steps for affected records
         if 'product_id' in vals:
             self._compute_total_steps()
+        if any(field in vals for field in ('name', 'arkite_api_base', 'arkite_api_key', 'arkite_unit_id')):
+            # Projects may take their credentials from Unit Tracking (matched by name)
+            self.env['product_module.project']._arkite_credentials_cache_clear()
         return result
 
     @api.model
     def create(self, vals):
         """Override create to compute total_steps immediately"""
         record = super().create(vals)
+        self.env['product_module.project']._arkite_credentials_cache_clear()
         # Compute total_steps after creation
         record._compute_total_steps()
         return record
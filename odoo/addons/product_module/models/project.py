@@ -7,7 +7,9 @@ import logging
 import time
 import json
 from datetime import datetime, timezone
-from ..services.arkite_client import ArkiteClient
+from ..services.arkite_client import ArkiteClient, steps_fingerprint
+from ..services.instruction_export import export_url
+from ..services.reconcile import ReconcileSpec, reconcile
 _logger = logging.getLogger(__name__)
 
 
@@ -79,8 +81,10 @@ class ProductModuleProject(models.Model):
             },
         }
     _name = 'product_module.project'
+    _inherit = ['product_module.qr.mixin']
     _description = 'Product Project'
     _order = 'sequence, name, id'
+    _qr_source_fields = ('name', 'arkite_project_id')
 
     page_id = fields.Many2one('product_module.page', string='Page', ondelete='cascade')
     sequence = fields.Integer(string='Sequence', default=10)
@@ -92,8 +96,9 @@ class ProductModuleProject(models.Model):
     job_count = fields.Integer(string='Total Jobs', compute='_compute_job_count')
 
     active_completion_time = fields.Integer(
-        string='Completion Time',
-        default=0
+        string='Accumulated Active Time',
+        default=0,
+        help='Seconds spent in progress before the current running segment'
     )
     status = fields.Selection(
         [
@@ -194,29 +199,6 @@ class ProductModuleProject(models.Model):
         help='Steps for the currently selected process. Select a process first to view/edit its steps.'
     )
 
-    @api.depends('instruction_ids.is_completed')
-    def _compute_status_and_time(self):
-        for project in self:
-            steps = project.instruction_ids
-            if not steps:
-                project.status = 'not_started'
-                continue
-
-            completed = steps.filtered('is_completed')
-
-            if not completed:
-                project.status = 'not_started'
-            elif len(completed) < len(steps):
-                project.status = 'in_progress'
-            else:
-                project.status = 'done'
-    
-    @api.model
-    def cron_increment_active_time(self):
-        projects = self.search([('status', '=', 'in_progress')])
-        for project in projects:
-            project.active_completion_time += 1
-        
     @api.depends('selected_instruction_id', 'selected_instruction_id.process_step_ids')
     def _compute_selected_instruction_steps(self):
         """Compute steps from selected instruction"""
@@ -259,26 +241,6 @@ class ProductModuleProject(models.Model):
         help='Materials used in this project'
     )
     
-    # QR Code fields (computed from project name or first variant)
-    qr_text = fields.Char(
-        string='QR Text',
-        compute='_compute_qr',
-        store=False,
-        help='QR code text (typically project name or variant code)'
-    )
-    qr_image = fields.Binary(
-        string='QR Code',
-        compute='_compute_qr',
-        attachment=True,
-        store=False,
-        help='QR code image'
-    )
-    qr_image_name = fields.Char(
-        string='QR Filename',
-        compute='_compute_qr_filename',
-        store=False
-    )
-    
     # Arkite Steps, Variants, Processes, and Detections (One2many to transient models)
     arkite_variant_ids = fields.One2many(
         'product_module.arkite.variant.temp',
@@ -352,6 +314,15 @@ class ProductModuleProject(models.Model):
         compute='_compute_workstation_detection_info',
         help='Detections configured in the linked Arkite project'
     )
+    arkite_detections_snapshot = fields.Text(
+        string='Arkite Detections Snapshot',
+        help='Detections of the linked Arkite project (JSON) as last fetched; refreshed in the background'
+    )
+    arkite_detections_fetched_at = fields.Datetime(
+        string='Detections Fetched At',
+        readonly=True,
+        help='When the detections snapshot was last fetched from Arkite'
+    )
     
     arkite_material_ids = fields.One2many(
         'product_module.arkite.material.temp',
@@ -413,6 +384,16 @@ class ProductModuleProject(models.Model):
         
         return {'type': 'ir.actions.client', 'tag': 'reload'}
 
+    def action_export_instructions(self, file_format='csv'):
+        """Download the processes of the selected projects (streamed, no attachment is stored)"""
+        if not self:
+            raise UserError(_('Please select at least one project.'))
+        return {
+            'type': 'ir.actions.act_url',
+            'url': export_url(self._name, self.ids, file_format),
+            'target': 'self',
+        }
+
     @api.depends('job_ids')
     def _compute_job_count(self):
         """Count number of jobs for this project"""
@@ -554,203 +535,129 @@ class ProductModuleProject(models.Model):
         for record in self:
             record.arkite_linked = bool(record.arkite_project_id)
     
-    @api.depends('name', 'arkite_project_id')
-    def _compute_qr(self):
-        """Generate QR code from project name or Arkite project ID"""
-        import base64
-        import io
-        for record in self:
-            # Use Arkite project ID if available, otherwise use project name
-            code = (record.arkite_project_id or record.name or '').strip()
-            record.qr_text = code or False
+    def _get_qr_code(self):
+        """Use the Arkite project ID if available, otherwise the project name"""
+        self.ensure_one()
+        return (self.arkite_project_id or self.name or '').strip()
+    
+    def refresh_detection_info(self):
+        """Re-fetch the detections snapshot from Arkite"""
+        self._refresh_detection_snapshot()
+
+    @staticmethod
+    def _extract_detection_list(payload):
+        """Return the detection list from a /detections/ response (plain list or wrapped in a dict)"""
+        if isinstance(payload, dict):
+            if 'detections' in payload:
+                payload = payload['detections']
+            elif 'Detections' in payload:
+                payload = payload['Detections']
+            else:
+                payload = next((value for value in payload.values() if isinstance(value, list)), [])
+        return payload if isinstance(payload, list) else []
 
-            if not code:
-                record.qr_image = False
-                continue
+    def _store_detection_snapshot(self, detections):
+        # Saved with the mirror version, in plain SQL (see _arkite_mirror_update): this runs
+        # from the refresh crons, and write() would push staged edits to Arkite.
+        self._arkite_mirror_update({'detection': detections})
 
+    def _refresh_detection_snapshot(self):
+        """Fetch detections for each linked project and store them as its snapshot"""
+        for record in self.filtered('arkite_project_id'):
             try:
-                import qrcode
-            except ImportError:
-                record.qr_image = False
+                creds = record._get_arkite_credentials()
+                url = f"{creds['api_base']}/projects/{record.arkite_project_id}/detections/"
+                response = requests.get(
+                    url,
+                    params={"apiKey": creds['api_key']},
+                    headers={"Content-Type": "application/json"},
+                    verify=False,
+                    timeout=10,
+                )
+                if not response.ok:
+                    _logger.warning("[ARKITE] Could not refresh detections of project %s: HTTP %s",
+                                    record.id, response.status_code)
+                    continue
+                detections = self._extract_detection_list(response.json())
+            except Exception as e:
+                _logger.warning("[ARKITE] Could not refresh detections of project %s: %s", record.id, e)
                 continue
+            _logger.debug("[ARKITE] Project %s: %s detection(s) fetched", record.id, len(detections))
+            record._store_detection_snapshot(detections)
 
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=2,
-            )
-            qr.add_data(code)
-            qr.make(fit=True)
-            img = qr.make_image(fill_color="black", back_color="white")
+    @api.model
+    def _detection_snapshot_ttl(self):
+        """Seconds before a detections snapshot is refreshed (product_module.arkite_detection_ttl)"""
+        ICP = self.env['ir.config_parameter'].sudo()
+        try:
+            return max(60, int(ICP.get_param('product_module.arkite_detection_ttl', 900)))
+        except (TypeError, ValueError):
+            return 900
 
-            buf = io.BytesIO()
-            img.save(buf, format='PNG')
-            record.qr_image = base64.b64encode(buf.getvalue())
+    @api.model
+    def _cron_refresh_detection_snapshots(self, limit=50):
+        """Refresh the oldest detection snapshots that are past their TTL"""
+        stale_date = fields.Datetime.subtract(fields.Datetime.now(), seconds=self._detection_snapshot_ttl())
+        projects = self.search([
+            ('arkite_project_id', '!=', False),
+            '|',
+            ('arkite_detections_fetched_at', '=', False),
+            ('arkite_detections_fetched_at', '<', stale_date),
+        ], order='arkite_detections_fetched_at asc nulls first, id', limit=limit)
+        for project in projects:
+            project._refresh_detection_snapshot()
+            self.env.cr.commit()
 
-    @api.depends('name', 'arkite_project_id')
-    def _compute_qr_filename(self):
-        """Generate filename for QR code download"""
-        for record in self:
-            code = record.arkite_project_id or record.name
-            if code:
-                record.qr_image_name = f'qr_{code}.png'
-            else:
-                record.qr_image_name = 'qr_code.png'
-    
-    def refresh_detection_info(self):
-        """Manually trigger recomputation of detection info"""
-        self._compute_workstation_detection_info()
-    
-    @api.depends('arkite_unit_id')
-    @api.depends('arkite_project_id', 'arkite_linked')
+    def _prepare_detection_info_values(self):
+        """Values for the product_module.workstation_detection_info template"""
+        self.ensure_one()
+        values = {'state': 'ok', 'type_groups': [], 'fetched_at': False}
+        if not self.arkite_linked or not self.arkite_project_id:
+            values['state'] = 'unlinked'
+            return values
+        if not self.arkite_detections_fetched_at:
+            values['state'] = 'pending'
+            return values
+        values['fetched_at'] = fields.Datetime.context_timestamp(self, self.arkite_detections_fetched_at)
+
+        try:
+            detections = json.loads(self.arkite_detections_snapshot or '[]')
+        except ValueError:
+            detections = []
+
+        # Group actual detections (not "Detection group" entries) by DetectionType
+        type_map = {
+            "PICKING_BIN": "Containers",
+            "OBJECT": "Objects",
+            "ACTIVITY": "Activities",
+            "QUALITY_CHECK": "Quality Checks",
+            "VIRTUAL_BUTTON": "Virtual Buttons",
+            "TOOL": "Tools",
+        }
+        type_groups = {}
+        for detection in detections:
+            if not isinstance(detection, dict) or detection.get("Type", "") == "Detection group":
+                continue
+            detection_type = detection.get("DetectionType", "Unknown")
+            type_groups.setdefault(type_map.get(detection_type, detection_type), []).append({
+                'name': detection.get("Name", "Unnamed"),
+                'detection_type': detection_type,
+            })
+
+        if not type_groups:
+            values['state'] = 'empty'
+        values['type_groups'] = sorted(type_groups.items())
+        return values
+
+    @api.depends('arkite_linked', 'arkite_project_id', 'arkite_detections_snapshot', 'arkite_detections_fetched_at')
     def _compute_workstation_detection_info(self):
-        """Fetch and display detection information from the linked Arkite project"""
+        """Render the stored detections snapshot (no Arkite call; see _cron_refresh_detection_snapshots)"""
+        QWeb = self.env['ir.qweb']
         for record in self:
-            # Only show detections if project is linked
-            if not record.arkite_linked or not record.arkite_project_id:
-                record.workstation_detection_info = '<div style="padding: 16px; text-align: center; color: #6c757d; font-style: italic;">Link an Arkite project to see its detections</div>'
-                continue
-            
-            # Get credentials from the unit or environment
-            creds = record._get_arkite_credentials()
-            api_base = creds.get('api_base')
-            api_key = creds.get('api_key')
-            
-            if not api_base or not api_key:
-                record.workstation_detection_info = '<div style="padding: 16px; text-align: center; color: #dc3545;">Arkite credentials not configured</div>'
-                continue
-            
-            try:
-                # Fetch detections for the linked project
-                detections_url = f"{api_base}/projects/{record.arkite_project_id}/detections/"
-                params = {"apiKey": api_key}
-                headers = {"Content-Type": "application/json"}
-                
-                response = requests.get(detections_url, params=params, headers=headers, verify=False, timeout=10)
-                
-                if not response.ok:
-                    record.workstation_detection_info = f'<div style="padding: 16px; text-align: center; color: #dc3545;">Failed to fetch detections: HTTP {response.status_code}</div>'
-                    continue
-                
-                detections = response.json()
-                
-                # Handle different API response formats
-                # Sometimes it might be wrapped in a dict or have different structure
-                if isinstance(detections, dict):
-                    # Check if response has detections nested under a key
-                    if 'detections' in detections:
-                        detections = detections['detections']
-                    elif 'Detections' in detections:
-                        detections = detections['Detections']
-                    else:
-                        # Try to extract any list from the dict
-                        for key, value in detections.items():
-                            if isinstance(value, list):
-                                detections = value
-                                break
-                
-                if not isinstance(detections, list) or not detections:
-                    record.workstation_detection_info = '<div style="padding: 16px; text-align: center; color: #6c757d;">No detections configured for this project</div>'
-                    continue
-                
-                # Log detection structure for debugging - show ALL detections
-                _logger.info("Total detections: %d", len(detections))
-                for idx, det in enumerate(detections):
-                    _logger.info("Detection %d: Type=%s, Name=%s, DetectionType=%s, Id=%s", 
-                                 idx, det.get("Type"), det.get("Name"), det.get("DetectionType"), det.get("Id"))
-                
-                # Organize detections by group (using Name field, with Job-Specific as separate category)
-                organized_detections = {}
-                for detection in detections:
-                    # Use Name field for grouping
-                    group_name = detection.get("Name", "Unknown")
-                    detection_type = detection.get("Type", "")
-                    is_job_specific = detection.get("IsJobSpecific", False) or detection.get("isJobSpecific", False)
-                    job_name = detection.get("JobName") if is_job_specific else None
-                    
-                    # Create a unique key for grouping
-                    if is_job_specific and job_name:
-                        key = f"Job-Specific ({job_name})"
-                    else:
-                        key = group_name
-                    
-                    if key not in organized_detections:
-                        organized_detections[key] = []
-                    
-                    organized_detections[key].append(detection)
-                
-                # Log the organized structure for debugging
-                _logger.info("Organized detections by group: %s", {k: len(v) for k, v in organized_detections.items()})
-                
-                # Group detections by their actual DetectionType (PICKING_BIN, OBJECT, ACTIVITY, etc.)
-                # Filter out Detection groups - only keep actual detections
-                type_groups = {}
-                
-                for detection in detections:
-                    det_type = detection.get("Type", "")
-                    # Skip detection group entries - we only want actual detections
-                    if det_type == "Detection group":
-                        continue
-                    
-                    # Use the DetectionType as the grouping key and map to friendly names
-                    detection_type = detection.get("DetectionType", "Unknown")
-                    
-                    # Map DetectionType codes to friendly names
-                    type_map = {
-                        "PICKING_BIN": "Containers",
-                        "OBJECT": "Objects",
-                        "ACTIVITY": "Activities",
-                        "QUALITY_CHECK": "Quality Checks",
-                        "VIRTUAL_BUTTON": "Virtual Buttons",
-                        "TOOL": "Tools",
-                    }
-                    
-                    type_key = type_map.get(detection_type, detection_type)
-                    
-                    if type_key not in type_groups:
-                        type_groups[type_key] = []
-                    
-                    type_groups[type_key].append(detection)
-                
-                # Build hierarchical display grouped by detection type
-                html = '<div style="font-size: 12px; font-family: -apple-system, BlinkMacSystemFont, \'Segoe UI\', Roboto, sans-serif;">'
-                
-                # Display each detection type group
-                for type_name in sorted(type_groups.keys()):
-                    detections_in_type = type_groups[type_name]
-                    
-                    # Type header row
-                    html += '<div style="display: flex; padding: 10px 12px; background: #e3f2fd; border-bottom: 1px solid #90caf9; border-radius: 4px 4px 0 0; margin-bottom: 2px;">'
-                    html += f'<div style="flex: 1; font-weight: 600; color: #01579b;">'
-                    html += f'<i class="fa fa-cube" style="margin-right: 6px; color: #2196f3;"></i>{type_name}'
-                    html += f'<span style="margin-left: 8px; color: #666; font-size: 11px; font-weight: normal;">({len(detections_in_type)} items)</span>'
-                    html += '</div>'
-                    html += '</div>'
-                    
-                    # Detection items under this type (indented)
-                    for i, detection in enumerate(detections_in_type):
-                        is_last = (i == len(detections_in_type) - 1)
-                        name = detection.get("Name", "Unnamed")
-                        det_subtype = detection.get("DetectionType", "Unknown")
-                        
-                        border_radius = '0 0 4px 4px' if is_last else '0'
-                        border_bottom = '1px solid #f0f0f0' if not is_last else '1px solid #90caf9'
-                        
-                        html += '<div style="display: flex; padding: 8px 12px; padding-left: 40px; background: #f9f9f9; border-bottom: ' + border_bottom + '; border-radius: ' + border_radius + '; position: relative;">'
-                        html += f'<div style="position: absolute; left: 20px; top: 0; bottom: 0; display: flex; align-items: center;"><i class="fa fa-circle" style="margin-right: 6px; color: #90caf9; font-size: 6px;"></i></div>'
-                        html += f'<div style="flex: 1; color: #333;">{name}</div>'
-                        html += f'<div style="min-width: 120px; text-align: right; color: #666; font-size: 11px;">{det_subtype}</div>'
-                        html += '</div>'
-                    
-                    html += '<div style="margin-bottom: 12px;"></div>'
-                
-                html += '</div>'
-                record.workstation_detection_info = html
-                    
-            except Exception as e:
-                _logger.warning("Error fetching project detections: %s", e)
-                record.workstation_detection_info = f'<div style="padding: 16px; text-align: center; color: #dc3545;">Error loading detections: {str(e)}</div>'
+            record.workstation_detection_info = QWeb._render(
+                'product_module.workstation_detection_info',
+                record._prepare_detection_info_values(),
+            )
     
     # ====================
     # MQTT / "Run in Arkite"
@@ -1158,9 +1065,13 @@ class ProductModuleProject(models.Model):
             })
             
             # Auto-load steps, variants, processes, and detections
+            self._arkite_job_progress(10, _('Loading job steps'))
             self.action_load_arkite_steps()
+            self._arkite_job_progress(30, _('Loading variants'))
             self.action_load_arkite_variants()
+            self._arkite_job_progress(40, _('Loading processes'))
             self.action_load_arkite_processes()
+            self._arkite_job_progress(50, _('Loading detections'))
             self.action_load_arkite_detections()
             
             return {
@@ -1225,6 +1136,7 @@ class ProductModuleProject(models.Model):
             if response.ok:
                 variants = response.json()
                 if isinstance(variants, list):
+                    self._arkite_mirror_update({'variant': variants})
                     for variant in variants:
                         self.env['product_module.arkite.variant.temp'].create({
                             'project_id': self.id,
@@ -1271,6 +1183,7 @@ class ProductModuleProject(models.Model):
             if response.ok:
                 processes = response.json()
                 if isinstance(processes, list):
+                    self._arkite_mirror_update({'process': processes})
                     for process in processes:
                         self.env['product_module.arkite.process.temp'].create({
                             'project_id': self.id,
@@ -1671,6 +1584,7 @@ class ProductModuleProject(models.Model):
             
             if not processes:
                 raise UserError(_("No processes found in this project"))
+            self._arkite_mirror_update({'process': processes})
             
             # Clear existing process records (but keep current record if this is called from a row button)
             keep_id = self.env.context.get('keep_process_temp_id')
@@ -1781,21 +1695,8 @@ class ProductModuleProject(models.Model):
             if response_variants.ok:
                 variants = response_variants.json()
                 if isinstance(variants, list):
-                    for v in variants:
-                        variant_id = str(v.get("Id", ""))
-                        # Find or create variant temp record
-                        variant_temp = self.env['product_module.arkite.variant.temp'].search([
-                            ('variant_id', '=', variant_id),
-                            ('project_id', '=', self.id)
-                        ], limit=1)
-                        if not variant_temp:
-                            variant_temp = self.env['product_module.arkite.variant.temp'].create({
-                                'project_id': self.id,
-                                'variant_id': variant_id,
-                                'name': v.get("Name", "Unknown"),
-                                'description': v.get("Description", "")
-                            })
-                        variant_map[variant_id] = variant_temp
+                    variant_map = self.env['product_module.arkite.variant.temp']._arkite_variant_map(
+                        {'project_id': self.id}, variants)
             
             # Create process step records - create root steps first, then children
             # Separate root steps (no parent) from child steps (have ParentStepId)
@@ -1929,18 +1830,6 @@ class ProductModuleProject(models.Model):
         except Exception:
             raise UserError(_('Could not get API credentials. Please check your Arkite unit configuration.'))
         
-        # Clear existing job steps - this resets all changes and reloads from Arkite
-        # Use sudo() to ensure we can delete all records even if there are constraints
-        try:
-            self.arkite_job_step_ids.sudo().unlink()
-        except Exception as e:
-            _logger.warning("[ARKITE] Error clearing job steps, trying force unlink: %s", e)
-            # Force unlink all job steps for this project
-            all_job_steps = self.env['product_module.arkite.job.step'].search([
-                ('project_id', '=', self.id)
-            ])
-            all_job_steps.sudo().unlink()
-        
         try:
             # Get all steps from the project
             url_steps = f"{api_base}/projects/{self.arkite_project_id}/steps/"
@@ -1955,8 +1844,10 @@ class ProductModuleProject(models.Model):
             if not isinstance(all_steps, list):
                 raise UserError(_("Unexpected response format for steps"))
             
+            self._arkite_mirror_update({'step': all_steps})
+
             # Filter for job steps: Type='Job' and ProcessId=0
-            job_steps = [s for s in all_steps if s.get("Type") == "Job" and (not s.get("ProcessId") or str(s.get("ProcessId", "")) == "0")]
+            job_steps = self._arkite_job_step_rows(all_steps)
             
             if not job_steps:
                 raise UserError(_("No job steps found. Job steps are steps with Type='Job' and ProcessId=0."))
@@ -1986,6 +1877,12 @@ class ProductModuleProject(models.Model):
             
             _logger.info("[ARKITE] Found %s job steps", len(job_steps))
             
+            if not self.arkite_job_steps_dirty and self._arkite_steps_unchanged(
+                    self.env['product_module.arkite.job.step'], [('project_id', '=', self.id)],
+                    job_steps, steps_fingerprint(job_steps), self.arkite_job_steps_fingerprint):
+                _logger.info("[ARKITE] Job steps unchanged since last load, nothing to reload")
+                return {}
+
             # Get variants
             url_variants = f"{api_base}/projects/{self.arkite_project_id}/variants/"
             response_variants = requests.get(url_variants, params=params, headers=headers, verify=False, timeout=10)
@@ -1995,207 +1892,12 @@ class ProductModuleProject(models.Model):
             if response_variants.ok:
                 variants = response_variants.json()
                 if isinstance(variants, list):
-                    for v in variants:
-                        variant_id = str(v.get("Id", ""))
-                        variant_temp = self.env['product_module.arkite.variant.temp'].search([
-                            ('variant_id', '=', variant_id),
-                            ('project_id', '=', self.id)
-                        ], limit=1)
-                        if not variant_temp:
-                            variant_temp = self.env['product_module.arkite.variant.temp'].create({
-                                'project_id': self.id,
-                                'variant_id': variant_id,
-                                'name': v.get("Name", "Unknown"),
-                                'description': v.get("Description", "")
-                            })
-                        variant_map[variant_id] = variant_temp
-            
-            # Separate root steps from child steps
-            root_steps = [s for s in job_steps if not s.get("ParentStepId") or str(s.get("ParentStepId", "")) == "0" or str(s.get("ParentStepId", "")) == ""]
-            child_steps = [s for s in job_steps if s.get("ParentStepId") and str(s.get("ParentStepId", "")) != "0" and str(s.get("ParentStepId", "")) != ""]
-            
-            root_steps.sort(key=lambda x: x.get("Index", 0))
-            child_steps.sort(key=lambda x: x.get("Index", 0))
-            
-            _logger.info("[ARKITE] Job root steps: %s, child steps: %s", len(root_steps), len(child_steps))
-            
-            # Create a mapping of step_id to record for parent lookup
-            step_id_to_record = {}
-            
-            # Store the root step ID - all steps in this job should use this as job_step_id
-            root_step_id = None
-            if root_steps:
-                # Use the first root step's ID as the job_step_id for all steps
-                root_step_id = str(root_steps[0].get("Id", ""))
-            
-            # Create root steps first
-            for step in root_steps:
-                step_id = str(step.get("Id", ""))
-                if not step_id:
-                    _logger.warning("[ARKITE] Skipping root step with empty ID")
-                    continue
-                
-                # Extract step name - handle None, empty string, and whitespace-only properly
-                step_name_raw = step.get("Name")
-                if step_name_raw is None:
-                    step_name = None
-                else:
-                    step_name = str(step_name_raw).strip() if step_name_raw else None
-                
-                # Only use fallback if name is truly missing or empty
-                if not step_name:
-                    # Try alternative fields before using Index fallback
-                    step_type_val = step.get("StepType", "")
-                    comment_val = step.get("Comment", "")
-                    step_index_val = step.get("Index")
-                    
-                    # Try StepType first (e.g., "WORK_INSTRUCTION", "COMPOSITE")
-                    if step_type_val and step_type_val.strip():
-                        step_name = step_type_val.replace("_", " ").title()
-                        _logger.info("[ARKITE] Root step %s has no Name, using StepType: '%s'", step_id, step_name)
-                    # Try Comment second
-                    elif comment_val and comment_val.strip():
-                        step_name = comment_val.strip()[:50]  # Limit length
-                        _logger.info("[ARKITE] Root step %s has no Name, using Comment: '%s'", step_id, step_name)
-                    # Fallback to Index
-                    elif step_index_val is not None:
-                        step_name = f"Step {step_index_val}"
-                        _logger.warning("[ARKITE] Root step %s has no Name, using Index fallback: '%s'", step_id, step_name)
-                    else:
-                        step_name = f"Step {step_id}" if step_id else "Unnamed Step"
-                        _logger.warning("[ARKITE] Root step %s has no Name, using ID fallback: '%s'", step_id, step_name)
-                else:
-                    _logger.debug("[ARKITE] Root step %s loaded with name: '%s' (raw: %s)", step_id, step_name, step_name_raw)
-                step_type = step.get("StepType", "WORK_INSTRUCTION")
-                variant_ids = step.get("VariantIds", [])
-                for_all_variants = step.get("ForAllVariants", False)
-                step_index = step.get("Index", 0)
-                
-                # Get variant records for this step
-                step_variant_records = []
-                for vid in variant_ids:
-                    variant_id_str = str(vid)
-                    if variant_id_str in variant_map:
-                        step_variant_records.append(variant_map[variant_id_str].id)
-                
-                # Use root_step_id for job_step_id (or step_id if this is the first root step)
-                job_step_id_value = root_step_id or step_id
-                
-                # Log what we're about to create
-                _logger.info("[ARKITE] Creating root step record: step_id=%s, step_name='%s' (from raw: %s)", 
-                           step_id, step_name, repr(step.get("Name")))
-                
-                record = self.env['product_module.arkite.job.step'].create({
-                    'project_id': self.id,
-                    'job_step_id': job_step_id_value,  # Use root step ID for all steps in this job
-                    'step_id': step_id,
-                    'step_name': step_name,
-                    'step_type': step_type,
-                    'sequence': step_index * 10,
-                    'index': step_index,
-                    'parent_step_id': "",  # Root step has no parent
-                    'parent_id': False,  # No parent record
-                    'variant_ids': [(6, 0, step_variant_records)] if step_variant_records else [],
-                    'for_all_variants': for_all_variants
-                })
-                step_id_to_record[step_id] = record
-            
-            # Create child steps (iteratively, handling nested hierarchy)
-            remaining_child_steps = child_steps.copy()
-            max_iterations = 100  # Prevent infinite loops
-            iteration = 0
-            
-            while remaining_child_steps and iteration < max_iterations:
-                iteration += 1
-                processed_this_iteration = []
-                
-                for step in remaining_child_steps:
-                    parent_step_id = str(step.get("ParentStepId", ""))
-                    
-                    # Check if parent exists in our records
-                    if parent_step_id in step_id_to_record:
-                        step_id = str(step.get("Id", ""))
-                        if not step_id:
-                            _logger.warning("[ARKITE] Skipping child step with empty ID")
-                            continue
-                        
-                        # Extract step name - handle None, empty string, and whitespace-only properly
-                        step_name_raw = step.get("Name")
-                        if step_name_raw is None:
-                            step_name = None
-                        else:
-                            step_name = str(step_name_raw).strip() if step_name_raw else None
-                        
-                        # Only use fallback if name is truly missing or empty
-                        if not step_name:
-                            # Try alternative fields before using Index fallback
-                            step_type_val = step.get("StepType", "")
-                            comment_val = step.get("Comment", "")
-                            step_index_val = step.get("Index")
-                            
-                            # Try StepType first (e.g., "WORK_INSTRUCTION", "COMPOSITE")
-                            if step_type_val and step_type_val.strip():
-                                step_name = step_type_val.replace("_", " ").title()
-                                _logger.info("[ARKITE] Child step %s has no Name, using StepType: '%s'", step_id, step_name)
-                            # Try Comment second
-                            elif comment_val and comment_val.strip():
-                                step_name = comment_val.strip()[:50]  # Limit length
-                                _logger.info("[ARKITE] Child step %s has no Name, using Comment: '%s'", step_id, step_name)
-                            # Fallback to Index
-                            elif step_index_val is not None:
-                                step_name = f"Step {step_index_val}"
-                                _logger.warning("[ARKITE] Child step %s has no Name, using Index fallback: '%s'", step_id, step_name)
-                            else:
-                                step_name = f"Step {step_id}" if step_id else "Unnamed Step"
-                                _logger.warning("[ARKITE] Child step %s has no Name, using ID fallback: '%s'", step_id, step_name)
-                        else:
-                            _logger.debug("[ARKITE] Child step %s loaded with name: '%s' (raw: %s)", step_id, step_name, step_name_raw)
-                        step_type = step.get("StepType", "WORK_INSTRUCTION")
-                        variant_ids = step.get("VariantIds", [])
-                        for_all_variants = step.get("ForAllVariants", False)
-                        step_index = step.get("Index", 0)
-                        
-                        # Get variant records for this step
-                        step_variant_records = []
-                        for vid in variant_ids:
-                            variant_id_str = str(vid)
-                            if variant_id_str in variant_map:
-                                step_variant_records.append(variant_map[variant_id_str].id)
-                        
-                        parent_record = step_id_to_record[parent_step_id]
-                        
-                        # Use root_step_id for job_step_id (all steps in a job share the same job_step_id)
-                        job_step_id_value = root_step_id or step_id
-                        if not job_step_id_value:
-                            _logger.warning("[ARKITE] No root_step_id available, using step_id: %s", step_id)
-                            job_step_id_value = step_id
-                        
-                        # Log what we're about to create
-                        _logger.info("[ARKITE] Creating child step record: step_id=%s, step_name='%s' (from raw: %s)", 
-                                   step_id, step_name, repr(step.get("Name")))
-                        
-                        record = self.env['product_module.arkite.job.step'].create({
-                            'project_id': self.id,
-                            'job_step_id': job_step_id_value,  # Use root step ID for all steps in this job
-                            'step_id': step_id,
-                            'step_name': step_name,
-                            'step_type': step_type,
-                            'sequence': step_index * 10,
-                            'index': step_index,
-                            'parent_step_id': parent_step_id,  # Store parent step ID
-                            'parent_id': parent_record.id,  # Link to parent record - this is the key!
-                            'variant_ids': [(6, 0, step_variant_records)] if step_variant_records else [],
-                            'for_all_variants': for_all_variants
-                        })
-                        step_id_to_record[step_id] = record
-                        processed_this_iteration.append(step)
-                
-                # Remove processed steps
-                for step in processed_this_iteration:
-                    remaining_child_steps.remove(step)
+                    self._arkite_mirror_update({'variant': variants})
+                    variant_map = self.env['product_module.arkite.variant.temp']._arkite_variant_map(
+                        {'project_id': self.id}, variants)
             
-            if remaining_child_steps:
-                _logger.warning("[ARKITE] Could not create %s child steps - parent not found", len(remaining_child_steps))
+            # Apply only the added, changed and removed steps
+            self._arkite_load_job_steps(job_steps, variant_map)
             
             # Refresh computed fields for all created records
             all_created_records = self.env['product_module.arkite.job.step'].search([
@@ -2275,13 +1977,8 @@ class ProductModuleProject(models.Model):
                         if variants_response.ok:
                             variants_list = variants_response.json()
                             if isinstance(variants_list, list):
-                                for v in variants_list:
-                                    variant_record = self.env['product_module.arkite.variant.temp'].search([
-                                        ('project_id', '=', self.id),
-                                        ('variant_id', '=', str(v.get("Id", "")))
-                                    ], limit=1)
-                                    if variant_record:
-                                        variants[str(v.get("Id", ""))] = variant_record
+                                variants = self.env['product_module.arkite.variant.temp']._arkite_variant_map(
+                                    {'project_id': self.id}, variants_list, create_missing=False)
                     except Exception as e:
                         _logger.warning("Could not load variants for process steps: %s", e)
                     
@@ -2428,15 +2125,15 @@ class ProductModuleProject(models.Model):
             if response.ok:
                 detections = response.json()
                 if isinstance(detections, list):
-                    for detection in detections:
-                        self.env['product_module.arkite.detection.temp'].create({
-                            'project_id': self.id,
-                            'detection_id': str(detection.get("Id", "")),
-                            'name': detection.get("Name", "Unnamed"),
-                            'detection_type': detection.get("DetectionType", "OBJECT"),
-                            'is_job_specific': bool(detection.get("JobId")),
-                            'job_id': str(detection.get("JobId", "")) if detection.get("JobId") else "",
-                        })
+                    self._store_detection_snapshot(detections)
+                    self.env['product_module.arkite.detection.temp'].create([{
+                        'project_id': self.id,
+                        'detection_id': str(detection.get("Id", "")),
+                        'name': detection.get("Name", "Unnamed"),
+                        'detection_type': detection.get("DetectionType", "OBJECT"),
+                        'is_job_specific': bool(detection.get("JobId")),
+                        'job_id': str(detection.get("JobId", "")) if detection.get("JobId") else "",
+                    } for detection in detections])
         except requests.exceptions.ConnectionError as e:
             _logger.error("Connection error loading detections: %s", e, exc_info=True)
             return False
@@ -2465,6 +2162,7 @@ class ProductModuleProject(models.Model):
         
         synced_items = []
         error_messages = []
+        sync_stats = {}
         
         # 1. Sync project name and info
         try:
@@ -2482,6 +2180,7 @@ class ProductModuleProject(models.Model):
             _logger.warning("[ARKITE] Error syncing project info: %s", e)
         
         # 2. Sync materials from Arkite
+        self._arkite_job_progress(20, _('Syncing materials'))
         try:
             url = f"{api_base}/projects/{self.arkite_project_id}/materials/"
             params = {"apiKey": api_key}
@@ -2491,129 +2190,57 @@ class ProductModuleProject(models.Model):
                 _logger.info("[ARKITE SYNC] Fetched %s materials from Arkite", len(arkite_materials) if isinstance(arkite_materials, list) else 0)
                 
                 if isinstance(arkite_materials, list):
+                    self._arkite_mirror_update({'material': arkite_materials})
                     # Log all materials from Arkite for debugging
                     _logger.info("[ARKITE SYNC] Raw materials from Arkite: %s", arkite_materials)
                     
-                    arkite_material_ids = {str(m.get("Id", "")) for m in arkite_materials if m.get("Id")}
-                    existing_material_ids = set(self.material_ids.filtered(lambda m: m.project_id == self and m.arkite_material_id).mapped('arkite_material_id'))
-                    
-                    _logger.info("[ARKITE SYNC] Arkite has %s materials (IDs: %s)", len(arkite_material_ids), arkite_material_ids)
-                    _logger.info("[ARKITE SYNC] Odoo has %s materials with Arkite IDs (IDs: %s)", len(existing_material_ids), existing_material_ids)
-                    _logger.info("[ARKITE SYNC] All Odoo materials for this project: %s", [(m.name, m.arkite_material_id) for m in self.material_ids.filtered(lambda m: m.project_id == self)])
-                    
-                    # Find materials in Arkite but not in Odoo
-                    new_material_ids = arkite_material_ids - existing_material_ids
-                    _logger.info("[ARKITE SYNC] Found %s new materials to create", len(new_material_ids))
-                    
-                    created_count = 0
-                    updated_count = 0
-                    
-                    for material_data in arkite_materials:
-                        arkite_id = str(material_data.get("Id", ""))
-                        if not arkite_id:
-                            continue
-                            
-                        if arkite_id in new_material_ids:
-                            # Create new material in Odoo
-                            picking_bin_ids = material_data.get("PickingBinIds", [])
-                            picking_bin_str = ", ".join(str(bid) for bid in picking_bin_ids) if picking_bin_ids else ""
-                            
-                            # Map Arkite material type to Odoo type
-                            arkite_type = material_data.get("Type", "")
-                            if arkite_type == "PickingBinMaterial":
-                                odoo_type = "PickingBinMaterial"
-                            elif arkite_type == "StandardMaterial":
-                                odoo_type = "StandardMaterial"
-                            elif arkite_type == "Material" or not arkite_type:
-                                # Default to StandardMaterial if type is "Material" or empty
-                                odoo_type = "StandardMaterial"
-                            else:
-                                # Unknown type, default to StandardMaterial
-                                _logger.warning("[ARKITE SYNC] Unknown material type '%s', defaulting to StandardMaterial", arkite_type)
-                                odoo_type = "StandardMaterial"
-                            
-                            try:
-                                self.env['product_module.material'].create({
-                                    'project_id': self.id,
-                                    'page_id': self.page_id.id if self.page_id else False,
-                                    'name': material_data.get("Name", "Unnamed"),
-                                    'material_type': odoo_type,
-                                    'description': material_data.get("Description", ""),
-                                    'image_id': str(material_data.get("ImageId", "")) if material_data.get("ImageId") and material_data.get("ImageId") != "0" else "",
-                                    'picking_bin_ids_text': picking_bin_str,
-                                    'arkite_material_id': arkite_id,
-                                })
-                                created_count += 1
-                                _logger.info("[ARKITE SYNC] Created material: %s (ID: %s, Type: %s -> %s)", 
-                                           material_data.get("Name"), arkite_id, arkite_type, odoo_type)
-                            except Exception as e:
-                                _logger.error("[ARKITE SYNC] Error creating material %s: %s", arkite_id, e, exc_info=True)
-                    
-                    # Update existing materials
-                    for material in self.material_ids.filtered(lambda m: m.project_id == self):
-                        if material.arkite_material_id and material.arkite_material_id in arkite_material_ids:
-                            # Find matching Arkite material
-                            for arkite_material in arkite_materials:
-                                if str(arkite_material.get("Id", "")) == material.arkite_material_id:
-                                    picking_bin_ids = arkite_material.get("PickingBinIds", [])
-                                    picking_bin_str = ", ".join(str(bid) for bid in picking_bin_ids) if picking_bin_ids else ""
-                                    
-                                    # Map Arkite material type to Odoo type
-                                    arkite_type = arkite_material.get("Type", "")
-                                    if arkite_type == "PickingBinMaterial":
-                                        odoo_type = "PickingBinMaterial"
-                                    elif arkite_type == "StandardMaterial":
-                                        odoo_type = "StandardMaterial"
-                                    elif arkite_type == "Material" or not arkite_type:
-                                        odoo_type = "StandardMaterial"
-                                    else:
-                                        odoo_type = material.material_type  # Keep existing type if unknown
-                                    
-                                    material.write({
-                                        'name': arkite_material.get("Name", material.name),
-                                        'material_type': odoo_type,
-                                        'description': arkite_material.get("Description", material.description or ""),
-                                        'image_id': str(arkite_material.get("ImageId", "")) if arkite_material.get("ImageId") else material.image_id,
-                                        'picking_bin_ids_text': picking_bin_str,
-                                    })
-                                    updated_count += 1
-                                    _logger.info("[ARKITE SYNC] Updated material: %s (ID: %s)", material.name, material.arkite_material_id)
-                                    break
-                        elif not material.arkite_material_id:
-                            # Material exists in Odoo but doesn't have Arkite ID - try to match by name
-                            for arkite_material in arkite_materials:
-                                arkite_name = arkite_material.get("Name", "")
-                                if arkite_name and arkite_name == material.name:
-                                    # Link this material to Arkite material
-                                    picking_bin_ids = arkite_material.get("PickingBinIds", [])
-                                    picking_bin_str = ", ".join(str(bid) for bid in picking_bin_ids) if picking_bin_ids else ""
-                                    
-                                    # Map Arkite material type to Odoo type
-                                    arkite_type = arkite_material.get("Type", "")
-                                    if arkite_type == "PickingBinMaterial":
-                                        odoo_type = "PickingBinMaterial"
-                                    elif arkite_type == "StandardMaterial":
-                                        odoo_type = "StandardMaterial"
-                                    elif arkite_type == "Material" or not arkite_type:
-                                        odoo_type = "StandardMaterial"
-                                    else:
-                                        odoo_type = material.material_type  # Keep existing type if unknown
-                                    
-                                    material.write({
-                                        'arkite_material_id': str(arkite_material.get("Id", "")),
-                                        'material_type': odoo_type,
-                                        'description': arkite_material.get("Description", material.description or ""),
-                                        'image_id': str(arkite_material.get("ImageId", "")) if arkite_material.get("ImageId") else material.image_id,
-                                        'picking_bin_ids_text': picking_bin_str,
-                                    })
-                                    updated_count += 1
-                                    _logger.info("[ARKITE SYNC] Linked material by name: %s (ID: %s)", material.name, material.arkite_material_id)
-                                    break
-                    
-                    if created_count > 0:
-                        synced_items.append(_('%s new material(s)') % created_count)
-                    if updated_count > 0:
-                        synced_items.append(_('%s updated material(s)') % updated_count)
+                    def material_type(obj, current=False):
+                        arkite_type = obj.get("Type", "")
+                        if arkite_type in ("PickingBinMaterial", "StandardMaterial"):
+                            return arkite_type
+                        if arkite_type == "Material" or not arkite_type:
+                            return "StandardMaterial"
+                        if current:
+                            return current  # Keep existing type if unknown
+                        _logger.warning("[ARKITE SYNC] Unknown material type '%s', defaulting to StandardMaterial", arkite_type)
+                        return "StandardMaterial"
+
+                    def picking_bins(obj):
+                        return ", ".join(str(bid) for bid in obj.get("PickingBinIds") or [])
+
+                    def material_update_values(obj, material):
+                        return {
+                            'name': obj.get("Name", material.name),
+                            'material_type': material_type(obj, material.material_type),
+                            'description': obj.get("Description", material.description or ""),
+                            'image_id': str(obj["ImageId"]) if obj.get("ImageId") else material.image_id,
+                            'picking_bin_ids_text': picking_bins(obj),
+                        }
+
+                    material_spec = ReconcileSpec(
+                        key_field='arkite_material_id',
+                        name_field='name',
+                        create_values=lambda obj: {
+                            'project_id': self.id,
+                            'page_id': self.page_id.id if self.page_id else False,
+                            'name': obj.get("Name", "Unnamed"),
+                            'material_type': material_type(obj),
+                            'description': obj.get("Description", ""),
+                            'image_id': str(obj["ImageId"]) if obj.get("ImageId") and obj.get("ImageId") != "0" else "",
+                            'picking_bin_ids_text': picking_bins(obj),
+                        },
+                        update_values=material_update_values,
+                    )
+                    # Values come from Arkite: mark them synced instead of sending them back
+                    result = reconcile(
+                        self.env['product_module.material'].with_context(skip_arkite_sync=True),
+                        self.material_ids, arkite_materials, material_spec,
+                    )
+                    sync_stats['material'] = result
+                    if result.created:
+                        synced_items.append(_('%s new material(s)') % result.created)
+                    if result.updated or result.linked:
+                        synced_items.append(_('%s updated material(s)') % (result.updated + result.linked))
                 else:
                     _logger.warning("[ARKITE SYNC] Materials response is not a list: %s", type(arkite_materials))
                     error_messages.append(_('Unexpected response format from Arkite API'))
@@ -2629,6 +2256,7 @@ class ProductModuleProject(models.Model):
             error_messages.append(_('Error: %s') % str(e))
         
         # 3. Sync processes from Arkite
+        self._arkite_job_progress(60, _('Syncing processes'))
         # Try both endpoints: /processes/ and /steps/ (some projects might have processes as steps)
         try:
             arkite_processes = []
@@ -2703,108 +2331,54 @@ class ProductModuleProject(models.Model):
                     _logger.info("[ARKITE SYNC] Process %s: %s", idx + 1, proc)
                 
                 if isinstance(arkite_processes, list) and len(arkite_processes) > 0:
-                    # Get existing process IDs from instruction_ids (Assembly Processes)
-                    # Filter by project_id.id == self.id to ensure correct comparison
-                    existing_instructions = self.instruction_ids.filtered(lambda i: i.project_id.id == self.id and i.arkite_process_id)
-                    existing_process_ids = set(existing_instructions.mapped('arkite_process_id'))
-                    arkite_process_ids = {str(p.get("Id", "")) for p in arkite_processes if p.get("Id")}
-                    
-                    _logger.info("[ARKITE SYNC] Total instruction_ids for this project: %s", len(self.instruction_ids))
-                    _logger.info("[ARKITE SYNC] Instructions with project_id=%s: %s", self.id, len(self.instruction_ids.filtered(lambda i: i.project_id.id == self.id)))
-                    _logger.info("[ARKITE SYNC] Instructions with arkite_process_id: %s", len(existing_instructions))
-                    _logger.info("[ARKITE SYNC] Arkite has %s processes (IDs: %s)", len(arkite_process_ids), arkite_process_ids)
-                    _logger.info("[ARKITE SYNC] Odoo has %s processes with Arkite IDs (IDs: %s)", len(existing_process_ids), existing_process_ids)
-                    
-                    new_process_ids = arkite_process_ids - existing_process_ids
-                    _logger.info("[ARKITE SYNC] Found %s new processes to create", len(new_process_ids))
-                    
-                    process_created_count = 0
-                    process_updated_count = 0
-                    
-                    for process_data in arkite_processes:
-                        arkite_process_id = str(process_data.get("Id", ""))
-                        if not arkite_process_id:
-                            _logger.warning("[ARKITE SYNC] Process data missing Id: %s", process_data)
-                            continue
-                        
-                        process_name = process_data.get("Name", "Unnamed Process")
-                        _logger.info("[ARKITE SYNC] Processing process: Name='%s', Id='%s'", process_name, arkite_process_id)
-                        
-                        if arkite_process_id in new_process_ids:
-                            # Create new process in instruction_ids (Assembly Processes)
-                            try:
-                                new_instruction = self.env['product_module.instruction'].create({
-                                    'project_id': self.id,
-                                    'title': process_name,
-                                    'sequence': process_created_count * 10 + 10,  # Auto-increment sequence
-                                    'arkite_process_id': arkite_process_id,
-                                    'arkite_process_type': process_data.get("Type", ""),
-                                    'arkite_comment': process_data.get("Comment", ""),
-                                })
-                                process_created_count += 1
-                                _logger.info("[ARKITE SYNC] Successfully created assembly process: %s (ID: %s, Odoo ID: %s)", 
-                                           process_name, arkite_process_id, new_instruction.id)
-                            except Exception as e:
-                                _logger.error("[ARKITE SYNC] Error creating assembly process %s (ID: %s): %s", 
-                                            process_name, arkite_process_id, e, exc_info=True)
-                        elif arkite_process_id in existing_process_ids:
-                            # Update existing process
-                            process = self.instruction_ids.filtered(lambda i: i.project_id.id == self.id and i.arkite_process_id == arkite_process_id)
-                            if process:
-                                # Map Arkite trigger to Odoo trigger field
-                                arkite_trigger = process_data.get("ProcessTrigger") or process_data.get("Trigger") or ""
-                                trigger_mapping = {
-                                    'ProjectLoaded': 'project_loaded',
-                                    'AlarmClock': 'alarm_clock',
-                                    'ReceiveCommunication': 'receive_communication',
-                                    'Timer': 'timer',
-                                    'VariableChanged': 'variable_changed',
-                                    'Watchdog': 'watchdog',
-                                }
-                                process_trigger = trigger_mapping.get(arkite_trigger, 'project_loaded') if arkite_trigger else 'project_loaded'
-                                
-                                process.write({
-                                    'title': process_name,
-                                    'arkite_process_type': process_data.get("Type", ""),
-                                    'arkite_comment': process_data.get("Comment", ""),
-                                    'process_trigger': process_trigger,
-                                })
-                                process_updated_count += 1
-                                _logger.info("[ARKITE SYNC] Updated assembly process: %s (ID: %s)", process.title, arkite_process_id)
-                    
-                    # If no processes have Arkite IDs, try to match by name for all processes
-                    if not existing_process_ids:
-                        for process_data in arkite_processes:
-                            arkite_process_id = str(process_data.get("Id", ""))
-                            if not arkite_process_id:
-                                continue
-                            
-                            process_name = process_data.get("Name", "")
-                            process = self.instruction_ids.filtered(lambda i: i.project_id.id == self.id and i.title == process_name and not i.arkite_process_id)
-                            if process:
-                                process.write({
-                                    'arkite_process_id': arkite_process_id,
-                                    'title': process_name,
-                                })
-                                process_updated_count += 1
-                                _logger.info("[ARKITE SYNC] Linked assembly process by name: %s (ID: %s)", process.title, arkite_process_id)
-                    
-                    if process_created_count > 0:
-                        synced_items.append(_('%s new process(es)') % process_created_count)
-                    if process_updated_count > 0:
-                        synced_items.append(_('%s updated process(es)') % process_updated_count)
-                    
-                    _logger.info("[ARKITE SYNC] Assembly process sync summary: Created=%s, Updated=%s, Total in Arkite=%s", 
-                               process_created_count, process_updated_count, len(arkite_processes))
-                    
-                    # Force refresh of instruction_ids to ensure UI updates
-                    if process_created_count > 0 or process_updated_count > 0:
-                        # Invalidate cache and recompute count
-                        self.invalidate_recordset(['instruction_ids', 'instruction_count'])
-                        # Force recompute of instruction_count
-                        self._compute_instruction_count()
-                        _logger.info("[ARKITE SYNC] Refreshed instruction_ids cache. Current count: %s", len(self.instruction_ids))
-                        _logger.info("[ARKITE SYNC] instruction_count field value: %s", self.instruction_count)
+                    trigger_mapping = {
+                        'ProjectLoaded': 'project_loaded',
+                        'AlarmClock': 'alarm_clock',
+                        'ReceiveCommunication': 'receive_communication',
+                        'Timer': 'timer',
+                        'VariableChanged': 'variable_changed',
+                        'Watchdog': 'watchdog',
+                    }
+
+                    def process_update_values(obj, process):
+                        # Map Arkite trigger to Odoo trigger field
+                        arkite_trigger = obj.get("ProcessTrigger") or obj.get("Trigger") or ""
+                        return {
+                            'title': obj.get("Name", "Unnamed Process"),
+                            'arkite_process_type': obj.get("Type", ""),
+                            'arkite_comment': obj.get("Comment", ""),
+                            'process_trigger': trigger_mapping.get(arkite_trigger, 'project_loaded'),
+                        }
+
+                    def number_new_processes(plan):
+                        # Auto-increment sequence of the created processes
+                        for index, vals in enumerate(plan.create):
+                            vals['sequence'] = index * 10 + 10
+
+                    process_spec = ReconcileSpec(
+                        key_field='arkite_process_id',
+                        name_field='title',
+                        create_values=lambda obj: {
+                            'project_id': self.id,
+                            'title': obj.get("Name", "Unnamed Process"),
+                            'arkite_process_type': obj.get("Type", ""),
+                            'arkite_comment': obj.get("Comment", ""),
+                        },
+                        update_values=process_update_values,
+                    )
+                    result = reconcile(
+                        self.env['product_module.instruction'], self.instruction_ids, arkite_processes,
+                        process_spec, prepare=number_new_processes,
+                    )
+                    sync_stats['process'] = result
+                    if result.created:
+                        synced_items.append(_('%s new process(es)') % result.created)
+                    if result.updated or result.linked:
+                        synced_items.append(_('%s updated process(es)') % (result.updated + result.linked))
+
+                    if result.changed:
+                        # instruction_count is stored and recomputed with instruction_ids
+                        self.invalidate_recordset(['instruction_ids'])
         except requests.exceptions.RequestException as e:
             _logger.error("[ARKITE SYNC] Network error syncing processes: %s", e, exc_info=True)
             error_messages.append(_('Network error syncing processes: %s') % str(e))
@@ -2827,6 +2401,10 @@ class ProductModuleProject(models.Model):
         
         # Log sync summary
         _logger.info("[ARKITE SYNC] Sync complete: %s", message)
+        for kind, result in sync_stats.items():
+            _logger.info("[ARKITE SYNC] %s: created=%s updated=%s linked=%s unchanged=%s (plan %.3fs, apply %.3fs)",
+                         kind, result.created, result.updated, result.linked, result.unchanged,
+                         result.plan_sec, result.apply_sec)
         
         # Return notification - JavaScript will handle field refresh without full page reload
         return {
@@ -2868,6 +2446,7 @@ class ProductModuleProject(models.Model):
             arkite_materials = response.json()
             if not isinstance(arkite_materials, list):
                 raise UserError(_('Unexpected response format from Arkite API (materials).'))
+            self._arkite_mirror_update({'material': arkite_materials})
 
             arkite_material_ids = {str(m.get("Id", "")) for m in arkite_materials if m.get("Id")}
             existing_by_arkite_id = {
@@ -2954,11 +2533,9 @@ class ProductModuleProject(models.Model):
         # Optionally fetch images right after sync so the user sees them immediately.
         # This is best-effort; failures don't block material sync.
         try:
-            import base64
-            for mat in self.material_ids.filtered(lambda m: m.image_id and not m.image):
-                img_bytes = self._arkite_download_image_bytes(api_base, api_key, mat.image_id)
-                if img_bytes:
-                    mat.image = base64.b64encode(img_bytes)
+            self._arkite_fetch_material_images(
+                api_base, api_key, self.material_ids.filtered(lambda m: m.image_id and not m.image)
+            )
         except Exception as e:
             _logger.info("[ARKITE IMAGE] Skipped fetching some material images after sync: %s", e)
 
@@ -2983,6 +2560,149 @@ class ProductModuleProject(models.Model):
         client = ArkiteClient(api_base=api_base, api_key=api_key, verify_ssl=False, timeout_sec=20)
         return client.download_image_bytes(str(self.arkite_project_id), str(image_id))
 
+    def _arkite_image_pool_size(self):
+        """Max concurrent Arkite image downloads (system parameter product_module.arkite_image_workers)."""
+        ICP = self.env['ir.config_parameter'].sudo()
+        try:
+            return max(1, int(ICP.get_param('product_module.arkite_image_workers', 8)))
+        except (TypeError, ValueError):
+            return 8
+
+    def _arkite_sync_pool_size(self):
+        """Max concurrent Arkite write calls (system parameter product_module.arkite_sync_workers)."""
+        ICP = self.env['ir.config_parameter'].sudo()
+        try:
+            return max(1, int(ICP.get_param('product_module.arkite_sync_workers', 8)))
+        except (TypeError, ValueError):
+            return 8
+
+    def _arkite_delete_materials(self, arkite_material_ids):
+        """Delete materials from this project's Arkite project in one concurrent pass."""
+        self.ensure_one()
+        arkite_material_ids = [mid for mid in arkite_material_ids if mid]
+        if not arkite_material_ids or not self.arkite_project_id:
+            return
+        try:
+            creds = self._get_arkite_credentials()
+        except Exception as e:
+            _logger.warning("[ARKITE] Could not get credentials to delete materials: %s", e)
+            return
+        client = ArkiteClient(api_base=creds['api_base'], api_key=creds['api_key'], verify_ssl=False, timeout_sec=10)
+        results = client.send_many(
+            ((mid, 'DELETE', f"projects/{self.arkite_project_id}/materials/{mid}/", None) for mid in arkite_material_ids),
+            max_workers=self._arkite_sync_pool_size(),
+        )
+        failed = 0
+        for mid, (_reply, error) in results.items():
+            if error:
+                failed += 1
+                _logger.warning("[ARKITE] Failed to delete material %s: %s", mid, error)
+        _logger.info("[ARKITE] Deleted %s material(s) from project %s (%s failed)",
+                     len(results) - failed, self.arkite_project_id, failed)
+
+    def _arkite_sync_materials(self, materials_before=None):
+        """Push changed materials to Arkite and delete the ones removed from the project.
+
+        ``materials_before`` maps project ids to their materials with an Arkite ID before the
+        save. Only materials whose Arkite data changed are sent (see material._arkite_sync_changed).
+        """
+        materials_before = materials_before or {}
+        Material = self.env['product_module.material']
+        for project in self.filtered('arkite_project_id'):
+            # Deleted materials were already removed from Arkite by material.unlink()
+            removed = materials_before.get(project.id, Material).exists().filtered(
+                lambda m: m.project_id != project
+            )
+            if removed:
+                project._arkite_delete_materials(removed.mapped('arkite_material_id'))
+                removed.sudo().write({'arkite_material_id': False, 'arkite_sync_hash': False})
+        self.filtered('arkite_project_id').material_ids._arkite_sync_changed()
+
+    def _arkite_reindex_root_steps(self, step_field):
+        """Push the order of root steps to Arkite after they were reordered in the form.
+
+        Root steps are numbered per process (or job) from their sequence. Only steps whose
+        known Arkite Index differs get an ``{"Index": n}`` update, queued with the step edits
+        of this transaction (see arkite.write.behind, it wins over their Index);
+        the new sequences are stored in one UPDATE. The index of synced steps follows once
+        Arkite accepted the update, so a failed one is queued again by the next save.
+        """
+        self.ensure_one()
+        steps = self[step_field]
+        group_field = 'process_id' if steps._name == 'product_module.arkite.process.step' else 'job_step_id'
+        groups = {}
+        for step in steps.filtered(lambda s: not s.parent_id).sorted(lambda s: (s.sequence, s.id)):
+            groups.setdefault(step[group_field], []).append(step)
+
+        wanted = {}
+        write_behind = self.env['product_module.arkite.write.behind']
+        queued = 0
+        for group_steps in groups.values():
+            for idx, step in enumerate(group_steps):  # Index starts at 0
+                wanted[step.id] = idx
+                if step.step_id and step.index != idx:
+                    write_behind._arkite_queue_patch(self, f"projects/{self.arkite_project_id}/steps/{step.step_id}/", {"Index": idx})
+                    queued += 1
+        if queued:
+            _logger.info("[ARKITE] Queued Index update of %s of %s root step(s)", queued, len(wanted))
+
+        rows = []
+        for step in steps.filtered(lambda s: s.id in wanted):
+            idx = step.index if step.step_id else wanted[step.id]
+            seq = wanted[step.id] * 10
+            if step.index != idx or step.sequence != seq:
+                rows.append((step.id, idx, seq))
+        if rows:
+            # One UPDATE instead of a write() per step (also bypasses the step write hooks)
+            ids, indexes, sequences = (list(col) for col in zip(*rows))
+            self.env.cr.execute(
+                f'UPDATE "{steps._table}" AS s SET "index" = v.idx, sequence = v.seq '
+                'FROM unnest(%s::int[], %s::int[], %s::int[]) AS v(id, idx, seq) WHERE s.id = v.id',
+                [ids, indexes, sequences],
+            )
+            steps.browse(ids).invalidate_recordset(['index', 'sequence'])
+
+    def _arkite_fetch_material_images(self, api_base, api_key, materials, progress_range=None):
+        """Download images for ``materials`` concurrently and store them. Returns (fetched, failed).
+
+        Images come through ``product_module.arkite.image.cache``, so images already fetched
+        (e.g. by the image selector) are not downloaded again; misses are fetched in a bounded
+        thread pool. Results are written back grouped by image_id, so materials sharing an
+        image get one write.
+        """
+        self.ensure_one()
+        materials = materials.filtered(lambda m: m.image_id and m.image_id != "0")
+        if not materials:
+            return 0, 0
+
+        def _on_result(image_id, fetch, done, total):
+            if progress_range and (done % 10 == 0 or done == total):
+                start, end = progress_range
+                self._arkite_job_progress(
+                    start + int(done * (end - start) / total),
+                    _('Downloading images (%s/%s)') % (done, total),
+                )
+
+        images = self.env['product_module.arkite.image.cache']._get_images(
+            self, materials.mapped('image_id'), on_progress=_on_result,
+        )
+
+        fetched = 0
+        failed = 0
+        by_image = {}
+        for mat in materials:
+            by_image.setdefault(mat.image_id, self.env['product_module.material'])
+            by_image[mat.image_id] |= mat
+        for image_id, mats in by_image.items():
+            image_b64 = images.get(str(image_id).strip())
+            if not image_b64:
+                failed += len(mats)
+                _logger.warning("[ARKITE IMAGE] Failed to download image %s for material(s) %s", image_id, mats.mapped('name'))
+                continue
+            mats.write({'image': image_b64})
+            fetched += len(mats)
+        return fetched, failed
+
     def action_fetch_material_images_from_arkite(self):
         """Fetch material images from Arkite (by image_id) into the Materials Used list.
         
@@ -3020,6 +2740,7 @@ class ProductModuleProject(models.Model):
             arkite_materials = response.json()
             if not isinstance(arkite_materials, list):
                 raise UserError(_('Unexpected response format from Arkite API (materials).'))
+            self._arkite_mirror_update({'material': arkite_materials})
             
             _logger.info("[ARKITE IMAGE] Found %s material(s) in Arkite", len(arkite_materials))
             
@@ -3083,33 +2804,17 @@ class ProductModuleProject(models.Model):
             _logger.error("[ARKITE IMAGE] Error syncing materials: %s", e, exc_info=True)
             raise UserError(_('Failed to sync materials from Arkite: %s') % str(e))
 
-        # STEP 2: Now fetch images for materials that have image_id
-        fetched = 0
-        skipped = 0
-        failed = 0
+        self._arkite_job_progress(20, _('Materials synced, downloading images'))
 
+        # STEP 2: Now fetch images for materials that have image_id
         # Get all materials with image_id
         materials = self.material_ids.filtered(lambda m: m.image_id and m.image_id != "0")
         
         _logger.info("[ARKITE IMAGE] Step 2: Found %s material(s) with image_id. Starting image download...", len(materials))
         
-        for mat in materials:
-            if mat.image:
-                skipped += 1
-                _logger.debug("[ARKITE IMAGE] Skipped material '%s' (already has image)", mat.name)
-                continue
-            
-            _logger.info("[ARKITE IMAGE] Downloading image for material '%s' (image_id: %s)", mat.name, mat.image_id)
-            img_bytes = self._arkite_download_image_bytes(api_base, api_key, mat.image_id)
-            
-            if not img_bytes:
-                failed += 1
-                _logger.warning("[ARKITE IMAGE] Failed to download image for material '%s' (image_id: %s)", mat.name, mat.image_id)
-                continue
-            
-            mat.write({'image': base64.b64encode(img_bytes)})
-            fetched += 1
-            _logger.info("[ARKITE IMAGE] Successfully downloaded image for material '%s'", mat.name)
+        to_fetch = materials.filtered(lambda m: not m.image)
+        skipped = len(materials) - len(to_fetch)
+        fetched, failed = self._arkite_fetch_material_images(api_base, api_key, to_fetch, progress_range=(20, 100))
 
         # Build result message
         sync_msg = _("Synced %s material(s) from Arkite (%s new, %s updated)") % (created_count + updated_count, created_count, updated_count)
@@ -3171,11 +2876,13 @@ class ProductModuleProject(models.Model):
             if response.ok:
                 materials = response.json()
                 if isinstance(materials, list):
+                    self._arkite_mirror_update({'material': materials})
+                    vals_list = []
                     for material in materials:
                         picking_bin_ids = material.get("PickingBinIds", [])
                         picking_bin_str = ", ".join(str(bid) for bid in picking_bin_ids) if picking_bin_ids else ""
                         
-                        self.env['product_module.arkite.material.temp'].create({
+                        vals_list.append({
                             'project_id': self.id,
                             'material_id': str(material.get("Id", "")),
                             'name': material.get("Name", "Unnamed"),
@@ -3184,6 +2891,7 @@ class ProductModuleProject(models.Model):
                             'image_id': str(material.get("ImageId", "")) if material.get("ImageId") else "",
                             'picking_bin_ids_text': picking_bin_str,
                         })
+                    self.env['product_module.arkite.material.temp'].create(vals_list)
                     
                     return {
                         'type': 'ir.actions.client',
@@ -3534,151 +3242,6 @@ class ProductModuleProject(models.Model):
         
         return result
     
-    def write(self, vals):
-        """Override write to sync all materials to Arkite when project is saved, and delete removed materials"""
-        # Track materials before write to detect removals
-        materials_before = set()
-        if self.arkite_project_id and 'material_ids' not in vals:
-            # If material_ids is being modified, track current materials
-            materials_before = set(self.material_ids.filtered(lambda m: m.project_id == self and m.arkite_material_id).mapped('arkite_material_id'))
-        
-        result = super().write(vals)
-        
-        # Sync step sequence changes to Arkite when steps are reordered
-        if self.arkite_project_id:
-            try:
-                creds = self._get_arkite_credentials()
-                api_base = creds['api_base']
-                api_key = creds['api_key']
-                
-                # Handle process step reordering
-                if 'arkite_process_step_ids' in vals:
-                    _logger.info("[ARKITE] Process steps reordered, syncing to Arkite...")
-                    # Get all process steps sorted by sequence (current order)
-                    sorted_steps = self.arkite_process_step_ids.sorted('sequence')
-                    
-                    # Filter to only root steps (no parent) for reordering
-                    root_steps = sorted_steps.filtered(lambda s: not s.parent_id)
-                    
-                    for idx, step in enumerate(root_steps):
-                        if not step.step_id:
-                            continue
-                        new_index = idx  # Index starts at 0
-                        current_arkite_index = step.index if step.index is not False else None
-                        
-                        # Always update to ensure sync (don't check if different, just update)
-                        try:
-                            url = f"{api_base}/projects/{self.arkite_project_id}/steps/{step.step_id}/"
-                            params = {"apiKey": api_key}
-                            headers = {"Content-Type": "application/json"}
-                            
-                            # Get current step data
-                            response = requests.get(url, params=params, headers=headers, verify=False, timeout=10)
-                            if response.ok:
-                                step_data = response.json()
-                                old_index = step_data.get("Index", 0)
-                                step_data["Index"] = new_index
-                                
-                                patch_response = requests.patch(url, params=params, headers=headers, json=step_data, verify=False, timeout=10)
-                                if patch_response.ok:
-                                    # Update our local index and sequence
-                                    step.with_context(skip_arkite_sync=True).write({
-                                        'index': new_index,
-                                        'sequence': new_index * 10
-                                    })
-                                    _logger.info("[ARKITE] Updated process step %s Index from %s to %s", step.step_id, old_index, new_index)
-                                else:
-                                    _logger.warning("[ARKITE] Failed to update process step %s: HTTP %s - %s", step.step_id, patch_response.status_code, patch_response.text[:200])
-                            else:
-                                _logger.warning("[ARKITE] Could not fetch process step %s: HTTP %s", step.step_id, response.status_code)
-                        except Exception as e:
-                            _logger.error("[ARKITE] Error updating process step %s: %s", step.step_id, e, exc_info=True)
-                
-                # Handle job step reordering
-                if 'arkite_job_step_ids' in vals:
-                    _logger.info("[ARKITE] Job steps reordered, syncing to Arkite...")
-                    # Get all job steps sorted by sequence (current order)
-                    sorted_steps = self.arkite_job_step_ids.sorted('sequence')
-                    
-                    # Filter to only root steps (no parent) for reordering
-                    root_steps = sorted_steps.filtered(lambda s: not s.parent_id)
-                    
-                    for idx, step in enumerate(root_steps):
-                        if not step.step_id:
-                            continue
-                        new_index = idx  # Index starts at 0
-                        current_arkite_index = step.index if step.index is not False else None
-                        
-                        # Always update to ensure sync
-                        try:
-                            url = f"{api_base}/projects/{self.arkite_project_id}/steps/{step.step_id}/"
-                            params = {"apiKey": api_key}
-                            headers = {"Content-Type": "application/json"}
-                            
-                            # Get current step data
-                            response = requests.get(url, params=params, headers=headers, verify=False, timeout=10)
-                            if response.ok:
-                                step_data = response.json()
-                                old_index = step_data.get("Index", 0)
-                                step_data["Index"] = new_index
-                                
-                                patch_response = requests.patch(url, params=params, headers=headers, json=step_data, verify=False, timeout=10)
-                                if patch_response.ok:
-                                    # Update our local index and sequence
-                                    step.with_context(skip_arkite_sync=True).write({
-                                        'index': new_index,
-                                        'sequence': new_index * 10
-                                    })
-                                    _logger.info("[ARKITE] Updated job step %s Index from %s to %s", step.step_id, old_index, new_index)
-                                else:
-                                    _logger.warning("[ARKITE] Failed to update job step %s: HTTP %s - %s", step.step_id, patch_response.status_code, patch_response.text[:200])
-                            else:
-                                _logger.warning("[ARKITE] Could not fetch job step %s: HTTP %s", step.step_id, response.status_code)
-                        except Exception as e:
-                            _logger.error("[ARKITE] Error updating job step %s: %s", step.step_id, e, exc_info=True)
-            except Exception as e:
-                _logger.warning("[ARKITE] Error syncing step order to Arkite: %s", e)
-        
-        # After saving, sync all materials to Arkite if project has Arkite project linked
-        if self.arkite_project_id:
-            # Get current materials with Arkite IDs
-            materials_after = set(self.material_ids.filtered(lambda m: m.project_id == self and m.arkite_material_id).mapped('arkite_material_id'))
-            
-            # Find materials that were removed (had Arkite ID before but not in current list)
-            removed_material_ids = materials_before - materials_after
-            
-            # Delete removed materials from Arkite
-            if removed_material_ids:
-                try:
-                    creds = self._get_arkite_credentials()
-                    api_base = creds['api_base']
-                    api_key = creds['api_key']
-                    
-                    for arkite_material_id in removed_material_ids:
-                        url = f"{api_base}/projects/{self.arkite_project_id}/materials/{arkite_material_id}/"
-                        params = {"apiKey": api_key}
-                        try:
-                            response = requests.delete(url, params=params, verify=False, timeout=10)
-                            if response.ok:
-                                _logger.info("[ARKITE] Deleted material %s from project", arkite_material_id)
-                            else:
-                                _logger.warning("[ARKITE] Failed to delete material %s: HTTP %s", arkite_material_id, response.status_code)
-                        except Exception as e:
-                            _logger.warning("[ARKITE] Error deleting material %s: %s", arkite_material_id, e)
-                except Exception as e:
-                    _logger.warning("[ARKITE] Could not get credentials to delete materials: %s", e)
-            
-            # Sync current materials to Arkite
-            for material in self.material_ids:
-                if material.project_id == self:
-                    # Sync material to Arkite (create if no arkite_material_id, update if exists)
-                    if not material.arkite_material_id:
-                        material._sync_to_arkite(create=True)
-                    else:
-                        material._sync_to_arkite(create=False)
-        
-        return result
-
     def _arkite_sync_all_staged_hierarchies(self):
         """Push any staged hierarchy changes (job + process steps) to Arkite."""
         self.ensure_one()
@@ -3706,17 +3269,28 @@ class ProductModuleProject(models.Model):
                 raise UserError(_("Failed to sync Process Steps to Arkite (Process %s):\n%s") % (pid, str(e)))
 
     def write(self, vals):
-        """Override write to sync all materials to Arkite when project is saved, and delete removed materials"""
+        """Override write to sync changed materials to Arkite when project is saved, and delete removed materials"""
         # Track materials before write to detect removals
-        materials_before = set()
-        if self.arkite_project_id and 'material_ids' not in vals:
-            # If material_ids is being modified, track current materials
-            materials_before = set(self.material_ids.filtered(lambda m: m.project_id == self and m.arkite_material_id).mapped('arkite_material_id'))
+        materials_before = {}
+        if 'material_ids' in vals:
+            materials_before = {
+                project.id: project.material_ids.filtered('arkite_material_id')
+                for project in self if project.arkite_project_id
+            }
 
         result = super().write(vals)
 
-        # Existing behavior: materials + (legacy) step reorder sync blocks remain below
-        # (â€¦ existing code continues â€¦)
+        # Push only the materials whose Arkite data changed, delete the removed ones
+        self._arkite_sync_materials(materials_before)
+
+        # Sync step sequence changes to Arkite when steps are reordered
+        for project in self.filtered('arkite_project_id'):
+            for step_field in ('arkite_process_step_ids', 'arkite_job_step_ids'):
+                if step_field in vals:
+                    try:
+                        project._arkite_reindex_root_steps(step_field)
+                    except Exception as e:
+                        _logger.warning("[ARKITE] Error syncing step order to Arkite: %s", e)
 
         # At the very end of saving the Project in the form, if we have staged hierarchy changes,
         # push them to Arkite once and clear the flag.
@@ -0,0 +1,69 @@
+# product_module/models/project_active_time.py
+from odoo import models, fields, api
+
+
+class ProductModuleProjectActiveTime(models.Model):
+    """Active assembly time from start/pause timestamps.
+
+    The timer runs while the project is ``in_progress``. Entering that status stamps
+    ``active_started_at`` (start/resume); leaving it adds the running segment to
+    ``active_completion_time`` and clears the stamp (pause/finish). Both happen in a
+    database trigger on status changes, so ORM writes and the MQTT bridge's SQL writes
+    are handled alike. ``elapsed_time`` adds the running segment on read.
+    """
+    _inherit = 'product_module.project'
+
+    active_started_at = fields.Datetime(
+        string='Running Since',
+        readonly=True,
+        copy=False,
+        help='Start of the current in-progress segment; empty while the timer is paused'
+    )
+    elapsed_time = fields.Integer(
+        string='Completion Time',
+        compute='_compute_elapsed_time',
+        help='Seconds spent in progress, including the running segment'
+    )
+
+    @api.depends('active_completion_time', 'active_started_at')
+    def _compute_elapsed_time(self):
+        now = fields.Datetime.now()
+        for project in self:
+            running = 0
+            if project.active_started_at:
+                running = max(0, int((now - project.active_started_at).total_seconds()))
+            project.elapsed_time = (project.active_completion_time or 0) + running
+
+    def init(self):
+        """Install the trigger materializing active time at status transitions."""
+        self.env.cr.execute("""
+            CREATE OR REPLACE FUNCTION product_module_project_active_time_trg()
+            RETURNS trigger AS $$
+            DECLARE
+                now_utc timestamp := now() AT TIME ZONE 'UTC';
+            BEGIN
+                IF TG_OP = 'UPDATE' AND NEW.status IS NOT DISTINCT FROM OLD.status THEN
+                    RETURN NEW;
+                END IF;
+                IF NEW.status = 'in_progress' THEN
+                    NEW.active_started_at := COALESCE(NEW.active_started_at, now_utc);
+                ELSIF NEW.active_started_at IS NOT NULL THEN
+                    NEW.active_completion_time := COALESCE(NEW.active_completion_time, 0)
+                        + GREATEST(0, floor(extract(epoch FROM now_utc - NEW.active_started_at)))::integer;
+                    NEW.active_started_at := NULL;
+                END IF;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS product_module_project_active_time ON product_module_project;
+            CREATE TRIGGER product_module_project_active_time
+                BEFORE INSERT OR UPDATE OF status
+                ON product_module_project
+                FOR EACH ROW EXECUTE FUNCTION product_module_project_active_time_trg();
+
+            -- Projects already in progress when the trigger was installed start running now
+            UPDATE product_module_project
+               SET active_started_at = now() AT TIME ZONE 'UTC'
+             WHERE status = 'in_progress' AND active_started_at IS NULL;
+        """)
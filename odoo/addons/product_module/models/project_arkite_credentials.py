@@ -0,0 +1,51 @@
+from odoo import api, models
+
+
+# Keys of the per-transaction lookups in ``cr.postcommit.data`` (dropped on commit and rollback)
+_CREDENTIALS_KEY = 'product_module.arkite_credentials'
+_JOB_PROJECTS_KEY = 'product_module.arkite_job_projects'
+
+
+class ProductModuleProjectArkiteCredentials(models.Model):
+    """Resolve Arkite credentials, and the project of a job, once per transaction.
+
+    ``_get_arkite_credentials`` may search Unit Tracking by name, and step writes look up
+    the project of their job; both ran for every record of a multi-record write. Results
+    are kept for the rest of the transaction and dropped when the units, Unit Tracking
+    entries or project jobs they depend on change.
+    """
+    _inherit = 'product_module.project'
+
+    @api.model
+    def _arkite_credentials_cache_clear(self):
+        """Forget the credentials resolved in this transaction (unit or Unit Tracking changed)."""
+        self.env.cr.postcommit.data.pop(_CREDENTIALS_KEY, None)
+
+    def _get_arkite_credentials(self):
+        cache = self.env.cr.postcommit.data.setdefault(_CREDENTIALS_KEY, {})
+        # The project's unit and name decide where the credentials come from
+        key = (self.id, self.arkite_unit_id.id, self.name)
+        if key not in cache:
+            cache[key] = super()._get_arkite_credentials()
+        return dict(cache[key])
+
+    @api.model
+    def _arkite_project_for_job(self, job):
+        """The project having ``job`` in its jobs (empty if none)."""
+        if not job:
+            return self.browse()
+        cache = self.env.cr.postcommit.data.setdefault(_JOB_PROJECTS_KEY, {})
+        if job.id not in cache:
+            cache[job.id] = self.search([('job_ids', 'in', [job.id])], limit=1).id
+        return self.browse(cache[job.id])
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        if any('job_ids' in vals for vals in vals_list):
+            self.env.cr.postcommit.data.pop(_JOB_PROJECTS_KEY, None)
+        return super().create(vals_list)
+
+    def write(self, vals):
+        if 'job_ids' in vals:
+            self.env.cr.postcommit.data.pop(_JOB_PROJECTS_KEY, None)
+        return super().write(vals)
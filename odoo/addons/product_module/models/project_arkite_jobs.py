@@ -0,0 +1,153 @@
+import logging
+import os
+
+from odoo import api, fields, models, _
+
+from ..services.arkite_write_behind import send_patches
+
+
+_logger = logging.getLogger(__name__)
+
+
+class ProductModuleProjectArkiteJobs(models.Model):
+    """Run heavy Arkite loads/syncs through ``product_module.arkite.job.queue``.
+
+    The buttons enqueue a job and return immediately; the cron worker calls the same
+    methods again with ``arkite_job_run`` in the context, which falls through to the
+    original synchronous implementation.
+    """
+    _inherit = 'product_module.project'
+
+    arkite_job_ids = fields.One2many(
+        'product_module.arkite.job.queue',
+        'project_id',
+        string='Background Jobs',
+    )
+    arkite_job_active = fields.Boolean(
+        string='Arkite Job Running',
+        compute='_compute_arkite_job_status',
+    )
+    arkite_job_progress = fields.Integer(
+        string='Arkite Job Progress',
+        compute='_compute_arkite_job_status',
+    )
+    arkite_job_message = fields.Char(
+        string='Arkite Job Status',
+        compute='_compute_arkite_job_status',
+    )
+
+    @api.depends('arkite_job_ids.state', 'arkite_job_ids.progress', 'arkite_job_ids.progress_message',
+                 'arkite_job_ids.job_type')
+    def _compute_arkite_job_status(self):
+        for record in self:
+            # arkite_job_ids is ordered newest first; deferred field edits aren't shown as a job
+            job = record.arkite_job_ids.filtered(lambda j: j.job_type != 'arkite_patches')[:1]
+            record.arkite_job_active = bool(job) and job.state in ('pending', 'running')
+            record.arkite_job_progress = job.progress if job else 0
+            if job:
+                message = job.progress_message or ''
+                if job.state == 'failed' and job.error_message:
+                    message = _('%s: %s') % (job.name, job.error_message.splitlines()[0])
+                else:
+                    message = f"{job.name}: {message}" if message else job.name
+                record.arkite_job_message = message
+            else:
+                record.arkite_job_message = False
+
+    # -------------------------------------------------------------------------
+    # Helpers
+    # -------------------------------------------------------------------------
+
+    def _arkite_job_progress(self, progress, message=None):
+        """Report progress for the job currently running this method (no-op in the UI)."""
+        job_id = self.env.context.get('arkite_job_id')
+        if not job_id:
+            return
+        try:
+            self.env['product_module.arkite.job.queue'].browse(job_id)._report_progress(progress, message)
+        except Exception as e:
+            _logger.debug("[ARKITE JOB] Could not report progress for job %s: %s", job_id, e)
+
+    def _arkite_enqueue(self, job_type):
+        self.ensure_one()
+        job, created = self.env['product_module.arkite.job.queue']._enqueue(self, job_type)
+        if created:
+            message = _('%s has been queued and will run in the background. Progress is shown on the project form.') % job.name
+        else:
+            message = _('%s is already queued or running for this project.') % job.name
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Background Job'),
+                'message': message,
+                'type': 'info',
+                'sticky': False,
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
+            }
+        }
+
+    # -------------------------------------------------------------------------
+    # Enqueueing overrides
+    # -------------------------------------------------------------------------
+
+    def action_load_arkite_project(self):
+        if self.env.context.get('arkite_job_run'):
+            return super().action_load_arkite_project()
+        return self._arkite_enqueue('load_project')
+
+    def action_sync_from_arkite(self):
+        if self.env.context.get('arkite_job_run'):
+            return super().action_sync_from_arkite()
+        return self._arkite_enqueue('sync_from_arkite')
+
+    def action_fetch_material_images_from_arkite(self):
+        if self.env.context.get('arkite_job_run'):
+            return super().action_fetch_material_images_from_arkite()
+        return self._arkite_enqueue('fetch_material_images')
+
+    def _arkite_push_patches(self, patches):
+        """Send the deferred PATCHes ``{path: body}`` of this project (or, if empty, with the env credentials).
+
+        Runs as the ``arkite_patches`` job. Accepted bodies are stored in the mirror fields of
+        the write-behind models; for failed ones the owning projects are flagged dirty instead.
+        Never raises, so those writes are committed with the job.
+        """
+        api_base = os.getenv('ARKITE_API_BASE')
+        api_key = os.getenv('ARKITE_API_KEY')
+        if self:
+            self.ensure_one()
+            try:
+                creds = self._get_arkite_credentials()
+                api_base = creds['api_base']
+                api_key = creds['api_key']
+            except Exception as e:
+                _logger.warning("[ARKITE] No API credentials for project %s: %s", self.id, e)
+        if api_base and api_key:
+            failed = send_patches(api_base, api_key, patches, max_workers=self._arkite_sync_pool_size())
+        else:
+            _logger.warning("[ARKITE] No API credentials, not sending update of %s", ", ".join(patches))
+            failed = dict.fromkeys(patches, 'no API credentials')
+        sent = {path: body for path, body in patches.items() if path not in failed}
+
+        write_behind = self.env['product_module.arkite.write.behind']
+        for model_name in write_behind._inherit_children:
+            self.env[model_name]._arkite_patches_done(self, sent, failed)
+
+        if failed:
+            message = _('%(sent)s of %(total)s Arkite update(s) sent, failed: %(failed)s') % {
+                'sent': len(sent),
+                'total': len(patches),
+                'failed': '; '.join(f"{path}: {error}" for path, error in failed.items()),
+            }
+        else:
+            message = _('%s Arkite update(s) sent') % len(sent)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {'title': _('Arkite'), 'message': message, 'type': 'warning' if failed else 'success'},
+        }
+
+    def action_refresh_arkite_job_status(self):
+        """Re-read the project so the job progress bar updates."""
+        return self._action_refresh_current_form()
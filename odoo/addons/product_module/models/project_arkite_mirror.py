@@ -0,0 +1,210 @@
+import json
+import logging
+
+from odoo import api, fields, models
+
+from ..services.arkite_client import ArkiteClient
+from .arkite_mirror import MIRROR_PATHS
+
+
+_logger = logging.getLogger(__name__)
+
+
+class ProductModuleProjectArkiteMirror(models.Model):
+    """Keep ``product_module.arkite.mirror`` current and seed the editing models from it.
+
+    Every list fetched from Arkite, by the loaders or by the refresh cron, is stored in the
+    mirror. The transient step/variant/process/detection/material records are vacuumed
+    after a while; they are then recreated from the mirror instead of downloaded again, and
+    the next load only applies what changed in Arkite since (see the step fingerprints).
+    """
+    _inherit = 'product_module.project'
+
+    arkite_mirror_version = fields.Integer(
+        string='Arkite Mirror Version',
+        readonly=True,
+        copy=False,
+        help='Goes up every time the mirrored Arkite project data changes'
+    )
+    arkite_mirror_fetched_at = fields.Datetime(
+        string='Arkite Mirror Refreshed At',
+        readonly=True,
+        copy=False,
+        help='When the whole Arkite project was last fetched into the mirror'
+    )
+
+    # -------------------------------------------------------------------------
+    # Mirror
+    # -------------------------------------------------------------------------
+
+    def _arkite_mirror_update(self, objects_by_kind, refreshed=False):
+        """Store freshly fetched Arkite lists ``{kind: objects}``; bumps the version if anything changed.
+
+        A ``detection`` list also becomes the detections snapshot of the project form.
+        """
+        self.ensure_one()
+        if not self.id or not self.arkite_project_id:
+            return
+        Mirror = self.env['product_module.arkite.mirror']
+        version = self.arkite_mirror_version + 1
+        changed = sum(
+            Mirror._store(self, kind, objects, version)
+            for kind, objects in objects_by_kind.items() if kind in MIRROR_PATHS
+        )
+        if changed:
+            _logger.debug("[ARKITE] Project %s mirror version %s: %s object(s) changed", self.id, version, changed)
+        now = fields.Datetime.now()
+        columns = {
+            'arkite_mirror_version': version if changed else self.arkite_mirror_version,
+        }
+        if refreshed:
+            columns['arkite_mirror_fetched_at'] = now
+        if 'detection' in objects_by_kind:
+            columns['arkite_detections_snapshot'] = json.dumps(objects_by_kind['detection'])
+            columns['arkite_detections_fetched_at'] = now
+        # Plain SQL: these bookkeeping fields must not go through write() and its Arkite sync.
+        self.env.cr.execute(
+            "UPDATE product_module_project SET %s WHERE id = %%s" % ", ".join(f"{name} = %s" for name in columns),
+            [*columns.values(), self.id],
+        )
+        self.invalidate_recordset(list(columns))
+
+    def _arkite_mirror_mark_stale(self):
+        """Have the refresh cron fetch these projects next, e.g. after local edits were sent to Arkite."""
+        if self.ids:
+            self.env.cr.execute(
+                "UPDATE product_module_project SET arkite_mirror_fetched_at = NULL WHERE id = ANY(%s)",
+                [self.ids],
+            )
+            self.invalidate_recordset(['arkite_mirror_fetched_at'])
+
+    def _arkite_mirror_refresh(self):
+        """Fetch every mirrored list of each linked project (concurrently) and store what changed."""
+        for record in self.filtered('arkite_project_id'):
+            try:
+                creds = record._get_arkite_credentials()
+            except Exception as e:
+                _logger.warning("[ARKITE] Could not refresh the mirror of project %s: %s", record.id, e)
+                continue
+            client = ArkiteClient(api_base=creds['api_base'], api_key=creds['api_key'], verify_ssl=False, timeout_sec=20)
+            base = f"projects/{record.arkite_project_id}/"
+            results = client.send_many(
+                ((kind, 'GET', base + path, None) for kind, path in MIRROR_PATHS.items()),
+                max_workers=len(MIRROR_PATHS),
+            )
+            fetched = {}
+            for kind, (reply, error) in results.items():
+                if kind == 'detection' and not error:
+                    reply = self._extract_detection_list(reply)
+                if error or not isinstance(reply, list):
+                    _logger.warning("[ARKITE] Could not refresh %s list of project %s: %s",
+                                    kind, record.id, error or "unexpected response format")
+                    continue
+                fetched[kind] = reply
+            # Also keeps the detections snapshot of the project form current
+            record._arkite_mirror_update(fetched, refreshed=True)
+
+    @api.model
+    def _arkite_mirror_ttl(self):
+        """Seconds before a project mirror is refreshed (product_module.arkite_mirror_ttl)"""
+        ICP = self.env['ir.config_parameter'].sudo()
+        try:
+            return max(60, int(ICP.get_param('product_module.arkite_mirror_ttl', 900)))
+        except (TypeError, ValueError):
+            return 900
+
+    @api.model
+    def _cron_refresh_arkite_mirrors(self, limit=20):
+        """Refresh the oldest project mirrors that are past their TTL"""
+        stale_date = fields.Datetime.subtract(fields.Datetime.now(), seconds=self._arkite_mirror_ttl())
+        projects = self.search([
+            ('arkite_project_id', '!=', False),
+            '|',
+            ('arkite_mirror_fetched_at', '=', False),
+            ('arkite_mirror_fetched_at', '<', stale_date),
+        ], order='arkite_mirror_fetched_at asc nulls first, id', limit=limit)
+        for project in projects:
+            project._arkite_mirror_refresh()
+            self.env.cr.commit()
+
+    # -------------------------------------------------------------------------
+    # Seeding the editing models
+    # -------------------------------------------------------------------------
+
+    def _arkite_seed_from_mirror(self):
+        """Recreate the vacuumed editing records of each project from its mirror (no Arkite call)."""
+        Mirror = self.env['product_module.arkite.mirror']
+        for record in self.filtered(lambda p: p.arkite_project_id and p.arkite_mirror_version):
+            if not record.arkite_variant_ids:
+                self.env['product_module.arkite.variant.temp'].create([{
+                    'project_id': record.id,
+                    'variant_id': str(variant.get("Id", "")),
+                    'name': variant.get("Name", "Unnamed"),
+                    'description': variant.get("Description", ""),
+                } for variant in Mirror._objects(record, 'variant')])
+            if not record.arkite_process_ids:
+                self.env['product_module.arkite.process.temp'].create([{
+                    'project_id': record.id,
+                    'process_id': str(process.get("Id", "")),
+                    'name': process.get("Name", "Unnamed"),
+                    'comment': process.get("Comment", ""),
+                } for process in Mirror._objects(record, 'process')])
+            if not record.arkite_detection_ids:
+                self.env['product_module.arkite.detection.temp'].create([{
+                    'project_id': record.id,
+                    'detection_id': str(detection.get("Id", "")),
+                    'name': detection.get("Name", "Unnamed"),
+                    'detection_type': detection.get("DetectionType", "OBJECT"),
+                    'is_job_specific': bool(detection.get("JobId")),
+                    'job_id': str(detection.get("JobId", "")) if detection.get("JobId") else "",
+                } for detection in Mirror._objects(record, 'detection')])
+            if not record.arkite_material_ids:
+                self.env['product_module.arkite.material.temp'].create([{
+                    'project_id': record.id,
+                    'material_id': str(material.get("Id", "")),
+                    'name': material.get("Name", "Unnamed"),
+                    'material_type': material.get("Type", "PickingBinMaterial"),
+                    'description': material.get("Description", ""),
+                    'image_id': str(material.get("ImageId", "")) if material.get("ImageId") else "",
+                    'picking_bin_ids_text': ", ".join(str(bid) for bid in material.get("PickingBinIds") or []),
+                } for material in Mirror._objects(record, 'material')])
+
+            seed_job_steps = not record.arkite_job_step_ids and not record.arkite_job_steps_dirty
+            seed_process_steps = not record.arkite_process_step_ids and not record.arkite_process_steps_dirty
+            if not (seed_job_steps or seed_process_steps):
+                continue
+            steps = Mirror._objects(record, 'step')
+            job_steps = self._arkite_job_step_rows(steps)
+            if seed_job_steps and job_steps:
+                variant_map = {variant.variant_id: variant for variant in record.arkite_variant_ids}
+                record._arkite_load_job_steps(job_steps, variant_map)
+                record.with_context(skip_arkite_hierarchy_autosync=True).write({'arkite_job_steps_loaded': True})
+            steps_by_process = self._arkite_process_step_rows(steps)
+            if seed_process_steps and steps_by_process:
+                fingerprints = record._arkite_load_process_steps(steps_by_process)
+                record.with_context(skip_arkite_hierarchy_autosync=True).write({
+                    'arkite_process_steps_loaded': True,
+                    'arkite_process_steps_fingerprints': json.dumps(fingerprints),
+                })
+
+    def action_load_arkite_project(self):
+        # Show the last known state right away; the (background) load then applies what changed.
+        if not self.env.context.get('arkite_job_run'):
+            self._arkite_seed_from_mirror()
+        return super().action_load_arkite_project()
+
+    def action_open_job_steps_hierarchy(self):
+        self._arkite_seed_from_mirror()
+        return super().action_open_job_steps_hierarchy()
+
+    def action_open_process_steps_hierarchy(self):
+        self._arkite_seed_from_mirror()
+        return super().action_open_process_steps_hierarchy()
+
+    def action_open_job_steps_diagram(self):
+        self._arkite_seed_from_mirror()
+        return super().action_open_job_steps_diagram()
+
+    def action_open_process_steps_diagram(self):
+        self._arkite_seed_from_mirror()
+        return super().action_open_process_steps_diagram()
@@ -1,5 +1,12 @@
+import json
+import logging
+
 from odoo import models, fields
 
+from ..services.arkite_client import is_valid_step_id, steps_fingerprint
+
+_logger = logging.getLogger(__name__)
+
 
 class ProductModuleProjectArkiteStepFlags(models.Model):
     _inherit = 'product_module.project'
@@ -28,6 +35,16 @@ class ProductModuleProjectArkiteStepFlags(models.Model):
         copy=False,
         help='Local process step hierarchy/order has changed and will be synced to Arkite when the project is saved.'
     )
+    arkite_job_steps_fingerprint = fields.Char(
+        string='Job Steps Fingerprint',
+        copy=False,
+        help='Fingerprint of the Arkite job step list of the last load; an unchanged list is not reloaded.'
+    )
+    arkite_process_steps_fingerprints = fields.Text(
+        string='Process Steps Fingerprints',
+        copy=False,
+        help='JSON {process id: fingerprint} of the Arkite process step lists of the last load.'
+    )
 
     def action_load_job_steps(self):
         self.ensure_one()
@@ -51,3 +68,225 @@ class ProductModuleProjectArkiteStepFlags(models.Model):
         })
         return res
 
+    @staticmethod
+    def _arkite_job_step_rows(all_steps):
+        """The job steps (Type='Job', ProcessId=0) of a project step list."""
+        return [
+            s for s in all_steps
+            if s.get("Type") == "Job" and (not s.get("ProcessId") or str(s.get("ProcessId", "")) == "0")
+        ]
+
+    @staticmethod
+    def _arkite_process_step_rows(all_steps):
+        """The process steps (ProcessId != 0) of a project step list, grouped by process id."""
+        steps_by_process = {}
+        for s in all_steps:
+            pid = str(s.get("ProcessId", ""))
+            if pid not in ("", "0"):
+                steps_by_process.setdefault(pid, []).append(s)
+        return steps_by_process
+
+    def _arkite_job_step_vals(self, step, root_step_id, variant_map):
+        """Job step record values of the Arkite ``step`` (``variant_map``: variant id -> variant.temp)."""
+        step_id = str(step.get("Id", ""))
+        # Fall back to StepType, Comment, Index, then ID when the step has no name
+        step_name = str(step.get("Name") or "").strip()
+        if not step_name:
+            step_type_val = step.get("StepType") or ""
+            comment_val = step.get("Comment") or ""
+            if step_type_val.strip():
+                step_name = step_type_val.replace("_", " ").title()
+            elif comment_val.strip():
+                step_name = comment_val.strip()[:50]
+            elif step.get("Index") is not None:
+                step_name = f"Step {step.get('Index')}"
+            else:
+                step_name = f"Step {step_id}"
+            _logger.info("[ARKITE] Job step %s has no Name, using '%s'", step_id, step_name)
+        step_type, step_type_raw = self.env['product_module.arkite.job.step']._normalize_step_type_value(
+            step.get("StepType", "WORK_INSTRUCTION"))
+        step_index = step.get("Index", 0) or 0
+        step_variant_records = [
+            variant_map[str(vid)].id for vid in step.get("VariantIds") or [] if str(vid) in variant_map
+        ]
+        return {
+            'project_id': self.id,
+            'job_step_id': root_step_id or step_id,  # Use root step ID for all steps in this job
+            'step_name': step_name,
+            'step_type': step_type,
+            'step_type_raw': step_type_raw,
+            'sequence': step_index * 10,
+            'index': step_index,
+            'variant_ids': [(6, 0, step_variant_records)] if step_variant_records else [],
+            'for_all_variants': step.get("ForAllVariants", False),
+        }
+
+    def _arkite_process_step_vals(self, step, process_id):
+        """Process step record values of the Arkite ``step``."""
+        sid = str(step.get("Id", ""))
+        name = (step.get("Name") or "").strip() or (f"Step {step.get('Index')}" if step.get("Index") is not None else (f"Step {sid}" if sid else "Unnamed Step"))
+        stype, stype_raw = self.env['product_module.arkite.process.step']._normalize_step_type_value(
+            step.get("StepType", "WORK_INSTRUCTION"))
+        idx = step.get("Index", 0) or 0
+        return {
+            'project_id': self.id,
+            'process_id': process_id,
+            'step_name': name,
+            'step_type': stype,
+            'step_type_raw': stype_raw,
+            'sequence': idx * 10,
+            'index': idx,
+        }
+
+    def _arkite_load_job_steps(self, job_steps, variant_map):
+        """Apply the Arkite ``job_steps`` to the local job steps and remember their fingerprint."""
+        self.ensure_one()
+        # All steps in this job use the first root step's ID as job_step_id
+        roots = sorted(
+            (s for s in job_steps if not is_valid_step_id(s.get("ParentStepId"))),
+            key=lambda s: s.get("Index", 0) or 0,
+        )
+        root_step_id = str(roots[0].get("Id", "")) if roots else None
+        created, updated, removed = self._arkite_apply_steps(
+            self.env['product_module.arkite.job.step'],
+            [('project_id', '=', self.id)],
+            job_steps,
+            lambda step: self._arkite_job_step_vals(step, root_step_id, variant_map),
+        )
+        _logger.info("[ARKITE] Job steps: %s created, %s updated, %s removed", created, updated, removed)
+        self.with_context(skip_arkite_hierarchy_autosync=True).write({
+            'arkite_job_steps_fingerprint': steps_fingerprint(job_steps),
+        })
+
+    def _arkite_load_process_steps(self, steps_by_process):
+        """Apply each process whose step list changed since the last load; returns the new fingerprints.
+
+        Steps of processes missing from ``steps_by_process`` are removed.
+        """
+        self.ensure_one()
+        Step = self.env['product_module.arkite.process.step']
+        last_fingerprints = self._arkite_process_fingerprints()
+        fingerprints = {}
+        for pid, steps in steps_by_process.items():
+            fingerprints[pid] = steps_fingerprint(steps)
+            domain = [('project_id', '=', self.id), ('process_id', '=', pid)]
+            if not self.arkite_process_steps_dirty and self._arkite_steps_unchanged(
+                    Step, domain, steps, fingerprints[pid], last_fingerprints.get(pid)):
+                continue
+            created, updated, removed = self._arkite_apply_steps(
+                Step, domain, steps, lambda step, pid=pid: self._arkite_process_step_vals(step, pid),
+            )
+            _logger.info("[ARKITE] Process %s steps: %s created, %s updated, %s removed", pid, created, updated, removed)
+
+        # Steps of processes that no longer have any
+        Step.search([
+            ('project_id', '=', self.id),
+            ('process_id', 'not in', list(steps_by_process)),
+        ]).sudo().unlink()
+        return fingerprints
+
+    def _arkite_process_fingerprints(self):
+        """``{process id: fingerprint}`` of the last process step load."""
+        self.ensure_one()
+        try:
+            return json.loads(self.arkite_process_steps_fingerprints or '{}')
+        except ValueError:
+            return {}
+
+    def _arkite_steps_unchanged(self, Step, domain, steps, fingerprint, last_fingerprint):
+        """True if the Arkite ``steps`` match the last load and its local records are still there.
+
+        Step records are transient and get vacuumed, so the stored fingerprint alone is not enough.
+        """
+        if not last_fingerprint or fingerprint != last_fingerprint:
+            return False
+        local_ids = [row['step_id'] for row in Step.search_read(domain, ['step_id'])]
+        return sorted(local_ids) == sorted(str(s.get("Id", "")) for s in steps)
+
+    def _arkite_apply_steps(self, Step, domain, steps, step_vals):
+        """Bring the local ``Step`` records of ``domain`` in line with the Arkite ``steps``.
+
+        Records are matched on ``step_id``: new steps are created (a tree level per create),
+        records whose values differ are written and records of steps that are gone are
+        removed. ``step_vals(step)`` gives the record values of a step, without its parent.
+        Returns ``(created, updated, removed)``.
+        """
+        self.ensure_one()
+        Step = Step.with_context(skip_arkite_sync=True)
+        records = {}
+        obsolete = Step.browse()
+        for record in Step.search(domain):
+            if record.step_id and record.step_id not in records:
+                records[record.step_id] = record
+            else:
+                obsolete |= record
+
+        by_parent = {}
+        for step in sorted(steps, key=lambda s: s.get("Index", 0) or 0):
+            if not is_valid_step_id(step.get("Id")):
+                continue
+            parent = step.get("ParentStepId")
+            parent = str(parent) if is_valid_step_id(parent) else ""
+            by_parent.setdefault(parent, []).append(step)
+
+        created = updated = 0
+        seen = set()
+        level = by_parent.get("", [])
+        while level:
+            new_vals = []
+            for step in level:
+                step_id = str(step["Id"])
+                seen.add(step_id)
+                parent = step.get("ParentStepId")
+                parent = str(parent) if is_valid_step_id(parent) else ""
+                vals = dict(
+                    step_vals(step),
+                    step_id=step_id,
+                    parent_step_id=parent,
+                    parent_id=records[parent].id if parent else False,
+                )
+                record = records.get(step_id)
+                if record is None:
+                    new_vals.append(vals)
+                    continue
+                changes = self._arkite_step_changes(record, vals)
+                if changes:
+                    record.write(changes)
+                    updated += 1
+            if new_vals:
+                for record in Step.create(new_vals):
+                    records[record.step_id] = record
+                created += len(new_vals)
+            level = [
+                child for step in level for child in by_parent.get(str(step["Id"]), [])
+                if str(child["Id"]) not in seen
+            ]
+
+        unreachable = sum(len(children) for children in by_parent.values()) - len(seen)
+        if unreachable:
+            _logger.warning("[ARKITE] Could not load %s step(s) - parent not found", unreachable)
+        # Children were moved to their current parents above, so removing old parents can't cascade to them.
+        for step_id, record in records.items():
+            if step_id not in seen:
+                obsolete |= record
+        if obsolete:
+            obsolete.sudo().unlink()
+        return created, updated, len(obsolete)
+
+    @staticmethod
+    def _arkite_step_changes(record, vals):
+        """The entries of ``vals`` that differ from ``record``."""
+        changes = {}
+        for name, value in vals.items():
+            field = record._fields[name]
+            current = record[name]
+            if field.type == 'many2one':
+                same = current.id == (value or False)
+            elif field.type == 'many2many':
+                value = [(6, 0, value[0][2] if value else [])]
+                same = set(current.ids) == set(value[0][2])
+            else:
+                same = (current or False) == (value or False)
+            if not same:
+                changes[name] = value
+        return changes
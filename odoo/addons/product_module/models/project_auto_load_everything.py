@@ -1,3 +1,4 @@
+import json
 import logging
 
 from odoo import models, _
@@ -21,7 +22,9 @@ class ProductModuleProjectAutoLoadEverything(models.Model):
 
         # Auto-load process list + all process steps
         try:
+            self._arkite_job_progress(60, _('Loading process list'))
             self.action_load_process_list()
+            self._arkite_job_progress(75, _('Loading process steps'))
             self._action_load_all_process_steps()
         except UserError:
             raise
@@ -41,9 +44,6 @@ class ProductModuleProjectAutoLoadEverything(models.Model):
         if not self.arkite_process_ids:
             self.action_load_process_list()
 
-        # Clear existing process steps for this project (local transient only; unlink is SAFE now)
-        self.env['product_module.arkite.process.step'].search([('project_id', '=', self.id)]).sudo().unlink()
-
         # Fetch all steps once
         creds = self._get_arkite_credentials()
         api_base = creds['api_base']
@@ -61,76 +61,16 @@ class ProductModuleProjectAutoLoadEverything(models.Model):
         if not isinstance(all_steps, list):
             raise UserError(_("Unexpected response format for steps"))
 
-        # Only process steps: ProcessId != 0
-        process_step_rows = [s for s in all_steps if str(s.get("ProcessId", "")) not in ("", "0")]
-
-        # Group by process id
-        steps_by_process = {}
-        for s in process_step_rows:
-            pid = str(s.get("ProcessId", ""))
-            steps_by_process.setdefault(pid, []).append(s)
-
-        # Create all processes' steps (roots first, then children) using the same logic as action_load_process_steps
-        Step = self.env['product_module.arkite.process.step']
-        for pid, steps in steps_by_process.items():
-            steps.sort(key=lambda x: x.get("Index", 0))
-            root_steps = [s for s in steps if not s.get("ParentStepId") or str(s.get("ParentStepId", "")) in ("0", "")]
-            child_steps = [s for s in steps if s.get("ParentStepId") and str(s.get("ParentStepId", "")) not in ("0", "")]
-            root_steps.sort(key=lambda x: x.get("Index", 0))
-            child_steps.sort(key=lambda x: x.get("Index", 0))
-
-            step_id_to_record = {}
-            for s in root_steps:
-                sid = str(s.get("Id", ""))
-                name = (s.get("Name") or "").strip() or (f"Step {s.get('Index')}" if s.get("Index") is not None else (f"Step {sid}" if sid else "Unnamed Step"))
-                stype = s.get("StepType", "WORK_INSTRUCTION")
-                idx = s.get("Index", 0) or 0
-                rec = Step.create({
-                    'project_id': self.id,
-                    'process_id': pid,
-                    'step_id': sid,
-                    'step_name': name,
-                    'step_type': stype,
-                    'sequence': idx * 10,
-                    'index': idx,
-                    'parent_step_id': "",
-                    'parent_id': False,
-                })
-                step_id_to_record[sid] = rec
-
-            remaining = list(child_steps)
-            for _ in range(15):
-                if not remaining:
-                    break
-                processed = []
-                for s in remaining:
-                    sid = str(s.get("Id", ""))
-                    psid = str(s.get("ParentStepId", ""))
-                    if psid in step_id_to_record:
-                        name = (s.get("Name") or "").strip() or (f"Step {s.get('Index')}" if s.get("Index") is not None else (f"Step {sid}" if sid else "Unnamed Step"))
-                        stype = s.get("StepType", "WORK_INSTRUCTION")
-                        idx = s.get("Index", 0) or 0
-                        parent_rec = step_id_to_record[psid]
-                        rec = Step.create({
-                            'project_id': self.id,
-                            'process_id': pid,
-                            'step_id': sid,
-                            'step_name': name,
-                            'step_type': stype,
-                            'sequence': idx * 10,
-                            'index': idx,
-                            'parent_step_id': psid,
-                            'parent_id': parent_rec.id,
-                        })
-                        step_id_to_record[sid] = rec
-                        processed.append(s)
-                for s in processed:
-                    remaining.remove(s)
+        self._arkite_mirror_update({'step': all_steps})
+
+        # Apply each process whose step list changed since the last load (roots first, then children)
+        fingerprints = self._arkite_load_process_steps(self._arkite_process_step_rows(all_steps))
 
         # Mark loaded flags (avoid triggering autosync)
         self.with_context(skip_arkite_hierarchy_autosync=True).write({
             'arkite_process_steps_loaded': True,
             'arkite_process_steps_dirty': False,
+            'arkite_process_steps_fingerprints': json.dumps(fingerprints),
         })
 
         # Set selected process if none
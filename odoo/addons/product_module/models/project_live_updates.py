@@ -0,0 +1,51 @@
+import logging
+
+from odoo import api, models
+
+
+_logger = logging.getLogger(__name__)
+
+# Bus channel/notification type shared with static/src/js/live_updates.js
+LIVE_CHANNEL = 'product_module.live'
+LIVE_NOTIFICATION = 'product_module/live_update'
+
+
+class ProductModuleProjectLiveUpdates(models.Model):
+    """Push live project/step state (relayed from MQTT) to open clients through ``bus.bus``.
+
+    Open project forms patch the affected fields in place instead of reloading.
+    """
+    _inherit = 'product_module.project'
+
+    @api.model
+    def _live_clean_update(self, update):
+        """Keep only the fields the client knows how to patch."""
+        if not isinstance(update, dict) or not isinstance(update.get('id'), int):
+            return None
+        clean = {'id': update['id']}
+        if update.get('status') in dict(self._fields['status'].selection):
+            clean['status'] = update['status']
+        if isinstance(update.get('elapsed_time'), int):
+            clean['elapsed_time'] = update['elapsed_time']
+        instructions = []
+        for line in update.get('instructions') or []:
+            if isinstance(line, dict) and isinstance(line.get('id'), int):
+                instructions.append({
+                    'id': line['id'],
+                    'is_completed': bool(line.get('is_completed')),
+                    'detection_status': bool(line.get('detection_status')),
+                })
+        if instructions:
+            clean['instructions'] = instructions
+        return clean
+
+    @api.model
+    def _live_notify(self, updates):
+        """Broadcast incremental project updates.
+
+        ``updates`` is a list of ``{'id', 'status'?, 'elapsed_time'?, 'instructions'?: [{'id', 'is_completed', 'detection_status'}]}``.
+        """
+        projects = [clean for clean in map(self._live_clean_update, updates or []) if clean]
+        if projects:
+            self.env['bus.bus']._sendone(LIVE_CHANNEL, LIVE_NOTIFICATION, {'projects': projects})
+        return len(projects)
@@ -0,0 +1,143 @@
+# product_module/models/project_progress_aggregates.py
+from odoo import models, fields, api
+
+
+class ProductModuleProjectProgressAggregates(models.Model):
+    """Stored, indexed progress aggregates on projects.
+
+    Counts and status are stored computes for ORM writes. The MQTT bridge writes
+    instructions and status with plain SQL, so ``init()`` also installs PostgreSQL
+    triggers that keep the same columns right for those writes.
+    """
+    _inherit = 'product_module.project'
+
+    status = fields.Selection(
+        compute='_compute_status_and_time',
+        store=True,
+        readonly=False,
+        index=True,
+    )
+    job_count = fields.Integer(store=True)
+    instruction_count = fields.Integer(store=True, index=True)
+    instruction_completed_count = fields.Integer(
+        string='Completed Processes',
+        compute='_compute_instruction_completed_count',
+        store=True,
+        help='Number of completed processes in this project'
+    )
+    started_at = fields.Datetime(
+        string='Started At',
+        readonly=True,
+        copy=False,
+        index=True,
+        help='When the project went in progress (set by database trigger)'
+    )
+    finished_at = fields.Datetime(
+        string='Finished At',
+        readonly=True,
+        copy=False,
+        index=True,
+        help='When the project was completed (set by database trigger)'
+    )
+
+    @api.depends('instruction_ids.is_completed')
+    def _compute_instruction_completed_count(self):
+        counts = {}
+        if self.ids:
+            counts = {
+                project.id: count
+                for project, count in self.env['product_module.instruction']._read_group(
+                    [('project_id', 'in', self.ids), ('is_completed', '=', True)],
+                    ['project_id'],
+                    ['__count'],
+                )
+            }
+        for project in self:
+            project.instruction_completed_count = counts.get(project.id, 0)
+
+    @api.depends('instruction_count', 'instruction_completed_count')
+    def _compute_status_and_time(self):
+        # Same rule as the database trigger below and the MQTT bridge timer
+        for project in self:
+            if not project.instruction_count or not project.instruction_completed_count:
+                project.status = 'not_started'
+            elif project.instruction_completed_count < project.instruction_count:
+                project.status = 'in_progress'
+            else:
+                project.status = 'done'
+
+    def init(self):
+        """Install triggers keeping the aggregates right for SQL writers (mqtt_bridge)."""
+        cr = self.env.cr
+        cr.execute("""
+            CREATE OR REPLACE FUNCTION product_module_project_refresh_counts(p_project_id integer)
+            RETURNS void AS $$
+            BEGIN
+                IF p_project_id IS NULL THEN
+                    RETURN;
+                END IF;
+                UPDATE product_module_project p
+                   SET instruction_count = agg.total,
+                       instruction_completed_count = agg.completed,
+                       status = CASE
+                           WHEN agg.completed = 0 THEN 'not_started'
+                           WHEN agg.completed < agg.total THEN 'in_progress'
+                           ELSE 'done'
+                       END
+                  FROM (
+                      SELECT count(*) AS total,
+                             count(*) FILTER (WHERE is_completed) AS completed
+                        FROM product_module_instruction
+                       WHERE project_id = p_project_id
+                  ) agg
+                 WHERE p.id = p_project_id
+                   AND (p.instruction_count IS DISTINCT FROM agg.total
+                        OR p.instruction_completed_count IS DISTINCT FROM agg.completed);
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE OR REPLACE FUNCTION product_module_instruction_counts_trg()
+            RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    PERFORM product_module_project_refresh_counts(OLD.project_id);
+                END IF;
+                IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.project_id IS DISTINCT FROM OLD.project_id) THEN
+                    PERFORM product_module_project_refresh_counts(NEW.project_id);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS product_module_instruction_counts ON product_module_instruction;
+            CREATE TRIGGER product_module_instruction_counts
+                AFTER INSERT OR DELETE OR UPDATE OF is_completed, project_id
+                ON product_module_instruction
+                FOR EACH ROW EXECUTE FUNCTION product_module_instruction_counts_trg();
+
+            CREATE OR REPLACE FUNCTION product_module_project_status_times_trg()
+            RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'UPDATE' AND NEW.status IS NOT DISTINCT FROM OLD.status THEN
+                    RETURN NEW;
+                END IF;
+                IF NEW.status = 'not_started' THEN
+                    NEW.started_at := NULL;
+                    NEW.finished_at := NULL;
+                ELSIF NEW.status = 'in_progress' THEN
+                    NEW.started_at := COALESCE(NEW.started_at, now() AT TIME ZONE 'UTC');
+                    NEW.finished_at := NULL;
+                ELSIF NEW.status = 'done' THEN
+                    NEW.finished_at := now() AT TIME ZONE 'UTC';
+                    NEW.started_at := COALESCE(NEW.started_at, NEW.finished_at);
+                END IF;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS product_module_project_status_times ON product_module_project;
+            CREATE TRIGGER product_module_project_status_times
+                BEFORE INSERT OR UPDATE OF status
+                ON product_module_project
+                FOR EACH ROW EXECUTE FUNCTION product_module_project_status_times_trg();
+        """)
@@ -0,0 +1,98 @@
+# product_module/models/qr_label_export_wizard.py
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+import logging
+import tempfile
+import time
+
+from ..services.qr_render import write_labels_pdf, write_labels_zip
+
+_logger = logging.getLogger(__name__)
+
+
+class QrLabelExportWizard(models.TransientModel):
+    """Export QR labels (QR code + name) for a selection of projects, products or variants."""
+    _name = 'product_module.qr.label.export.wizard'
+    _description = 'QR Label Export Wizard'
+
+    res_model = fields.Char(string='Model', required=True, readonly=True)
+    res_ids = fields.Char(string='Record IDs', required=True, readonly=True, help='Comma-separated record IDs')
+    label_count = fields.Integer(string='Labels', compute='_compute_label_count')
+    file_format = fields.Selection([
+        ('pdf', 'PDF (A4 sheets, 12 labels per page)'),
+        ('zip', 'ZIP (one PNG per label)'),
+    ], string='Format', default='pdf', required=True)
+
+    @api.depends('res_ids')
+    def _compute_label_count(self):
+        for wizard in self:
+            wizard.label_count = len(wizard._get_record_ids())
+
+    def _get_record_ids(self):
+        self.ensure_one()
+        return [int(rid) for rid in (self.res_ids or '').split(',') if rid.strip().isdigit()]
+
+    def _get_labels(self):
+        """Return ``(code, caption, filename)`` for every selected record that has a QR code."""
+        self.ensure_one()
+        if self.res_model not in ('product_module.project', 'product_module.product', 'product_module.variant'):
+            raise UserError(_('QR labels cannot be exported for %s.') % self.res_model)
+        records = self.env[self.res_model].browse(self._get_record_ids()).exists()
+
+        labels = []
+        used_names = set()
+        for record in records:
+            code = record._get_qr_code()
+            if not code:
+                continue
+            filename = f"{code}_qr_code.png"
+            if filename in used_names:
+                filename = f"{code}_{record.id}_qr_code.png"
+            used_names.add(filename)
+            labels.append((code, record.name or code, filename))
+        return labels
+
+    def _render_labels(self):
+        """Render the labels into a temporary file.
+
+        Returns ``(fileobj, filename, mimetype, count, seconds)``; the caller streams and closes
+        ``fileobj`` (it is deleted on close).
+        """
+        self.ensure_one()
+        labels = self._get_labels()
+        if not labels:
+            raise UserError(_('None of the selected records has a code to print.'))
+
+        workers = self.env['product_module.qr.mixin']._qr_render_workers()
+        fileobj = tempfile.TemporaryFile('w+b')
+        started = time.monotonic()
+        try:
+            if self.file_format == 'zip':
+                count = write_labels_zip(fileobj, labels, max_workers=workers)
+                filename, mimetype = 'qr_labels.zip', 'application/zip'
+            else:
+                count = write_labels_pdf(fileobj, labels, max_workers=workers)
+                filename, mimetype = 'qr_labels.pdf', 'application/pdf'
+        except ImportError:
+            fileobj.close()
+            raise UserError(_('QR code generation library not available.'))
+        except Exception:
+            fileobj.close()
+            raise
+        elapsed = time.monotonic() - started
+        _logger.info(
+            "[QR] Rendered %s label(s) as %s in %.2fs (%.0f labels/s)",
+            count, self.file_format.upper(), elapsed, count / elapsed if elapsed else count,
+        )
+        fileobj.seek(0)
+        return fileobj, filename, mimetype, count, elapsed
+
+    def action_export(self):
+        self.ensure_one()
+        if not self.label_count:
+            raise UserError(_('Please select at least one record.'))
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/product_module/qr_labels/{self.id}',
+            'target': 'self',
+        }
@@ -0,0 +1,156 @@
+# product_module/models/qr_mixin.py
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+import base64
+import logging
+import time
+
+from ..services.qr_render import qr_checksum, render_qr_pngs
+
+_logger = logging.getLogger(__name__)
+
+
+class ProductModuleQrMixin(models.AbstractModel):
+    """Stored QR code image for records identified by a short code.
+
+    The PNG is kept as an attachment and only re-rendered when the code changes.
+    Records sharing a code reuse the already-rendered attachment (matched on ``qr_checksum``),
+    and Odoo's filestore stores identical content once.
+    """
+    _name = 'product_module.qr.mixin'
+    _description = 'QR Code Mixin'
+
+    # Fields the QR payload is derived from; override in the concrete model.
+    _qr_source_fields = ('product_code',)
+
+    qr_text = fields.Char(string='QR Text', compute='_compute_qr', store=True)
+    qr_checksum = fields.Char(string='QR Checksum', compute='_compute_qr', store=True, index=True)
+    qr_image = fields.Binary(string='QR Code', compute='_compute_qr', store=True, attachment=True)
+    qr_image_name = fields.Char(string='QR Filename', compute='_compute_qr_filename')
+
+    def _get_qr_code(self):
+        """Return the text encoded in this record's QR code."""
+        self.ensure_one()
+        return (self.product_code or '').strip()
+
+    @api.model
+    def _qr_render_workers(self):
+        """Process pool size for bulk QR rendering (product_module.qr_render_workers)."""
+        ICP = self.env['ir.config_parameter'].sudo()
+        try:
+            workers = int(ICP.get_param('product_module.qr_render_workers', 0))
+        except (TypeError, ValueError):
+            workers = 0
+        return workers if workers > 0 else None
+
+    def _qr_existing_images(self, checksums):
+        """Return ``{checksum: base64 png}`` from other records that already rendered these codes."""
+        if not checksums:
+            return {}
+        # Plain SQL: searching on qr_checksum here would recurse into this compute.
+        self.env.cr.execute(
+            f'SELECT id, qr_checksum FROM "{self._table}" '
+            'WHERE qr_checksum IN %s AND NOT (id = ANY(%s::int[]))',
+            [tuple(checksums), [rid for rid in self.ids if isinstance(rid, int)]],
+        )
+        res_ids = {}
+        for rid, checksum in self.env.cr.fetchall():
+            res_ids.setdefault(checksum, rid)
+        if not res_ids:
+            return {}
+        attachments = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'qr_image'),
+            ('res_id', 'in', list(res_ids.values())),
+        ])
+        by_res_id = {att.res_id: att.datas for att in attachments}
+        return {checksum: by_res_id[rid] for checksum, rid in res_ids.items() if by_res_id.get(rid)}
+
+    def _qr_images_for_codes(self, codes, reuse=True):
+        """Return ``{code: base64 png}``, rendering each distinct code at most once."""
+        codes = {code for code in codes if code}
+        images = {}
+        if reuse:
+            existing = self._qr_existing_images({qr_checksum(code) for code in codes})
+            for code in codes:
+                if existing.get(qr_checksum(code)):
+                    images[code] = existing[qr_checksum(code)]
+        missing = codes - set(images)
+        if missing:
+            try:
+                rendered = render_qr_pngs(sorted(missing), max_workers=self._qr_render_workers())
+            except ImportError:
+                # qrcode library missing: the text is still available
+                rendered = {}
+            images.update({code: base64.b64encode(png) for code, png in rendered.items()})
+        return images
+
+    @api.depends(lambda self: self._qr_source_fields)
+    def _compute_qr(self):
+        codes = {record: record._get_qr_code() for record in self}
+        images = self._qr_images_for_codes(codes.values())
+        for record, code in codes.items():
+            record.qr_text = code or False
+            record.qr_checksum = qr_checksum(code) if code else False
+            record.qr_image = images.get(code) or False
+
+    @api.depends('qr_text')
+    def _compute_qr_filename(self):
+        """Generate filename for QR code download"""
+        for record in self:
+            record.qr_image_name = f'qr_{record.qr_text}.png' if record.qr_text else 'qr_code.png'
+
+    def action_regenerate_qr_codes(self):
+        """Re-render the QR codes of the selected records (all records when called on none)."""
+        records = self or self.search([])
+        started = time.monotonic()
+        codes = {record: record._get_qr_code() for record in records}
+        images = self._qr_images_for_codes(codes.values(), reuse=False)
+
+        by_code = {}
+        for record, code in codes.items():
+            by_code.setdefault(code, self.browse())
+            by_code[code] |= record
+        for code, group in by_code.items():
+            group.write({
+                'qr_text': code or False,
+                'qr_checksum': qr_checksum(code) if code else False,
+                'qr_image': images.get(code) or False,
+            })
+
+        elapsed = time.monotonic() - started
+        _logger.info(
+            "[QR] Regenerated %s QR code(s) for %s %s record(s) in %.2fs",
+            len(images), len(records), self._name, elapsed,
+        )
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('QR Codes Regenerated'),
+                'message': _('%(codes)s QR code(s) rendered for %(records)s record(s) in %(seconds).1fs.') % {
+                    'codes': len(images),
+                    'records': len(records),
+                    'seconds': elapsed,
+                },
+                'type': 'success',
+                'sticky': False,
+            }
+        }
+
+    def action_export_qr_labels(self):
+        """Open the label export wizard for the selected records."""
+        if not self:
+            raise UserError(_('Please select at least one record.'))
+        wizard = self.env['product_module.qr.label.export.wizard'].create({
+            'res_model': self._name,
+            'res_ids': ','.join(str(rid) for rid in self.ids),
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Export QR Labels'),
+            'res_model': 'product_module.qr.label.export.wizard',
+            'res_id': wizard.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
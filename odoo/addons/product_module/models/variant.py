@@ -2,11 +2,13 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
 import base64
-import io
+
+from ..services.qr_render import render_qr_label_png
 
 
 class ProductModuleVariant(models.Model):
     _name = 'product_module.variant'
+    _inherit = ['product_module.qr.mixin']
     _description = 'Product Variant'
     _order = 'sequence, id'
     
@@ -27,11 +29,6 @@ class ProductModuleVariant(models.Model):
     instruction_ids = fields.One2many('product_module.instruction', 'variant_id', string='Processes')
     instruction_count = fields.Integer(string='Process Count', compute='_compute_instruction_count')
     
-    # QR Code fields (computed based on variant's product_code)
-    qr_text = fields.Char(string='QR Text', compute='_compute_qr', store=False)
-    qr_image = fields.Binary(string='QR Code', compute='_compute_qr', attachment=True, store=False)
-    qr_image_name = fields.Char(string='QR Filename', compute='_compute_qr_filename', store=False)
-    
     # Input constraints
     @api.constrains('name')
     def _check_name_length(self):
@@ -51,49 +48,6 @@ class ProductModuleVariant(models.Model):
             if record.description and len(record.description) > 250:
                 raise UserError(_('Description cannot exceed 250 characters.'))
     
-    @api.depends('product_code')
-    def _compute_qr(self):
-        """Generate QR code from product_code"""
-        for record in self:
-            code = (record.product_code or '').strip()
-            record.qr_text = code or False
-
-            if not code:
-                record.qr_image = False
-                continue
-
-            try:
-                import qrcode
-            except ImportError:
-                # If qrcode lib is missing, skip the image (text still available)
-                record.qr_image = False
-                continue
-
-            # Generate QR code
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=2,
-            )
-            qr.add_data(code)
-            qr.make(fit=True)
-            img = qr.make_image(fill_color="black", back_color="white")
-
-            # Convert to binary
-            buf = io.BytesIO()
-            img.save(buf, format='PNG')
-            record.qr_image = base64.b64encode(buf.getvalue())
-
-    @api.depends('product_code')
-    def _compute_qr_filename(self):
-        """Generate filename for QR code download"""
-        for record in self:
-            if record.product_code:
-                record.qr_image_name = f'qr_{record.product_code}.png'
-            else:
-                record.qr_image_name = 'qr_code.png'
-
     @api.depends('instruction_ids')
     def _compute_instruction_count(self):
         """Count number of processes for this variant"""
@@ -116,55 +70,9 @@ class ProductModuleVariant(models.Model):
             raise UserError(_('Please set a product code first to generate QR code.'))
 
         try:
-            import qrcode
-            from PIL import Image, ImageDraw, ImageFont
+            img_bytes = render_qr_label_png((self.product_code, self.name or 'Variant'))
         except ImportError:
             raise UserError(_('QR code generation library not available.'))
-
-        # Generate QR code
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(self.product_code)
-        qr.make(fit=True)
-        qr_img = qr.make_image(fill_color="black", back_color="white")
-
-        # Create new image with space for text below QR code
-        qr_width, qr_height = qr_img.size
-        text_height = 80
-        total_height = qr_height + text_height
-
-        # Create white background image
-        from io import BytesIO
-        final_img = Image.new('RGB', (qr_width, total_height), 'white')
-        final_img.paste(qr_img, (0, 0))
-
-        # Add variant name text below QR code
-        draw = ImageDraw.Draw(final_img)
-        text = self.name or 'Variant'
-
-        # Try to use a font, fallback to default if not available
-        try:
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 24)
-        except:
-            font = ImageFont.load_default()
-
-        # Calculate text position (centered)
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_x = (qr_width - text_width) // 2
-        text_y = qr_height + 20
-
-        # Draw text
-        draw.text((text_x, text_y), text, fill='black', font=font)
-
-        # Convert to bytes
-        img_buffer = BytesIO()
-        final_img.save(img_buffer, format='PNG')
-        img_bytes = img_buffer.getvalue()
         img_base64 = base64.b64encode(img_bytes)
 
         # Create attachment
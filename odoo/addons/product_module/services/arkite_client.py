@@ -1,11 +1,107 @@
 from __future__ import annotations
 
 import base64
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import requests
 
+_logger = logging.getLogger(__name__)
+
+
+# api_base -> (candidate index, "bytes" | "json") of the image endpoint variant that last worked.
+# Shared across clients/requests so later downloads skip fallbacks that are known to fail.
+_IMAGE_ENDPOINT_CACHE: Dict[str, Tuple[int, str]] = {}
+_IMAGE_ENDPOINT_LOCK = threading.Lock()
+
+
+def is_valid_step_id(step_id: Any) -> bool:
+    """True for a real Arkite step id (not None, empty, "0" or "None")."""
+    if not step_id:
+        return False
+    value = str(step_id).strip()
+    return value not in ("", "0") and value.lower() != "none"
+
+
+def _is_root(step: Dict[str, Any]) -> bool:
+    return not step.get("ParentStepId") or str(step.get("ParentStepId")) == "0"
+
+
+def find_job_parent_step(steps: Iterable[Dict[str, Any]]) -> Optional[str]:
+    """Pick the parent for new job steps from a project's step list.
+
+    Priority: the root job COMPOSITE, any COMPOSITE, any root job step, any job step.
+    """
+    job_steps = [
+        s for s in steps
+        if isinstance(s, dict) and is_valid_step_id(s.get("Id"))
+        and (s.get("Type") == "Job" or not s.get("ProcessId") or str(s.get("ProcessId")) == "0")
+    ]
+    candidates = (
+        lambda s: s.get("Type") == "Job" and s.get("StepType") == "COMPOSITE" and _is_root(s),
+        lambda s: s.get("StepType") == "COMPOSITE",
+        _is_root,
+        lambda s: True,
+    )
+    for matches in candidates:
+        step = next((s for s in job_steps if matches(s)), None)
+        if step is not None:
+            return str(step["Id"]).strip()
+    return None
+
+
+def created_by_position(reply: Any, count: int) -> Optional[List[Dict[str, Any]]]:
+    """Objects created by a list POST, in request order, or None when the reply can't be
+    matched to the ``count`` posted items by position."""
+    if isinstance(reply, dict):
+        reply = [reply]
+    if (
+        isinstance(reply, list)
+        and len(reply) == count
+        and all(isinstance(item, dict) and str(item.get("Id") or "") not in ("", "0") for item in reply)
+    ):
+        return reply
+    return None
+
+
+# Step keys mirrored in the local step records; the fingerprint of a step list covers only these.
+_FINGERPRINT_KEYS = (
+    "Id", "Name", "Type", "StepType", "Comment", "Index",
+    "ParentStepId", "ProcessId", "VariantIds", "ForAllVariants",
+)
+
+
+def steps_fingerprint(steps: Iterable[Dict[str, Any]]) -> str:
+    """sha1 of the mirrored fields of ``steps``, independent of the order of the list."""
+    rows = sorted(
+        json.dumps([step.get(key) for key in _FINGERPRINT_KEYS], default=str)
+        for step in steps
+    )
+    return hashlib.sha1("\n".join(rows).encode("utf-8")).hexdigest()
+
+
+def _step_key(step: Dict[str, Any]) -> Tuple[str, str, str]:
+    return (
+        step.get("Name") or "",
+        str(step.get("ProcessId") or "0"),
+        str(step.get("ParentStepId") or "0"),
+    )
+
+
+@dataclass(frozen=True)
+class ImageFetch:
+    """Result of an image fetch: bytes plus cache validators, or a 304."""
+
+    data: Optional[bytes] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+
 
 @dataclass(frozen=True)
 class ArkiteClient:
@@ -39,8 +135,149 @@ class ArkiteClient:
         resp.raise_for_status()
         return resp.content or b""
 
+    def get_bytes_conditional(
+        self, path: str, etag: Optional[str] = None, last_modified: Optional[str] = None
+    ) -> Tuple[Optional[bytes], Dict[str, str]]:
+        """GET raw bytes with If-None-Match / If-Modified-Since.
+
+        Returns ``(None, headers)`` on 304 Not Modified, else ``(content, headers)``.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        resp = requests.get(
+            self._url(path),
+            params={"apiKey": self.api_key},
+            headers=headers,
+            verify=self.verify_ssl,
+            timeout=self.timeout_sec,
+        )
+        if resp.status_code == 304:
+            return None, resp.headers
+        resp.raise_for_status()
+        return resp.content or b"", resp.headers
+
+    def send(self, method: str, path: str, body: Any = None) -> Any:
+        """Send a JSON ``body`` with ``method`` (POST/PATCH/DELETE...); returns the decoded reply or None."""
+        resp = requests.request(
+            method,
+            self._url(path),
+            params={"apiKey": self.api_key},
+            headers={"Content-Type": "application/json"},
+            json=body,
+            verify=self.verify_ssl,
+            timeout=self.timeout_sec,
+        )
+        if not resp.ok:
+            raise requests.HTTPError(
+                f"HTTP {resp.status_code}: {(resp.text or '')[:200]}", response=resp
+            )
+        if not resp.content:
+            return None
+        try:
+            return resp.json()
+        except ValueError:
+            return None
+
+    def send_many(
+        self, calls: Iterable[Tuple[Any, str, str, Any]], max_workers: int = 8
+    ) -> Dict[Any, Tuple[Any, Optional[str]]]:
+        """Run ``(key, method, path, body)`` calls concurrently.
+
+        Returns ``{key: (reply, error)}`` where ``error`` is a message or None. Network only:
+        callers apply the results to the ORM afterwards, in their own thread.
+        """
+        calls = list(calls)
+        results: Dict[Any, Tuple[Any, Optional[str]]] = {}
+        if not calls:
+            return results
+
+        def run(method, path, body):
+            try:
+                return self.send(method, path, body), None
+            except Exception as e:
+                return None, str(e)[:300]
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(calls)))) as pool:
+            futures = {pool.submit(run, method, path, body): key for key, method, path, body in calls}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        return results
+
+    def create_many(self, path: str, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several objects with a single list POST; returns them in payload order.
+
+        Raises ValueError when the reply can't be matched to ``payloads`` by position.
+        """
+        if not payloads:
+            return []
+        created = created_by_position(self.send("POST", path, payloads), len(payloads))
+        if created is None:
+            raise ValueError(f"Unexpected reply to POST {path}: expected {len(payloads)} created item(s)")
+        return created
+
     # -------- Project-scoped helpers --------
 
+    def list_project_steps(self, project_id: str) -> List[Dict[str, Any]]:
+        data = self.get_json(f"projects/{project_id}/steps/")
+        return data if isinstance(data, list) else []
+
+    def create_steps(
+        self,
+        project_id: str,
+        payloads: List[Dict[str, Any]],
+        known_ids: Optional[Iterable[Any]] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Create several steps with a single list POST.
+
+        Returns the created step (at least ``Id``, usually ``Index``) for each payload, in
+        payload order, or None where a step could not be found. Arkite answers with the
+        created steps in request order; when it does not (it has been seen to create the
+        steps and still answer 500), the step list is read once and steps that are not in
+        ``known_ids`` are matched on Name / ProcessId / ParentStepId.
+
+        ``known_ids`` are the step Ids that existed before the POST. When the caller did not
+        read them (None), they are read here first; a step that already existed is never
+        returned as created. If they can't be read, nothing is matched.
+        """
+        if not payloads:
+            return []
+        path = f"projects/{project_id}/steps/"
+        if known_ids is None:
+            try:
+                known_ids = [s.get("Id") for s in self.list_project_steps(project_id)]
+            except (requests.RequestException, ValueError) as e:
+                _logger.warning("[ARKITE] Could not read the steps of project %s before creating steps: %s",
+                                project_id, e)
+        error = None
+        try:
+            reply = self.send("POST", path, payloads)
+        except requests.HTTPError as e:
+            reply, error = None, e
+        created = created_by_position(reply, len(payloads))
+        if created is not None:
+            return created
+        if known_ids is None:
+            # Without the Ids from before the POST an existing sibling could be taken for a new step
+            if error is not None:
+                raise error
+            return [None] * len(payloads)
+
+        known = {str(step_id) for step_id in known_ids}
+        pool = [s for s in self.list_project_steps(project_id) if str(s.get("Id", "")) not in known]
+        created = []
+        for payload in payloads:
+            key = _step_key(payload)
+            match = next((s for s in pool if _step_key(s) == key), None)
+            if match is not None:
+                pool.remove(match)
+            created.append(match)
+        if error is not None and not any(created):
+            raise error
+        return created
+
     def list_project_images(self, project_id: str) -> List[Dict[str, Any]]:
         data = self.get_json(f"projects/{project_id}/images/")
         return data if isinstance(data, list) else []
@@ -49,45 +286,177 @@ class ArkiteClient:
         data = self.get_json(f"projects/{project_id}/materials/")
         return data if isinstance(data, list) else []
 
-    def download_image_bytes(self, project_id: str, image_id: str) -> Optional[bytes]:
-        """Return image bytes if available, else None.
+    # -------- Unit-scoped helpers --------
 
-        Arkite returns actual bytes at: GET /projects/{projectId}/images/{imageId}/show/
+    def get_unit_status(self, unit_id: str) -> Dict[str, str]:
+        """Project loaded on a unit, its first process and that process' active steps.
+
+        Missing pieces are returned as empty strings; HTTP/network errors propagate.
         """
-        image_id = str(image_id or "").strip()
-        if not image_id or image_id == "0":
-            return None
+        status = {
+            "loaded_project_id": "",
+            "loaded_project_name": "",
+            "active_process_id": "",
+            "active_step_info": "",
+        }
+        project_data = self.get_json(f"units/{unit_id}/loadedProject")
+        if not isinstance(project_data, dict) or not project_data.get("Id"):
+            return status
+        status["loaded_project_id"] = str(project_data["Id"])
+        status["loaded_project_name"] = project_data.get("Name", "Unknown")
 
-        # Preferred endpoint per API docs.
-        candidates = [
+        processes = self.get_json(f"projects/{status['loaded_project_id']}/processes")
+        process_id = processes[0].get("Id") if isinstance(processes, list) and processes else None
+        if not process_id:
+            return status
+        status["active_process_id"] = str(process_id)
+
+        steps_data = self.get_json(f"units/{unit_id}/processes/{process_id}/activeSteps")
+        if isinstance(steps_data, list):
+            names = [step.get("Name", "Unknown") for step in steps_data[:3]]  # first 3 steps
+        elif isinstance(steps_data, dict):
+            names = [steps_data.get("Name", "Unknown")]
+        else:
+            names = []
+        if steps_data:
+            status["active_step_info"] = " | ".join(names) if names else "No active steps"
+        return status
+
+    @staticmethod
+    def _image_candidates(project_id: str, image_id: str) -> List[str]:
+        return [
+            # Preferred endpoint per API docs.
             f"projects/{project_id}/images/{image_id}/show/",
             # Fallbacks (some deployments might differ)
             f"projects/{project_id}/images/{image_id}/",
             f"projects/{project_id}/images/{image_id}",
         ]
 
-        for path in candidates:
-            try:
-                data = self.get_bytes(path)
-                if data:
-                    return data
-            except Exception:
-                continue
+    def _try_image_variant(self, path: str, mode: str, etag: Optional[str], last_modified: Optional[str]) -> ImageFetch:
+        if mode == "bytes":
+            data, headers = self.get_bytes_conditional(path, etag=etag, last_modified=last_modified)
+            if data is None:
+                return ImageFetch(not_modified=True, etag=etag, last_modified=last_modified)
+            return ImageFetch(
+                data=data or None,
+                etag=headers.get("ETag"),
+                last_modified=headers.get("Last-Modified"),
+            )
+
+        # Some servers might respond with a JSON envelope containing base64 bytes (no validators).
+        payload = self.get_json(path)
+        if isinstance(payload, dict):
+            for key in ("Data", "data", "Content", "content", "Bytes", "bytes", "Base64", "base64"):
+                raw = payload.get(key)
+                if raw:
+                    try:
+                        return ImageFetch(data=base64.b64decode(raw))
+                    except Exception:
+                        pass
+        return ImageFetch()
 
-        # Some servers might respond with a JSON envelope containing base64 bytes.
-        for path in candidates:
+    def fetch_image(
+        self,
+        project_id: str,
+        image_id: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> ImageFetch:
+        """Fetch an image, revalidating with ``etag`` / ``last_modified`` when given.
+
+        Arkite returns actual bytes at: GET /projects/{projectId}/images/{imageId}/show/
+        The endpoint variant that works is remembered per ``api_base`` and tried first next time.
+        """
+        image_id = str(image_id or "").strip()
+        if not image_id or image_id == "0":
+            return ImageFetch()
+
+        candidates = self._image_candidates(project_id, image_id)
+        variants = [(idx, mode) for mode in ("bytes", "json") for idx in range(len(candidates))]
+        with _IMAGE_ENDPOINT_LOCK:
+            known = _IMAGE_ENDPOINT_CACHE.get(self.api_base)
+        if known in variants:
+            variants.remove(known)
+            variants.insert(0, known)
+
+        for idx, mode in variants:
             try:
-                payload = self.get_json(path)
+                result = self._try_image_variant(candidates[idx], mode, etag, last_modified)
             except Exception:
                 continue
-            if isinstance(payload, dict):
-                for key in ("Data", "data", "Content", "content", "Bytes", "bytes", "Base64", "base64"):
-                    raw = payload.get(key)
-                    if raw:
-                        try:
-                            return base64.b64decode(raw)
-                        except Exception:
-                            pass
+            if result.data or result.not_modified:
+                if (idx, mode) != known:
+                    with _IMAGE_ENDPOINT_LOCK:
+                        _IMAGE_ENDPOINT_CACHE[self.api_base] = (idx, mode)
+                return result
+
+        return ImageFetch()
+
+    def download_image_bytes(self, project_id: str, image_id: str) -> Optional[bytes]:
+        """Return image bytes if available, else None."""
+        return self.fetch_image(project_id, image_id).data
 
-        return None
+    def fetch_images(
+        self,
+        project_id: str,
+        validators: Dict[str, Tuple[Optional[str], Optional[str]]],
+        max_workers: int = 8,
+        on_result: Optional[Callable[[str, ImageFetch, int, int], None]] = None,
+    ) -> Dict[str, ImageFetch]:
+        """Fetch several images concurrently with a bounded thread pool.
 
+        ``validators`` maps image_id -> (etag, last_modified); use ``(None, None)`` for a plain
+        download. ``on_result(image_id, fetch, done, total)`` is called from the calling thread
+        as each download completes (e.g. for progress).
+        """
+        image_ids = [i for i in validators if i and i != "0"]
+        results: Dict[str, ImageFetch] = {}
+        if not image_ids:
+            return results
+
+        total = len(image_ids)
+        # Resolve the working endpoint variant on one image before fanning out,
+        # so the pool doesn't hit every failing fallback in parallel.
+        first = image_ids[0]
+        results[first] = self.fetch_image(project_id, first, *validators[first])
+        if on_result:
+            on_result(first, results[first], 1, total)
+        if total == 1:
+            return results
+
+        workers = max(1, min(int(max_workers or 1), total - 1))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="arkite-img") as pool:
+            futures = {
+                pool.submit(self.fetch_image, project_id, image_id, *validators[image_id]): image_id
+                for image_id in image_ids[1:]
+            }
+            for done, future in enumerate(as_completed(futures), start=2):
+                image_id = futures[future]
+                try:
+                    results[image_id] = future.result()
+                except Exception:
+                    results[image_id] = ImageFetch()
+                if on_result:
+                    on_result(image_id, results[image_id], done, total)
+        return results
+
+    def download_images_bytes(
+        self,
+        project_id: str,
+        image_ids: Iterable[str],
+        max_workers: int = 8,
+        on_result: Optional[Callable[[str, Optional[bytes], int, int], None]] = None,
+    ) -> Dict[str, Optional[bytes]]:
+        """Download several images concurrently. Returns ``{image_id: bytes or None}``."""
+        unique_ids = dict.fromkeys(str(i).strip() for i in image_ids if i and str(i).strip() not in ("", "0"))
+        callback = None
+        if on_result:
+            def callback(image_id, fetch, done, total):
+                on_result(image_id, fetch.data, done, total)
+        fetched = self.fetch_images(
+            project_id,
+            {image_id: (None, None) for image_id in unique_ids},
+            max_workers=max_workers,
+            on_result=callback,
+        )
+        return {image_id: fetch.data for image_id, fetch in fetched.items()}
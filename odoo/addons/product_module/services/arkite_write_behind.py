@@ -0,0 +1,35 @@
+"""Sending of deferred Arkite PATCH requests.
+
+Edits are recorded as minimal PATCH bodies per Arkite object (only the keys whose local
+value changed), so no GET of the current object is needed. The ORM side merges them into
+a pending ``arkite_patches`` job of ``product_module.arkite.job.queue`` (stored with the
+transaction, so neither a rollback nor a worker restart loses or leaks edits); the job
+worker sends them with ``send_patches``.
+"""
+
+import logging
+import time
+
+from .arkite_client import ArkiteClient
+
+_logger = logging.getLogger(__name__)
+
+
+def send_patches(api_base, api_key, patches, max_workers=8):
+    """Send ``{path: body}`` as concurrent PATCHes; returns ``{path: error}`` of the failed ones."""
+    if not patches:
+        return {}
+    started = time.monotonic()
+    client = ArkiteClient(api_base=api_base, api_key=api_key, verify_ssl=False, timeout_sec=10)
+    results = client.send_many(
+        ((path, 'PATCH', path, body) for path, body in patches.items()),
+        max_workers=max_workers,
+    )
+    failed = {}
+    for path, (_reply, error) in results.items():
+        if error:
+            failed[path] = error
+            _logger.warning("[ARKITE] Deferred update of %s failed: %s", path, error)
+    _logger.info("[ARKITE] Sent %s deferred update(s) in %.2fs (%s failed)",
+                 len(patches), time.monotonic() - started, len(failed))
+    return failed
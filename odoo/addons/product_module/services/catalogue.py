@@ -0,0 +1,74 @@
+"""Product catalogue documents for pull-based clients (HMIs).
+
+The documents are built with the grouped-details SQL of ``catalogue_sql.py``, which
+``mqtt_publish/publish.py`` uses for the retained ``factory/products/all_product_details``
+payload too. Documents are cached per watermark, so unchanged data is only serialized once.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+def sql_watermark(rel_table):
+    """Change watermark: last write and row count of every table a document is built from.
+
+    Counts catch deletions, which leave no write_date behind.
+    """
+    return f"""
+SELECT concat_ws('|',
+    (SELECT max(write_date)::text || ':' || count(*) FROM public.product_module_product),
+    (SELECT max(write_date)::text || ':' || count(*) FROM public.product_module_type),
+    (SELECT max(write_date)::text || ':' || count(*) FROM public.product_module_instruction),
+    (SELECT count(*)::text FROM public.{rel_table})
+);
+"""
+
+
+def make_etag(*parts):
+    """Weak ETag: the same for the plain and the gzipped representation."""
+    digest = hashlib.sha1('\x1f'.join(str(p) for p in parts).encode('utf-8')).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class DocumentCache:
+    """Small LRU of encoded documents keyed by ETag: ``{etag: (json bytes, gzip bytes)}``."""
+
+    def __init__(self, size=64):
+        self.size = size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag):
+        with self._lock:
+            item = self._items.get(etag)
+            if item is not None:
+                self._items.move_to_end(etag)
+            return item
+
+    def put(self, etag, payload):
+        body = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        item = (body, gzip.compress(body, compresslevel=6))
+        with self._lock:
+            self._items[etag] = item
+            self._items.move_to_end(etag)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+        return item
@@ -0,0 +1,114 @@
+"""Grouped product details SQL shared by the HTTP catalogue and the MQTT publisher.
+
+``controllers/main.py`` (``/product_module/api/catalogue``) and
+``mqtt_publish/publish.py`` (the retained ``factory/products/all_product_details`` topic)
+both build their documents from these queries, so the two cannot drift apart. Plain
+module without Odoo imports: the mqtt_publish image copies it next to ``publish.py``.
+
+``rel_table`` is the product/type many2many table, optionally schema-qualified.
+"""
+
+# Product details with their instructions; ``{product_filter}`` narrows the products.
+_PRODUCT_DETAILS_CTE = """
+WITH att AS (
+    SELECT DISTINCT ON (res_id)
+        res_id,
+        id AS attachment_id
+    FROM public.ir_attachment
+    WHERE res_model = 'product_module.instruction'
+      AND res_field = 'image'
+    ORDER BY res_id, id DESC
+),
+base AS (
+    SELECT
+        p.id,
+        p.name,
+        p.product_code,
+        i.id            AS instr_id,
+        i.sequence      AS instr_sequence,
+        i.title         AS instr_title,
+        i.arkite_comment  AS instr_description,
+        CASE
+            WHEN %(odoo_base_url)s <> '' AND a.attachment_id IS NOT NULL THEN
+                %(odoo_base_url)s || '/web/image/' || a.attachment_id::text
+            WHEN %(odoo_base_url)s <> '' AND i.id IS NOT NULL THEN
+                %(odoo_base_url)s || '/web/image/product_module.instruction/' || i.id::text || '/image'
+            ELSE NULL
+        END AS instr_image_url
+    FROM public.product_module_product p
+    LEFT JOIN public.product_module_instruction i
+        ON i.product_id = p.id
+    LEFT JOIN att a
+        ON a.res_id = i.id
+    WHERE p.product_code IS NOT NULL AND p.product_code <> ''
+      {product_filter}
+),
+prod_details AS (
+    SELECT
+        b.id,
+        b.name,
+        b.product_code,
+        COALESCE(
+            json_agg(
+                json_build_object(
+                    'sequence', b.instr_sequence,
+                    'title', b.instr_title,
+                    'description', b.instr_description,
+                    'image_url', b.instr_image_url
+                )
+                ORDER BY b.instr_sequence, b.instr_id
+            ) FILTER (WHERE b.instr_id IS NOT NULL),
+            '[]'::json
+        ) AS instructions
+    FROM base b
+    GROUP BY b.id, b.name, b.product_code
+)
+"""
+
+_PRODUCT_OBJECT = """
+json_build_object(
+    'id', pd.id,
+    'name', pd.name,
+    'product_code', pd.product_code,
+    'qr_text', pd.product_code,
+    'instructions', pd.instructions
+)
+"""
+
+
+def sql_jobs(rel_table, type_col, product_col, category_filter=''):
+    """Jobs (product types) with their products, as in the MQTT details topic."""
+    return _PRODUCT_DETAILS_CTE.format(product_filter='') + f"""
+SELECT
+    t.id        AS job_id,
+    t.name      AS job_name,
+    COALESCE(
+        json_agg({_PRODUCT_OBJECT} ORDER BY pd.product_code) FILTER (WHERE pd.id IS NOT NULL),
+        '[]'::json
+    ) AS products
+FROM public.product_module_type t
+LEFT JOIN {rel_table} rel
+    ON rel.{type_col} = t.id
+LEFT JOIN prod_details pd
+    ON pd.id = rel.{product_col}
+WHERE TRUE {category_filter}
+GROUP BY t.id, t.name
+ORDER BY t.name;
+"""
+
+
+def sql_product(rel_table, type_col, product_col):
+    """One product (by ``%(product_code)s``) with its instructions and job ids."""
+    return _PRODUCT_DETAILS_CTE.format(product_filter='AND p.product_code = %(product_code)s') + f"""
+SELECT
+    {_PRODUCT_OBJECT} AS product,
+    COALESCE(
+        (SELECT json_agg(rel.{type_col} ORDER BY rel.{type_col})
+           FROM {rel_table} rel
+          WHERE rel.{product_col} = pd.id),
+        '[]'::json
+    ) AS job_ids
+FROM prod_details pd
+ORDER BY pd.id
+LIMIT 1;
+"""
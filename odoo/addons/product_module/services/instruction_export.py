@@ -0,0 +1,95 @@
+"""Streaming instruction export (CSV / JSON Lines).
+
+Rows are read through a server-side (named) cursor and encoded in small chunks, so an
+export never holds the full result set or the full file in memory.
+"""
+
+import csv
+import io
+import json
+from urllib.parse import urlencode
+
+EXPORT_URL = '/product_module/instructions/export'
+
+# Rows fetched from PostgreSQL per round trip, and encoded per yielded chunk.
+EXPORT_FETCH_SIZE = 2000
+
+# Exportable parents: the first two columns identify the parent, the rest are the process.
+EXPORT_SOURCES = {
+    'product_module.product': {
+        'header': ['Product Name', 'Product Code', 'Step #', 'Title', 'Description'],
+        'keys': ['product_name', 'product_code', 'sequence', 'title', 'description'],
+        'query': """
+            SELECT p.name, p.product_code, i.sequence, i.title, i.arkite_comment
+              FROM product_module_instruction i
+              JOIN product_module_product p ON p.id = i.product_id
+             WHERE i.product_id = ANY(%s)
+             ORDER BY p.sequence, p.id, i.sequence, i.id
+        """,
+    },
+    'product_module.project': {
+        'header': ['Project Name', 'Arkite Project ID', 'Step #', 'Title', 'Description', 'Completed'],
+        'keys': ['project_name', 'arkite_project_id', 'sequence', 'title', 'description', 'is_completed'],
+        'query': """
+            SELECT p.name, p.arkite_project_id, i.sequence, i.title, i.arkite_comment, i.is_completed
+              FROM product_module_instruction i
+              JOIN product_module_project p ON p.id = i.project_id
+             WHERE i.project_id = ANY(%s)
+             ORDER BY p.id, i.sequence, i.id
+        """,
+    },
+}
+
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'jsonl': ('application/x-ndjson; charset=utf-8', 'jsonl'),
+}
+
+
+def export_url(model, ids, file_format='csv'):
+    """URL of the streaming export for ``ids`` of ``model``."""
+    return '%s?%s' % (EXPORT_URL, urlencode({
+        'model': model,
+        'ids': ','.join(str(i) for i in ids),
+        'format': file_format,
+    }))
+
+
+def fetch_rows(cnx, query, params, name='product_module_instruction_export'):
+    """Yield row tuples from a named cursor on the raw psycopg2 connection ``cnx``."""
+    with cnx.cursor(name=name) as cur:
+        cur.itersize = EXPORT_FETCH_SIZE
+        cur.execute(query, params)
+        while True:
+            rows = cur.fetchmany(EXPORT_FETCH_SIZE)
+            if not rows:
+                break
+            yield rows
+
+
+def encode_csv(batches, header):
+    """Yield UTF-8 CSV chunks: the header, then one chunk per row batch."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    def take():
+        data = buf.getvalue().encode('utf-8')
+        buf.seek(0)
+        buf.truncate()
+        return data
+
+    # BOM so spreadsheet tools pick UTF-8; the import wizard reads it as utf-8-sig.
+    buf.write('\ufeff')
+    writer.writerow(header)
+    yield take()
+    for rows in batches:
+        writer.writerows(('' if value is None else value for value in row) for row in rows)
+        yield take()
+
+
+def encode_jsonl(batches, keys):
+    """Yield UTF-8 JSON Lines chunks, one object per row."""
+    for rows in batches:
+        yield ''.join(
+            json.dumps(dict(zip(keys, row)), ensure_ascii=False) + '\n' for row in rows
+        ).encode('utf-8')
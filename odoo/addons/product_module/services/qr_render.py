@@ -0,0 +1,207 @@
+"""QR code rendering helpers.
+
+Plain functions without ORM access, so they can be run in worker processes.
+"""
+
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+_logger = logging.getLogger(__name__)
+
+# Below this many items, starting workers costs more than rendering in-process.
+POOL_MIN_ITEMS = 50
+
+_END = object()
+
+
+def qr_checksum(code):
+    """Stable key for a QR payload (SHA1 of the UTF-8 code)."""
+    return hashlib.sha1((code or '').encode('utf-8')).hexdigest()
+
+
+def render_qr_png(code, border=2, box_size=10):
+    """Render ``code`` as a QR PNG and return the raw bytes."""
+    import qrcode
+
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=box_size,
+        border=border,
+    )
+    qr.add_data(code)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+
+    buf = io.BytesIO()
+    img.save(buf, format='PNG')
+    return buf.getvalue()
+
+
+def default_workers():
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def map_rendered(func, items, max_workers=None, window=None):
+    """Yield ``func(item)`` for each item, in order.
+
+    Large inputs are spread over a process pool. At most ``window`` results are in flight,
+    so callers can stream the output without holding every rendered image in memory.
+    ``func`` must be a module-level function: the workers are spawned, not forked, and
+    import it by name.
+    """
+    items = list(items)
+    max_workers = max_workers or default_workers()
+    if max_workers <= 1 or len(items) < POOL_MIN_ITEMS:
+        for item in items:
+            yield func(item)
+        return
+
+    window = window or max_workers * 8
+    # spawn, not fork: a forked child of a threaded Odoo worker inherits locks held by other
+    # threads (logging, DB pool, registry) and can deadlock on them.
+    ctx = multiprocessing.get_context('spawn')
+    done = 0
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx) as pool:
+            pending = deque()
+            it = iter(items)
+            for item in it:
+                pending.append(pool.submit(func, item))
+                if len(pending) >= window:
+                    break
+            while pending:
+                result = pending.popleft().result()
+                done += 1
+                yield result
+                item = next(it, _END)
+                if item is not _END:
+                    pending.append(pool.submit(func, item))
+    except BrokenProcessPool as e:
+        # e.g. the workers could not import this module; finish in-process
+        _logger.warning("QR render pool failed, rendering the remaining %s item(s) in-process: %s",
+                        len(items) - done, e)
+        for item in items[done:]:
+            yield func(item)
+
+
+def render_qr_pngs(codes, max_workers=None):
+    """Return ``{code: png bytes}`` for the distinct ``codes``."""
+    codes = list(dict.fromkeys(c for c in codes if c))
+    return dict(zip(codes, map_rendered(render_qr_png, codes, max_workers=max_workers)))
+
+
+# -------------------------------------------------------------------------
+# Labels (QR code with a caption underneath)
+# -------------------------------------------------------------------------
+
+LABEL_FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+LABEL_TEXT_HEIGHT = 80
+
+# A4 at 150 dpi, 3 x 4 labels per page
+SHEET_PAGE_SIZE = (1240, 1754)
+SHEET_GRID = (3, 4)
+SHEET_MARGIN = 60
+SHEET_DPI = 150
+
+
+def render_qr_label_png(item):
+    """Render ``(code, caption)`` as a QR code with the caption centered below it; returns PNG bytes."""
+    import qrcode
+    from PIL import Image, ImageDraw, ImageFont
+
+    code, caption = item
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(code)
+    qr.make(fit=True)
+    qr_img = qr.make_image(fill_color="black", back_color="white")
+    if hasattr(qr_img, 'get_image'):
+        # qrcode >= 7 wraps the PIL image; paste() needs the real one
+        qr_img = qr_img.get_image()
+
+    qr_width, qr_height = qr_img.size
+    final_img = Image.new('RGB', (qr_width, qr_height + LABEL_TEXT_HEIGHT), 'white')
+    final_img.paste(qr_img, (0, 0))
+
+    draw = ImageDraw.Draw(final_img)
+    try:
+        font = ImageFont.truetype(LABEL_FONT_PATH, 24)
+    except Exception:
+        font = ImageFont.load_default()
+
+    bbox = draw.textbbox((0, 0), caption, font=font)
+    text_width = bbox[2] - bbox[0]
+    draw.text(((qr_width - text_width) // 2, qr_height + 20), caption, fill='black', font=font)
+
+    buf = io.BytesIO()
+    final_img.save(buf, format='PNG')
+    return buf.getvalue()
+
+
+def write_labels_zip(fileobj, labels, max_workers=None):
+    """Write one PNG per ``(code, caption, filename)`` label into a ZIP; returns the label count."""
+    import zipfile
+
+    labels = list(labels)
+    pngs = map_rendered(render_qr_label_png, [(code, caption) for code, caption, _name in labels], max_workers)
+    count = 0
+    # PNGs are already compressed; storing them avoids a second deflate pass.
+    with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for (_code, _caption, filename), png in zip(labels, pngs):
+            archive.writestr(filename, png)
+            count += 1
+    return count
+
+
+def write_labels_pdf(fileobj, labels, max_workers=None):
+    """Write the labels as A4 sheets into a multi-page PDF; returns the label count.
+
+    Each sheet is appended to ``fileobj`` as soon as it is full, so only one page of tiles
+    is held in memory. ``fileobj`` must be opened for reading and writing.
+    """
+    from PIL import Image
+
+    labels = list(labels)
+    pngs = map_rendered(render_qr_label_png, [(code, caption) for code, caption, _name in labels], max_workers)
+
+    cols, rows = SHEET_GRID
+    page_w, page_h = SHEET_PAGE_SIZE
+    cell_w = (page_w - 2 * SHEET_MARGIN) // cols
+    cell_h = (page_h - 2 * SHEET_MARGIN) // rows
+
+    page = None
+    pages = 0
+    count = 0
+
+    def flush(page, pages):
+        page.save(fileobj, format='PDF', resolution=SHEET_DPI, append=bool(pages))
+        fileobj.seek(0, os.SEEK_END)
+
+    for png in pngs:
+        slot = count % (cols * rows)
+        if slot == 0:
+            if page is not None:
+                flush(page, pages)
+                pages += 1
+            page = Image.new('RGB', SHEET_PAGE_SIZE, 'white')
+        with Image.open(io.BytesIO(png)) as tile:
+            tile.thumbnail((cell_w, cell_h))
+            col, row = slot % cols, slot // cols
+            x = SHEET_MARGIN + col * cell_w + (cell_w - tile.width) // 2
+            y = SHEET_MARGIN + row * cell_h + (cell_h - tile.height) // 2
+            page.paste(tile, (x, y))
+        count += 1
+    if page is not None:
+        flush(page, pages)
+    return count
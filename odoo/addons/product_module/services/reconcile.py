@@ -0,0 +1,142 @@
+"""Reconcile local records with a list of remote (Arkite) objects.
+
+The local records are indexed once by their remote id and, for records that are not
+linked yet, by name. Remote objects then resolve in O(1) into a plan of creates, writes
+(only the fields whose value differs) and optional deletes. The plan is applied with one
+batched ``create`` and one ``write`` per distinct set of values.
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class ReconcileSpec:
+    """How remote objects map onto one local model.
+
+    ``create_values(obj)`` gives the values of a new record, ``update_values(obj, record)``
+    the values to keep a linked record in sync. When ``name_field`` is set, records without
+    a remote id are linked to a remote object of the same name with ``link_values(obj,
+    record)`` (default: ``update_values``); the remote id is added by the engine.
+    """
+
+    key_field: str
+    create_values: Callable[[Dict[str, Any]], Dict[str, Any]]
+    update_values: Callable[[Dict[str, Any], Any], Dict[str, Any]]
+    name_field: Optional[str] = None
+    link_values: Optional[Callable[[Dict[str, Any], Any], Dict[str, Any]]] = None
+    remote_key: Callable[[Dict[str, Any]], str] = lambda obj: str(obj.get("Id") or "")
+    remote_name: Callable[[Dict[str, Any]], str] = lambda obj: obj.get("Name") or ""
+    delete_missing: bool = False
+
+
+@dataclass
+class ReconcilePlan:
+    create: List[Dict[str, Any]] = field(default_factory=list)
+    update: List[Tuple[Any, Dict[str, Any]]] = field(default_factory=list)
+    delete: List[Any] = field(default_factory=list)
+    linked: int = 0
+    unchanged: int = 0
+
+
+@dataclass
+class ReconcileResult:
+    created: int = 0
+    updated: int = 0
+    linked: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    plan_sec: float = 0.0
+    apply_sec: float = 0.0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.created or self.updated or self.deleted)
+
+
+def changed_values(record: Any, vals: Dict[str, Any]) -> Dict[str, Any]:
+    """The entries of ``vals`` that differ from ``record`` (simple and many2one fields)."""
+    changes = {}
+    for name, value in vals.items():
+        current = record[name]
+        if hasattr(current, "_name"):
+            current = current.id
+        if (current or False) != (value or False):
+            changes[name] = value
+    return changes
+
+
+def plan(records: Any, remote: List[Dict[str, Any]], spec: ReconcileSpec) -> ReconcilePlan:
+    """Compute the creates/writes/deletes that make ``records`` match ``remote``."""
+    result = ReconcilePlan()
+    by_key: Dict[str, Any] = {}
+    unlinked_by_name: Dict[str, List[Any]] = {}
+    for record in records:
+        key = record[spec.key_field]
+        if key:
+            by_key.setdefault(str(key), record)
+        elif spec.name_field and record[spec.name_field]:
+            unlinked_by_name.setdefault(record[spec.name_field], []).append(record)
+
+    seen = set()
+    for obj in remote:
+        key = spec.remote_key(obj)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        record = by_key.get(key)
+        if record is not None:
+            changes = changed_values(record, spec.update_values(obj, record))
+            if changes:
+                result.update.append((record, changes))
+            else:
+                result.unchanged += 1
+            continue
+        candidates = unlinked_by_name.get(spec.remote_name(obj))
+        if candidates:
+            record = candidates.pop(0)
+            vals = dict((spec.link_values or spec.update_values)(obj, record), **{spec.key_field: key})
+            result.update.append((record, changed_values(record, vals)))
+            result.linked += 1
+            continue
+        result.create.append(dict(spec.create_values(obj), **{spec.key_field: key}))
+
+    if spec.delete_missing:
+        result.delete = [record for key, record in by_key.items() if key not in seen]
+    return result
+
+
+def apply(model: Any, reconcile_plan: ReconcilePlan) -> None:
+    """Apply ``reconcile_plan`` to ``model``: one create, one write per distinct values, one unlink."""
+    if reconcile_plan.create:
+        model.create(reconcile_plan.create)
+    groups: Dict[str, Tuple[Dict[str, Any], List[int]]] = {}
+    for record, vals in reconcile_plan.update:
+        group_key = json.dumps(vals, sort_keys=True, default=str)
+        groups.setdefault(group_key, (vals, []))[1].append(record.id)
+    for vals, ids in groups.values():
+        model.browse(ids).write(vals)
+    if reconcile_plan.delete:
+        model.browse([record.id for record in reconcile_plan.delete]).unlink()
+
+
+def reconcile(model: Any, records: Any, remote: List[Dict[str, Any]], spec: ReconcileSpec,
+              prepare: Optional[Callable[[ReconcilePlan], None]] = None) -> ReconcileResult:
+    """Plan and apply in one go; ``prepare(plan)`` may adjust the plan in between."""
+    started = time.monotonic()
+    reconcile_plan = plan(records, remote, spec)
+    if prepare:
+        prepare(reconcile_plan)
+    planned = time.monotonic()
+    apply(model, reconcile_plan)
+    return ReconcileResult(
+        created=len(reconcile_plan.create),
+        updated=len(reconcile_plan.update) - reconcile_plan.linked,
+        linked=reconcile_plan.linked,
+        deleted=len(reconcile_plan.delete),
+        unchanged=reconcile_plan.unchanged,
+        plan_sec=planned - started,
+        apply_sec=time.monotonic() - planned,
+    )
@@ -0,0 +1,80 @@
+/** @odoo-module **/
+
+// Patch open Project forms in place with live state relayed from MQTT over the bus
+// (see models/project_live_updates.py), instead of reloading the record.
+
+import { EventBus } from "@odoo/owl";
+import { registry } from "@web/core/registry";
+import { useBus, useService } from "@web/core/utils/hooks";
+import { patch } from "@web/core/utils/patch";
+import { FormController } from "@web/views/form/form_controller";
+
+const LIVE_CHANNEL = "product_module.live";
+const LIVE_NOTIFICATION = "product_module/live_update";
+
+const PROJECT_FIELDS = ["status", "elapsed_time"];
+const INSTRUCTION_FIELDS = ["is_completed", "detection_status"];
+
+export const productModuleLiveService = {
+    dependencies: ["bus_service"],
+    start(env, { bus_service }) {
+        const bus = new EventBus();
+        bus_service.addChannel(LIVE_CHANNEL);
+        bus_service.subscribe(LIVE_NOTIFICATION, (payload) => {
+            for (const project of payload?.projects || []) {
+                bus.trigger("project-update", project);
+            }
+        });
+        return { bus };
+    },
+};
+
+registry.category("services").add("product_module_live", productModuleLiveService);
+
+function pick(record, update, fieldNames) {
+    const values = {};
+    for (const fname of fieldNames) {
+        if (fname in update && fname in record.data) {
+            values[fname] = update[fname];
+        }
+    }
+    return values;
+}
+
+function applyLiveUpdate(record, update) {
+    if (!record || record.resId !== update.id) {
+        return;
+    }
+    const values = pick(record, update, PROJECT_FIELDS);
+    if (Object.keys(values).length) {
+        record._applyValues(values);
+    }
+    const lines = record.data.instruction_ids?.records;
+    if (!update.instructions || !lines) {
+        return;
+    }
+    const changes = new Map(update.instructions.map((line) => [line.id, line]));
+    for (const line of lines) {
+        const change = changes.get(line.resId);
+        if (change) {
+            line._applyValues(pick(line, change, INSTRUCTION_FIELDS));
+        }
+    }
+}
+
+patch(FormController.prototype, {
+    setup() {
+        super.setup(...arguments);
+        if (this.props.resModel !== "product_module.project") {
+            return;
+        }
+        const live = useService("product_module_live");
+        useBus(live.bus, "project-update", (ev) => {
+            try {
+                applyLiveUpdate(this.model.root, ev.detail);
+            } catch {
+                // keep UI stable; the next reload shows the state anyway
+            }
+        });
+    },
+});